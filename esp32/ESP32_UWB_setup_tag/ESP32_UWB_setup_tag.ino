@@ -36,8 +36,10 @@ const uint8_t PIN_SS = 4;
 
 // Network configuration
 const int udp_local_port = 12345;    // Local UDP port
-const char* mqtt_topic = "palet/rollerhockey"; // MQTT topic
+const char* mqtt_topic = "palet/rollerhockey"; // MQTT topic, "palet/rollerhockey/<tag id>" when several tags are in use
 const int mqtt_port = 1883;          // MQTT port
+const bool use_udp_ingest = false;   // Send distances straight to the tracker over UDP instead of MQTT
+const int udp_ingest_port = 12346;   // Tracker UDP ingest port (same IP as the MQTT server)
 bool ready_to_send_mqtt = false;     // Indicates if ESP is ready to send MQTT
 bool mqtt_sending_active = false;    // Indicates if MQTT sending is active
 
@@ -129,7 +131,8 @@ void inactiveDevice(DW1000Device* device) {
 
 // Function to send data via MQTT
 void sendMQTTUpdate() {
-  if (!client.connected() || !mqtt_sending_active) return;
+  if (!mqtt_sending_active) return;
+  if (!use_udp_ingest && !client.connected()) return;
 
   static unsigned long lastPrint = 0;
   static int messageCount = 0;
@@ -148,7 +151,14 @@ void sendMQTTUpdate() {
            anchors[1], lastDistances[1],
            anchors[2], lastDistances[2]);
 
-  client.publish(mqtt_topic, buffer);  // Send data via MQTT
+  if (use_udp_ingest) {
+    // Same payload as MQTT, one datagram per measurement, no broker hop
+    udp.beginPacket(mqtt_server_ip, udp_ingest_port);
+    udp.print(buffer);
+    udp.endPacket();
+  } else {
+    client.publish(mqtt_topic, buffer);  // Send data via MQTT
+  }
   Serial.println(buffer);  // Display the sent message
 }
 
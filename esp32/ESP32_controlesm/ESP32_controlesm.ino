@@ -27,7 +27,14 @@ float Xmax = 40.0; // Longueur du terrain
 float Ymax = 20.0; // Largeur du terrain
 float Xcam = Xmax / 2;
 float A, B, C;
-int X,Y;
+
+// Trame binaire des positions (little-endian, 12 octets) :
+// octet magique, version, séquence (uint16), horodatage ms (uint32), x et y en cm (uint16)
+const uint8_t BINARY_MAGIC = 0xB5;
+const uint8_t BINARY_VERSION = 1;
+const int BINARY_FRAME_SIZE = 12;
+bool hasSequence = false;    // Une trame binaire a déjà été reçue depuis la négociation
+uint16_t lastSequence = 0;   // Numéro de séquence de la dernière trame acceptée
 // Variables pour les positions actuelles des servos
 float currentAngleX = 90; // Position initiale du servo X
 float currentAngleY = 90; // Position initiale du servo Y
@@ -121,27 +128,8 @@ void handleUpdate() {
 
 
 
-void loop() {
-  server.handleClient();
-// Récuperation du packet envoyé par UDP
-  int packetSize = udp.parsePacket();
-  if (packetSize) {
-    int len = udp.read(incomingPacket, 255);
-    if (len > 0) {
-      incomingPacket[len] = 0;
-    }
-    Serial.printf("Received packet: %s\n", incomingPacket);
-    // Traitez les données ici
-  if (strlen(incomingPacket) > 0) {
-    // Trouver les positions de 'X' et 'Y' dans le tableau
-    char *xPtr = strchr(incomingPacket, 'X');
-    char *yPtr = strchr(incomingPacket, 'Y');
-   
-       if (xPtr != nullptr && yPtr != nullptr) {
-      // Extraire les valeurs numériques après 'X' et 'Y'
-       X = atoi(xPtr + 1); // Convertir la partie après 'X' en entier
-       Y = atoi(yPtr + 1); // Convertir la partie après 'Y' en entier
-       }
+// Oriente la caméra vers la position (X, Y) du palet, en mètres
+void pointCamera(float X, float Y) {
       float angleX = 0;
       float angleY = 90;
 
@@ -190,8 +178,75 @@ void loop() {
       } else {
         Serial.println("Erreur : Coordonnées invalides. Assurez-vous que 0 <= X <= Xmax et 0 <= Y <= Ymax.");
       }
+}
+
+// Trame binaire : lecture directe des champs, sans sscanf ni atoi
+void handleBinaryFrame(const uint8_t* frame) {
+  uint16_t sequence = frame[2] | (frame[3] << 8);
+  uint16_t xCm = frame[8] | (frame[9] << 8);
+  uint16_t yCm = frame[10] | (frame[11] << 8);
+
+  // Ignorer les trames dupliquées ou arrivées après une trame plus récente
+  if (hasSequence && (int16_t)(sequence - lastSequence) <= 0) {
+    return;
+  }
+  hasSequence = true;
+  lastSequence = sequence;
+
+  pointCamera(xCm / 100.0, yCm / 100.0);
+}
+
+// Commandes ASCII : négociation, dimensions du terrain et positions "XxYy"
+void handleTextCommand(char* packet) {
+  Serial.printf("Received packet: %s\n", packet);
+
+  // Négociation du format binaire : "PROTO?<version>" -> "PROTO=<version>"
+  if (strncmp(packet, "PROTO?", 6) == 0) {
+    hasSequence = false;  // Nouvel émetteur : la séquence repart de zéro
+    udp.beginPacket(udp.remoteIP(), udp.remotePort());
+    udp.printf("PROTO=%d\n", BINARY_VERSION);
+    udp.endPacket();
+    return;
+  }
+
+  // Dimensions du terrain : "Xmax=<x>,Ymax=<y>"
+  if (strncmp(packet, "Xmax=", 5) == 0) {
+    char *yMaxPtr = strstr(packet, "Ymax=");
+    if (yMaxPtr != nullptr) {
+      Xmax = atof(packet + 5);
+      Ymax = atof(yMaxPtr + 5);
+      Xcam = Xmax / 2;
+    }
+    return;
+  }
+
+  // Trouver les positions de 'X' et 'Y' dans le tableau
+  char *xPtr = strchr(packet, 'X');
+  char *yPtr = strchr(packet, 'Y');
+  if (xPtr != nullptr && yPtr != nullptr) {
+    // Extraire les valeurs numériques après 'X' et 'Y'
+    pointCamera(atof(xPtr + 1), atof(yPtr + 1));
+  } else {
+    Serial.println("Erreur : Format de commande incorrect. Utilisez: XxYy");
+  }
+}
+
+void loop() {
+  server.handleClient();
+// Récuperation du packet envoyé par UDP
+  int packetSize = udp.parsePacket();
+  if (packetSize) {
+    int len = udp.read(incomingPacket, sizeof(incomingPacket) - 1);
+    if (len <= 0) {
+      return;
+    }
+    incomingPacket[len] = 0;
+
+    if (len == BINARY_FRAME_SIZE && (uint8_t)incomingPacket[0] == BINARY_MAGIC
+        && (uint8_t)incomingPacket[1] == BINARY_VERSION) {
+      handleBinaryFrame((const uint8_t*)incomingPacket);
     } else {
-      Serial.println("Erreur : Format de commande incorrect. Utilisez: XxYy");
+      handleTextCommand(incomingPacket);
     }
   }
 }
@@ -0,0 +1,46 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from networking.distance_parser import parse_distances
+
+# Benchmark de l'analyse des messages palet/rollerhockey : messages par seconde de
+# l'ancienne analyse (decode + split + dictionnaire) comparée à DistanceParser
+
+PAYLOADS = [
+    b"84:1.86;85:1.59;86:1.33",
+    b"84:12.40;85:25.07;86:18.91",
+    b"86:3.25",
+    b"84:7.5;85:30.12;86:22.4",
+]
+N_MESSAGES = 200000
+
+def legacy_parse(payload: bytes):
+    """Analyse telle qu'elle était faite dans MQTTClient.on_message"""
+    data = payload.decode().split(";")
+    values = {int(item.split(":")[0]): float(item.split(":")[1]) for item in data}
+    return values.get(86), values.get(85), values.get(84)
+
+def main():
+    for payload in PAYLOADS:
+        assert parse_distances(payload) == legacy_parse(payload), payload
+
+    messages = (PAYLOADS * (N_MESSAGES // len(PAYLOADS) + 1))[:N_MESSAGES]
+
+    def run_legacy():
+        for payload in messages:
+            legacy_parse(payload)
+
+    def run_parser():
+        for payload in messages:
+            parse_distances(payload)
+
+    legacy = min(timeit.repeat(run_legacy, number=1, repeat=3))
+    parser = min(timeit.repeat(run_parser, number=1, repeat=3))
+    print(f"Messages : {N_MESSAGES}")
+    print(f"Ancienne analyse : {N_MESSAGES / legacy:12,.0f} messages/s")
+    print(f"DistanceParser   : {N_MESSAGES / parser:12,.0f} messages/s  (x{legacy / parser:.1f})")
+
+if __name__ == "__main__":
+    main()
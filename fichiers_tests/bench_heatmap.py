@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from match.heatmap import accumulate_heatmap
+
+# Calcul de la heatmap d'un match : ancienne accumulation point par point (boucles Python
+# sur chaque position et son voisinage) comparée à l'accumulation vectorisée (bincount
+# puis convolution séparable), écart entre les deux grilles et durée de 10⁵ à 10⁶ positions.
+#
+# Usage : python fichiers_tests/bench_heatmap.py [positions_ancien_calcul=2000]
+
+WIDTH, HEIGHT = 40.0, 20.0
+COLS, ROWS = 80, 40
+
+def legacy_heatmap(positions):
+    """Calcul tel qu'il était fait avant la version vectorisée"""
+    intensity_grid = np.zeros((ROWS, COLS))
+    if len(positions) > 0:
+        positions = np.array(positions)
+        for x, y in positions:
+            x = max(0, min(x, WIDTH))
+            y = max(0, min(y, HEIGHT))
+            grid_x = int((x / WIDTH) * (COLS - 1))
+            grid_y = int((y / HEIGHT) * (ROWS - 1))
+            influence_radius = 5
+            for dy in range(-influence_radius, influence_radius + 1):
+                for dx in range(-influence_radius, influence_radius + 1):
+                    nx = grid_x + dx
+                    ny = grid_y + dy
+                    if 0 <= nx < COLS and 0 <= ny < ROWS:
+                        distance = np.sqrt(dx*dx + dy*dy)
+                        if distance <= influence_radius:
+                            intensity = np.exp(-0.3 * (distance * distance))
+                            intensity_grid[ny, nx] += intensity
+        if intensity_grid.max() > 0:
+            intensity_grid = intensity_grid / intensity_grid.max()
+    return intensity_grid
+
+def match_positions(n, seed=2):
+    """Positions d'un match : surtout au centre et devant les buts, quelques-unes hors terrain"""
+    rng = np.random.default_rng(seed)
+    centers = np.array([(20, 10), (4, 10), (36, 10), (12, 4), (28, 16)])
+    which = rng.integers(len(centers), size=n)
+    positions = centers[which] + rng.normal(0, 4, (n, 2))
+    return positions * (1.05, 1.05) - (1, 0.5)
+
+def timeit_once(positions):
+    start = time.perf_counter()
+    accumulate_heatmap(positions, WIDTH, HEIGHT, COLS, ROWS)
+    return time.perf_counter() - start
+
+def main(legacy_count: int = 2000):
+    legacy_count = int(legacy_count)
+    positions = match_positions(legacy_count)
+    start = time.perf_counter()
+    reference = legacy_heatmap(positions)
+    legacy = (time.perf_counter() - start) / legacy_count
+    grid = accumulate_heatmap(positions, WIDTH, HEIGHT, COLS, ROWS)
+    print(f"Écart avec l'ancien calcul ({legacy_count} positions) : max {np.abs(grid - reference).max():.1e}")
+    for n in (1, 10):
+        grid = accumulate_heatmap(match_positions(n), WIDTH, HEIGHT, COLS, ROWS)
+        print(f"  {n} position(s) : max {np.abs(grid - legacy_heatmap(match_positions(n))).max():.1e}")
+
+    print(f"{'positions':>10}{'ancien (estimé)':>18}{'vectorisé':>12}{'gain':>10}")
+    for n in (10**5, 3 * 10**5, 10**6):
+        positions = match_positions(n)
+        best = min(timeit_once(positions) for _ in range(3))
+        print(f"{n:>10}{legacy * n:>16.1f} s{best * 1000:>9.1f} ms{legacy * n / best:>9.0f}x")
+
+if __name__ == "__main__":
+    main(*[float(arg) for arg in sys.argv[1:2]])
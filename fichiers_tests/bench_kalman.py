@@ -0,0 +1,124 @@
+import math
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tracking.frames import DistanceFrame
+from tracking.kalman import KalmanFilter
+from tracking.pipeline import TrackingPipeline
+from tracking.puck_position import PuckPositionCalculator
+
+# Rejeu d'un match simulé à travers le pipeline de suivi : précision des positions
+# brutes et filtrées (vitesse constante "cv", accélération constante "ca") par rapport
+# à la trajectoire réelle, précision de la position anticipée envoyée à la caméra, et
+# coût du filtre par mesure.
+#
+# Usage : python fichiers_tests/bench_kalman.py [durée_s=300] [anticipation_s=0.1]
+
+WIDTH, HEIGHT = 40.0, 20.0
+RATE_HZ = 30.0
+JITTER = 0.005       # Variation de la période d'échantillonnage (s)
+LOSS = 0.05          # Proportion de mesures perdues
+RANGE_NOISE = 0.10   # Écart type du bruit UWB sur chaque distance (m)
+FRICTION = 0.4       # Décélération du palet (m/s²)
+PUCK_RADIUS = 0.04
+
+def simulate(duration: float, seed: int = 3):
+    """Trajectoire du palet : tirs de vitesse et direction aléatoires, rebonds sur les bandes"""
+    rng = np.random.default_rng(seed)
+    dt = 0.001
+    steps = int(duration / dt)
+    positions = np.empty((steps, 2))
+    x, y = WIDTH / 2, HEIGHT / 2
+    vx = vy = 0.0
+    next_shot = 0.0
+    for i in range(steps):
+        t = i * dt
+        if t >= next_shot:
+            speed = rng.uniform(2.0, 15.0)
+            angle = rng.uniform(0, 2 * math.pi)
+            vx, vy = speed * math.cos(angle), speed * math.sin(angle)
+            next_shot = t + rng.uniform(0.5, 3.0)
+        speed = math.hypot(vx, vy)
+        if speed > 0:
+            slowed = max(speed - FRICTION * dt, 0.0) / speed
+            vx, vy = vx * slowed, vy * slowed
+        x += vx * dt
+        y += vy * dt
+        if not PUCK_RADIUS <= x <= WIDTH - PUCK_RADIUS:
+            vx = -0.8 * vx
+            x = min(max(x, PUCK_RADIUS), WIDTH - PUCK_RADIUS)
+        if not PUCK_RADIUS <= y <= HEIGHT - PUCK_RADIUS:
+            vy = -0.8 * vy
+            y = min(max(y, PUCK_RADIUS), HEIGHT - PUCK_RADIUS)
+        positions[i] = x, y
+    return dt, positions
+
+def truth_at(dt, positions, t):
+    return positions[min(int(round(t / dt)), len(positions) - 1)]
+
+def replay_frames(dt, positions, duration, calculator, seed: int = 4):
+    """Mesures UWB bruitées, échantillonnées à RATE_HZ avec gigue et pertes"""
+    rng = np.random.default_rng(seed)
+    sensors = np.array([(anchor.x, anchor.y) for anchor in calculator.anchors])
+    frames, truths = [], []
+    t = 0.0
+    while t < duration - 1.0:
+        t += 1.0 / RATE_HZ + rng.uniform(-JITTER, JITTER)
+        if rng.random() < LOSS:
+            continue
+        p = truth_at(dt, positions, t)
+        distances = np.linalg.norm(sensors - p, axis=1) + rng.normal(0, RANGE_NOISE, len(sensors))
+        frames.append(DistanceFrame(tuple(distances.tolist()), t))
+        truths.append(p)
+    return frames, np.array(truths)
+
+def rmse(a, b):
+    return float(np.sqrt(((np.asarray(a) - np.asarray(b)) ** 2).sum(axis=1).mean()))
+
+def main(duration: float = 300.0, lookahead: float = 0.1):
+    calculator = PuckPositionCalculator()
+    dt, positions = simulate(duration)
+    frames, truths = replay_frames(dt, positions, duration, calculator)
+    future = np.array([truth_at(dt, positions, frame.timestamp + lookahead) for frame in frames])
+    print(f"Rejeu : {len(frames)} mesures, {duration:.0f} s, bruit UWB {RANGE_NOISE * 100:.0f} cm, "
+          f"anticipation {lookahead * 1000:.0f} ms")
+    print(f"{'filtre':<16}{'position (cm)':>15}{'anticipée (cm)':>16}{'vitesse (m/s)':>15}{'µs/mesure':>11}")
+
+    raw = TrackingPipeline(calculator)
+    fixes = [fix for frame in frames for fix in raw.process_batch([frame])]
+    raw_xy = [(fix.x, fix.y) for fix in fixes]
+    print(f"{'aucun':<16}{rmse(raw_xy, truths) * 100:15.1f}{rmse(raw_xy, future) * 100:16.1f}"
+          f"{'-':>15}{'-':>11}")
+
+    true_velocity = np.array([truth_at(dt, positions, frame.timestamp + 0.005)
+                              - truth_at(dt, positions, frame.timestamp - 0.005) for frame in frames]) / 0.01
+    models = (("cv", 30.0), ("cv", 100.0), ("cv", 300.0), ("ca", 1000.0), ("ca", 3000.0), ("ca", 10000.0))
+    for model, process_noise in models:
+        tracking_filter = KalmanFilter(model, process_noise)
+        filtered, predicted, velocity = [], [], []
+        for fix in fixes:
+            x, y, vx, vy = tracking_filter.update(fix.x, fix.y, fix.timestamp)
+            filtered.append((x, y))
+            velocity.append((vx, vy))
+            predicted.append(tracking_filter.predict(lookahead))
+
+        timing_filter = KalmanFilter(model, process_noise)
+        samples = [(fix.x, fix.y, fix.timestamp) for fix in fixes]
+
+        def run():
+            timing_filter.reset()
+            update = timing_filter.update
+            for x, y, t in samples:
+                update(x, y, t)
+
+        cost = min(timeit.repeat(run, number=1, repeat=5)) / len(samples)
+        name = f"{model} q={process_noise:g}"
+        print(f"{name:<16}{rmse(filtered, truths) * 100:15.1f}{rmse(predicted, future) * 100:16.1f}"
+              f"{rmse(velocity, true_velocity):15.2f}{cost * 1e6:11.2f}")
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:3]]
+    main(*args)
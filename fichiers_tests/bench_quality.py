@@ -0,0 +1,78 @@
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench_kalman import RANGE_NOISE, replay_frames, rmse, simulate
+from tracking.frames import DistanceFrame
+from tracking.pipeline import TrackingPipeline
+from tracking.puck_position import PuckPositionCalculator
+from tracking.quality import FixQuality
+
+# Rejeu d'un match simulé avec des mesures aberrantes (trajet UWB réfléchi : une distance
+# allongée de 1 à 5 m) : proportion de mesures aberrantes rejetées, de bonnes mesures
+# perdues, précision des positions publiées avec et sans contrôle de qualité, et coût du
+# contrôle par mesure.
+#
+# Usage : python fichiers_tests/bench_quality.py [durée_s=300] [proportion_aberrante=0.05]
+
+def inject_outliers(frames, rate: float, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    corrupted, outliers = [], np.zeros(len(frames), dtype=bool)
+    for i, frame in enumerate(frames):
+        if rng.random() < rate:
+            distances = list(frame.distances)
+            distances[rng.integers(len(distances))] += rng.uniform(1.0, 5.0)
+            frame = DistanceFrame(tuple(distances), frame.timestamp, frame.tag)
+            outliers[i] = True
+        corrupted.append(frame)
+    return corrupted, outliers
+
+def main(duration: float = 300.0, rate: float = 0.05):
+    calculator = PuckPositionCalculator()
+    dt, positions = simulate(duration)
+    frames, truths = replay_frames(dt, positions, duration, calculator)
+    frames, outliers = inject_outliers(frames, rate)
+    print(f"Rejeu : {len(frames)} mesures, {duration:.0f} s, bruit UWB {RANGE_NOISE * 100:.0f} cm, "
+          f"{outliers.sum()} mesures aberrantes")
+
+    # Sans contrôle : qualité minimale nulle, vitesse illimitée, tolérance infinie
+    accept_all = FixQuality(calculator, min_quality=0.0, max_speed=np.inf, range_tolerance=np.inf)
+    for name, quality in (("sans contrôle", accept_all), ("avec contrôle", FixQuality(calculator))):
+        pipeline = TrackingPipeline(calculator, quality=quality)
+        published = np.zeros(len(frames), dtype=bool)
+        xy = np.full((len(frames), 2), np.nan)
+        for i, frame in enumerate(frames):
+            fixes = pipeline.process_batch([frame])
+            if fixes:
+                published[i] = True
+                xy[i] = fixes[0].x, fixes[0].y
+        caught = (~published & outliers).sum() / max(outliers.sum(), 1)
+        lost = (~published & ~outliers).sum() / (~outliers).sum()
+        print(f"{name:<14}: aberrantes rejetées {caught:6.1%}, bonnes mesures perdues {lost:6.2%}, "
+              f"erreur {rmse(xy[published], truths[published]) * 100:5.1f} cm, "
+              f"erreur des aberrantes publiées "
+              f"{rmse(xy[published & outliers], truths[published & outliers]) * 100 if (published & outliers).any() else 0:5.1f} cm")
+
+    # Coût du contrôle seul, par mesure, pour un lot d'une mesure et un lot de 64
+    quality = FixQuality(calculator)
+    table_pipeline = TrackingPipeline(calculator, quality=quality)
+    table_pipeline.process_batch(frames[:1])
+    table = table_pipeline.tag_table
+    d = np.array([frame.distances for frame in frames[:64]])
+    xy = calculator.solve_positions(d)
+    t = np.array([frame.timestamp for frame in frames[:64]])
+    slots = np.zeros(64, dtype=np.intp)
+    for size in (1, 64):
+        def run():
+            q = quality.score_batch(d[:size], xy[:size])
+            quality.gate(q, xy[:size], t[:size], slots[:size], table)
+        cost = min(timeit.repeat(run, number=2000, repeat=3)) / 2000 / size
+        print(f"Contrôle, lots de {size:2d} : {cost * 1e6:6.2f} µs/mesure")
+    cost = min(timeit.repeat(lambda: quality.score(frames[0].distances, *xy[0]), number=20000, repeat=3)) / 20000
+    print(f"Contrôle, une mesure (score)   : {cost * 1e6:6.2f} µs/mesure")
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:3]]
+    main(*args)
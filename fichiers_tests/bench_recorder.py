@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench_kalman import replay_frames, simulate
+from tracking.frames import DistanceFrame
+from tracking.pipeline import TrackingPipeline
+from tracking.puck_position import PuckPositionCalculator
+from tracking.recording import MatchRecorder, load_recording
+
+# Enregistrement d'un match simulé (plusieurs tags) à travers le pipeline de suivi :
+# coût de l'enregistrement par lot, mémoire comparée à l'ancienne liste de listes [x, y],
+# taille du fichier, puis relecture et comparaison avec les mesures en mémoire.
+#
+# Usage : python fichiers_tests/bench_recorder.py [durée_s=1200] [tags=4] [lot=4]
+
+def match_frames(duration, tags, calculator):
+    dt, positions = simulate(duration)
+    frames, _ = replay_frames(dt, positions, duration, calculator)
+    # Les autres tags reprennent la trajectoire du palet, décalée dans le temps
+    shifted = [DistanceFrame(frame.distances, frame.timestamp + k * 0.007, f"tag{k}")
+               for k in range(1, tags) for frame in frames]
+    return sorted(frames + shifted, key=lambda frame: frame.timestamp)
+
+def main(duration: float = 1200.0, tags: int = 4, batch: int = 4):
+    calculator = PuckPositionCalculator()
+    frames = match_frames(duration, int(tags), calculator)
+    batch = int(batch)
+    batches = [frames[i:i + batch] for i in range(0, len(frames), batch)]
+    print(f"Match de {duration / 60:.0f} min, {int(tags)} tags : {len(frames)} mesures, lots de {batch}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "match.ptrec")
+        # Meilleur de trois passages, en alternant avec et sans enregistrement
+        timings = {"sans enregistrement": [], "avec enregistrement": []}
+        for _ in range(3):
+            recorder = MatchRecorder(path, calculator.anchors)
+            for name, pass_recorder in (("sans enregistrement", None), ("avec enregistrement", recorder)):
+                pipeline = TrackingPipeline(calculator)
+                if pass_recorder is not None:
+                    pass_recorder.start()
+                    pipeline.set_recorder(pass_recorder)
+                start = time.perf_counter()
+                for frames_batch in batches:
+                    pipeline.process_batch(frames_batch)
+                timings[name].append((time.perf_counter() - start) / len(batches))
+            recorder.close()
+        timings = {name: min(values) for name, values in timings.items()}
+        print(f"Pipeline par lot : {timings['sans enregistrement'] * 1e6:.1f} µs sans enregistrement, "
+              f"{timings['avec enregistrement'] * 1e6:.1f} µs avec "
+              f"(+{(timings['avec enregistrement'] - timings['sans enregistrement']) * 1e6:.1f} µs)")
+
+        records = recorder.records
+        published = recorder.positions()
+        tracemalloc.start()
+        legacy = [[float(x), float(y)] for x, y in published.tolist()]
+        legacy_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del legacy
+        print(f"Mémoire : liste de listes {legacy_size / 1e6:.1f} Mo pour {len(published)} positions, "
+              f"tableau {records.nbytes / 1e6:.1f} Mo pour {len(records)} mesures (distances comprises), "
+              f"{records.dtype.itemsize} octets par mesure")
+        print(f"Fichier : {os.path.getsize(path) / 1e6:.1f} Mo")
+
+        start = time.perf_counter()
+        recording = load_recording(path)
+        elapsed = time.perf_counter() - start
+        same = (len(recording.records) == len(records)
+                and recording.records.tobytes() == records.tobytes()
+                and recording.tags == recorder.tags)
+        print(f"Relecture : {len(recording.records)} mesures en {elapsed * 1000:.1f} ms, "
+              f"{'identiques' if same else 'DIFFÉRENTES'} aux mesures en mémoire")
+
+        # Arrêt brutal pendant l'écriture d'un bloc : seul ce bloc est perdu
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 10)
+        print(f"Fichier tronqué : {len(load_recording(path).records)} mesures relues")
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:4]]
+    main(*args)
@@ -0,0 +1,93 @@
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench_kalman import replay_frames, rmse, simulate
+from tracking.pipeline import TrackingPipeline
+from tracking.puck_position import PuckPositionCalculator
+from tracking.trilateration import TrilaterationSolver
+
+# Affinage non linéaire (Levenberg-Marquardt) de la trilatération linéarisée : précision
+# sur des distances bruitées, sur tout le terrain et le long de la bande haute (alignement
+# des capteurs HG et HD), coût par mesure, puis rejeu d'un match à travers le pipeline
+# avec et sans départ depuis la position précédente.
+#
+# Usage : python fichiers_tests/bench_refinement.py [bruit_m=0.10] [durée_s=120]
+
+WIDTH, HEIGHT = 40.0, 20.0
+SENSORS = [(0, HEIGHT), (WIDTH, HEIGHT), (WIDTH / 2, 0)]
+N_SAMPLES = 20000
+
+def noisy_distances(points, noise, seed=11):
+    rng = np.random.default_rng(seed)
+    sensors = np.array(SENSORS, dtype=float)
+    d = np.linalg.norm(points[:, None, :] - sensors[None, :, :], axis=2)
+    return d + rng.normal(0, noise, d.shape)
+
+def accuracy(noise):
+    solver = TrilaterationSolver(SENSORS)
+    rng = np.random.default_rng(10)
+    zones = (("terrain entier", rng.uniform((0, 0), (WIDTH, HEIGHT), size=(N_SAMPLES, 2))),
+             ("bande haute (y > 19 m)", rng.uniform((2, HEIGHT - 1), (WIDTH - 2, HEIGHT), size=(N_SAMPLES, 2))))
+    print(f"Précision, bruit UWB {noise * 100:.0f} cm (erreur quadratique moyenne, cm)")
+    print(f"{'zone':<24}{'linéaire':>10}" + "".join(f"{f'LM {k} it.':>10}" for k in (1, 2, 3, 5)))
+    for name, points in zones:
+        d = noisy_distances(points, noise)
+        linear = solver.solve_batch(d)
+        line = f"{name:<24}{rmse(linear, points) * 100:10.1f}"
+        for iterations in (1, 2, 3, 5):
+            line += f"{rmse(solver.refine_batch(d, linear, iterations), points) * 100:10.1f}"
+        print(line)
+    return solver, d, linear
+
+def cost(solver, d, linear):
+    samples = [(tuple(row), x, y) for row, (x, y) in zip(d[:2000].tolist(), linear[:2000].tolist())]
+    solve, refine = solver.solve, solver.refine
+
+    def run_linear():
+        for distances, _, _ in samples:
+            solve(distances)
+
+    def run_refine():
+        for distances, x, y in samples:
+            refine(distances, x, y)
+
+    print("Coût par mesure")
+    for name, run in (("linéaire, une mesure", run_linear), ("LM 3 it., une mesure", run_refine)):
+        per_fix = min(timeit.repeat(run, number=1, repeat=5)) / len(samples)
+        print(f"  {name:<24}: {per_fix * 1e6:7.2f} µs")
+    for name, run in (("linéaire, par lot", lambda: solver.solve_batch(d)),
+                      ("LM 3 it., par lot", lambda: solver.refine_batch(d, linear, 3))):
+        per_fix = min(timeit.repeat(run, number=5, repeat=3)) / 5 / len(d)
+        print(f"  {name:<24}: {per_fix * 1e6:7.2f} µs")
+
+def replay(duration):
+    """Match simulé à travers le pipeline (bruit de bench_kalman), positions publiées"""
+    print(f"Rejeu d'un match de {duration:.0f} s à travers le pipeline")
+    dt, positions = simulate(duration)
+    frames, truths = replay_frames(dt, positions, duration, PuckPositionCalculator())
+    near_board = truths[:, 1] > HEIGHT - 1
+    for name, iterations, warm_start in (("linéaire", 0, False), ("LM 3 it.", 3, False),
+                                         ("LM 3 it., départ précédent", 3, True)):
+        calculator = PuckPositionCalculator(refine_iterations=iterations)
+        pipeline = TrackingPipeline(calculator, warm_start=warm_start)
+        xy = np.full((len(frames), 2), np.nan)
+        for i, frame in enumerate(frames):
+            fixes = pipeline.process_batch([frame])
+            if fixes:
+                xy[i] = fixes[0].x, fixes[0].y
+        published = ~np.isnan(xy[:, 0])
+        print(f"  {name:<28}: {rmse(xy[published], truths[published]) * 100:5.1f} cm, "
+              f"bande haute {rmse(xy[published & near_board], truths[published & near_board]) * 100:5.1f} cm, "
+              f"{published.mean():6.1%} publiées")
+
+def main(noise: float = 0.10, duration: float = 120.0):
+    solver, d, linear = accuracy(noise)
+    cost(solver, d, linear)
+    replay(duration)
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import time
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tracking.anchors import AnchorRegistry
+from tracking.recording import MatchRecorder, load_recording
+from tracking.replay import MappedRecording, ReplayEngine
+
+# Relecture d'un long enregistrement (tournoi de plusieurs heures, plusieurs tags) :
+# ouverture par projection en mémoire comparée à la lecture complète du fichier,
+# recherche d'un instant, avance de l'horloge à 50x, image par image et saut.
+#
+# Usage : python fichiers_tests/bench_replay.py [durée_h=3] [tags=4]
+
+RATE_HZ = 30.0
+
+def write_recording(path, hours, tags):
+    """Enregistrement synthétique : chaque tag tourne autour du centre du terrain"""
+    recorder = MatchRecorder(path, AnchorRegistry().anchors(40.0, 20.0), chunk_size=1024)
+    recorder.start()
+    names = [f"tag{k}" for k in range(tags)]
+    count = int(hours * 3600 * RATE_HZ) * tags
+    batch = 1024
+    for start in range(0, count, batch):
+        i = np.arange(start, min(start + batch, count))
+        t = 1000.0 + (i // tags) / RATE_HZ
+        slots = i % tags
+        angle = t * 0.3 + slots
+        positions = np.column_stack((20 + 15 * np.cos(angle), 10 + 8 * np.sin(angle)))
+        recorder.record(t, slots, np.full((len(i), 3), 12.0), positions, np.ones(len(i)), names)
+        # Le thread d'écriture suit au rythme des blocs, comme pendant un vrai match
+        if recorder._count - recorder._written > 64 * batch:
+            time.sleep(0.01)
+    recorder.close()
+    return count
+
+def main(hours: float = 3.0, tags: int = 4):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tournoi.ptrec")
+        count = write_recording(path, hours, int(tags))
+        print(f"Enregistrement : {hours:g} h, {int(tags)} tags, {count} mesures, "
+              f"{os.path.getsize(path) / 1e6:.0f} Mo")
+
+        start = time.perf_counter()
+        recording = MappedRecording(path)
+        opened = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = load_recording(path)
+        full = time.perf_counter() - start
+        same = recording.records(0, len(recording)).tobytes() == loaded.records.tobytes()
+        del loaded
+        print(f"Ouverture : {opened * 1000:.1f} ms par projection ({len(recording._offsets)} blocs indexés), "
+              f"{full * 1000:.0f} ms par lecture complète ; mesures {'identiques' if same else 'DIFFÉRENTES'}")
+
+        rng = np.random.default_rng(1)
+        targets = rng.uniform(recording.start_time, recording.end_time, 1000).tolist()
+        cost = min(timeit.repeat(lambda: [recording.locate(t) for t in targets], number=1, repeat=5)) / len(targets)
+        print(f"Recherche d'un instant : {cost * 1e6:.1f} µs")
+
+        engine = ReplayEngine(recording)
+        engine.speed = 50
+        engine.seek(targets[0])
+        ticks = 300
+        cost = min(timeit.repeat(lambda: engine.advance(0.033), number=ticks, repeat=3)) / ticks
+        print(f"Lecture à 50x : {cost * 1e6:.1f} µs par image affichée (33 ms)")
+        cost = min(timeit.repeat(lambda: engine.step(1), number=200, repeat=3)) / 200
+        print(f"Image par image : {cost * 1e6:.1f} µs")
+        cost = min(timeit.repeat(lambda: [engine.seek(t) for t in targets[:100]], number=1, repeat=3)) / 100
+        print(f"Saut : {cost * 1e6:.1f} µs")
+        recording.close()
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:3]]
+    main(*args)
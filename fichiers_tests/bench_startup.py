@@ -0,0 +1,54 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Benchmark du démarrage à froid de l'interface : lance main.py N fois hors écran avec
+# --startup-report --quit-after-startup et vérifie le budget documenté dans le README.
+# Usage : python fichiers_tests/bench_startup.py [N] [budget_ms]
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+BUDGET_MS = float(sys.argv[2]) if len(sys.argv) > 2 else 1500.0
+
+def run_once():
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "main.py", "--startup-report", "--quit-after-startup"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    for line in result.stderr.splitlines():
+        if line.startswith("STARTUP_REPORT "):
+            return wall_ms, json.loads(line[len("STARTUP_REPORT "):])
+    raise RuntimeError(f"Pas de rapport de démarrage (code {result.returncode}) :\n{result.stderr}")
+
+def main():
+    walls, totals, report = [], [], None
+    for _ in range(RUNS):
+        wall_ms, report = run_once()
+        walls.append(wall_ms)
+        totals.append(report["total_ms"])
+
+    print(f"{RUNS} démarrages, budget {BUDGET_MS:.0f} ms")
+    print(f"  jusqu'à la boucle d'événements : médiane {statistics.median(totals):.1f} ms, max {max(totals):.1f} ms")
+    print(f"  processus complet (interpréteur compris) : médiane {statistics.median(walls):.1f} ms")
+    for phase in report["phases"]:
+        print(f"    {phase['name']:<28} +{phase['duration_ms']:.1f} ms")
+
+    ok = True
+    if statistics.median(totals) > BUDGET_MS:
+        print("ÉCHEC : budget de démarrage dépassé")
+        ok = False
+    if report["heavy_modules_loaded"]:
+        print(f"ÉCHEC : modules lourds chargés au démarrage : {', '.join(report['heavy_modules_loaded'])}")
+        ok = False
+    if ok:
+        print("OK")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
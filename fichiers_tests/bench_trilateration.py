@@ -0,0 +1,125 @@
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tracking.trilateration import TrilaterationSolver
+
+# Micro-benchmark de la trilatération : latence par mesure de l'ancienne résolution
+# (np.array + np.linalg.cond + np.linalg.lstsq à chaque mesure) comparée au solveur précalculé,
+# puis moindres carrés pondérés avec plus de capteurs et des capteurs manquants
+
+WIDTH, HEIGHT = 40.0, 20.0
+SENSORS = [(0, HEIGHT), (WIDTH, HEIGHT), (WIDTH / 2, 0)]
+# Grand terrain : huit capteurs sur le pourtour, ceux du milieu des bandes plus fiables
+WIDE_SENSORS = [(0, 0), (WIDTH / 2, 0), (WIDTH, 0), (WIDTH, HEIGHT / 2),
+                (WIDTH, HEIGHT), (WIDTH / 2, HEIGHT), (0, HEIGHT), (0, HEIGHT / 2)]
+WIDE_WEIGHTS = [1.0, 2.0, 1.0, 2.0, 1.0, 2.0, 1.0, 2.0]
+N_SAMPLES = 20000
+
+def legacy_solve(d1, d2, d3):
+    """Résolution telle qu'elle était faite avant le solveur précalculé"""
+    (x1, y1), (x2, y2), (x3, y3) = SENSORS
+    k1 = (x1*x1 + y1*y1 - d1*d1)
+    k2 = (x2*x2 + y2*y2 - d2*d2)
+    k3 = (x3*x3 + y3*y3 - d3*d3)
+    A = np.array([
+        [2*(x2-x1), 2*(y2-y1)],
+        [2*(x3-x1), 2*(y3-y1)]
+    ])
+    b = np.array([k2 - k1, k3 - k1])
+    if np.linalg.cond(A) > 1e10:
+        return None
+    x, y = np.linalg.lstsq(A, b, rcond=None)[0]
+    return x, y
+
+def simulated_distances(n, sensors=SENSORS):
+    rng = np.random.default_rng(42)
+    points = rng.uniform((0, 0), (WIDTH, HEIGHT), size=(n, 2))
+    sensors = np.array(sensors, dtype=float)
+    return np.linalg.norm(points[:, None, :] - sensors[None, :, :], axis=2)
+
+def lstsq_solve(distances, sensors, weights):
+    """Moindres carrés pondérés résolus à chaque mesure, sur les capteurs disponibles"""
+    available = ~np.isnan(distances)
+    p = np.asarray(sensors, dtype=float)[available]
+    w = np.sqrt(np.asarray(weights, dtype=float)[available])
+    d = distances[available]
+    A = np.column_stack((2 * p, -np.ones(len(p))))
+    b = (p * p).sum(axis=1) - d * d
+    return np.linalg.lstsq(A * w[:, None], b * w, rcond=None)[0][:2]
+
+def bench_wide():
+    """Huit capteurs, dont un ou deux hors de portée pour une mesure sur trois"""
+    rng = np.random.default_rng(7)
+    distances = simulated_distances(N_SAMPLES, WIDE_SENSORS)
+    distances += rng.normal(0, 0.05, distances.shape)
+    missing = rng.random(N_SAMPLES) < 1 / 3
+    distances[missing, rng.integers(0, 8, missing.sum())] = np.nan
+    distances[missing, rng.integers(0, 8, missing.sum())] = np.nan
+    samples = distances.tolist()
+    solver = TrilaterationSolver(WIDE_SENSORS, WIDE_WEIGHTS)
+
+    batch = solver.solve_batch(distances)
+    for i in range(1000):
+        x_ref, y_ref = lstsq_solve(distances[i], WIDE_SENSORS, WIDE_WEIGHTS)
+        x, y = solver.solve(samples[i])
+        assert abs(x - x_ref) < 1e-6 and abs(y - y_ref) < 1e-6
+        assert abs(batch[i, 0] - x_ref) < 1e-6 and abs(batch[i, 1] - y_ref) < 1e-6
+
+    def run_lstsq():
+        for row in distances[:2000]:
+            lstsq_solve(row, WIDE_SENSORS, WIDE_WEIGHTS)
+
+    def run_solver():
+        for sample in samples:
+            solver.solve(sample)
+
+    def run_batch():
+        solver.solve_batch(distances)
+
+    lstsq = min(timeit.repeat(run_lstsq, number=1, repeat=3)) / 2000
+    scalar = min(timeit.repeat(run_solver, number=1, repeat=5)) / N_SAMPLES
+    batch = min(timeit.repeat(run_batch, number=1, repeat=5)) / N_SAMPLES
+
+    print(f"8 capteurs, {missing.mean():.0%} des mesures incomplètes, {len(solver._factors)} sous-ensembles en cache")
+    print(f"lstsq à chaque mesure        : {lstsq * 1e6:8.3f} µs/mesure")
+    print(f"Solveur précalculé           : {scalar * 1e6:8.3f} µs/mesure  (x{lstsq / scalar:.0f})")
+    print(f"Solveur précalculé, par lot  : {batch * 1e6:8.3f} µs/mesure  (x{lstsq / batch:.0f})")
+
+def main():
+    distances = simulated_distances(N_SAMPLES)
+    samples = distances.tolist()
+    solver = TrilaterationSolver(SENSORS)
+
+    # Les deux méthodes doivent donner le même résultat
+    for d1, d2, d3 in samples[:1000]:
+        x_ref, y_ref = legacy_solve(d1, d2, d3)
+        x, y = solver.solve((d1, d2, d3))
+        assert abs(x - x_ref) < 1e-6 and abs(y - y_ref) < 1e-6
+
+    def run_legacy():
+        for d1, d2, d3 in samples:
+            legacy_solve(d1, d2, d3)
+
+    def run_solver():
+        for sample in samples:
+            solver.solve(sample)
+
+    def run_batch():
+        solver.solve_batch(distances)
+
+    legacy = min(timeit.repeat(run_legacy, number=1, repeat=3)) / N_SAMPLES
+    scalar = min(timeit.repeat(run_solver, number=1, repeat=5)) / N_SAMPLES
+    batch = min(timeit.repeat(run_batch, number=1, repeat=5)) / N_SAMPLES
+
+    print(f"Mesures : {N_SAMPLES}")
+    print(f"Ancienne résolution (lstsq)  : {legacy * 1e6:8.3f} µs/mesure")
+    print(f"Solveur précalculé           : {scalar * 1e6:8.3f} µs/mesure  (x{legacy / scalar:.0f})")
+    print(f"Solveur précalculé, par lot  : {batch * 1e6:8.3f} µs/mesure  (x{legacy / batch:.0f})")
+    print()
+    bench_wide()
+
+if __name__ == "__main__":
+    main()
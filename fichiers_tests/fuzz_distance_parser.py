@@ -0,0 +1,66 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from networking.distance_parser import parse_distances
+
+# Test aléatoire de DistanceParser : messages bien formés générés au hasard, puis
+# messages corrompus. L'analyse ne doit jamais lever d'exception et doit donner le
+# même résultat que l'ancienne analyse de MQTTClient.on_message, les identifiants étant
+# lus en hexadécimal comme le palet les écrit. Elle peut être plus stricte : un message
+# contenant deux fois le même capteur est rejeté.
+
+N_CASES = 50000
+ALPHABET = b"0123456789AaF.:;-+eEnif \x00\xff"
+
+def legacy_parse(payload: bytes):
+    """Analyse telle qu'elle était faite dans MQTTClient.on_message (identifiants en
+    hexadécimal), None si elle échoue"""
+    try:
+        data = payload.decode().split(";")
+        values = {int(item.split(":")[0], 16): float(item.split(":")[1]) for item in data}
+    except Exception:
+        return None
+    distances = (values.get(0x86), values.get(0x85), values.get(0x84))
+    return None if distances == (None, None, None) else distances
+
+def random_frame(rng: random.Random) -> bytes:
+    """Message bien formé : sous-ensemble des capteurs, ordre et précision aléatoires"""
+    ids = rng.sample(["84", "85", "86", "87", "8A"], rng.randint(1, 5))
+    items = [f"{anchor_id}:{rng.uniform(0, 50):.{rng.randint(0, 4)}f}" for anchor_id in ids]
+    return ";".join(items).encode()
+
+def mutate(rng: random.Random, payload: bytes) -> bytes:
+    data = bytearray(payload)
+    for _ in range(rng.randint(1, 3)):
+        operation = rng.randrange(3)
+        position = rng.randrange(len(data) + 1)
+        if operation == 0:
+            data.insert(position, rng.choice(ALPHABET))
+        elif operation == 1 and data:
+            del data[min(position, len(data) - 1)]
+        elif data:
+            data[min(position, len(data) - 1)] = rng.choice(ALPHABET)
+    return bytes(data)
+
+def main(seed: int = 0):
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(N_CASES):
+        frame = random_frame(rng)
+        result = parse_distances(frame)
+        assert result == legacy_parse(frame), (frame, result, legacy_parse(frame))
+
+        corrupted = mutate(rng, frame)
+        result = parse_distances(corrupted)  # Ne doit jamais lever d'exception
+        expected = legacy_parse(corrupted)
+        # Une distance acceptée doit toujours être celle que l'ancienne analyse aurait lue
+        if result is not None and expected is not None and result != expected:
+            mismatches += 1
+            print(f"Différence : {corrupted!r} -> {result} au lieu de {expected}")
+    assert mismatches == 0
+    print(f"{N_CASES} messages bien formés et {N_CASES} messages corrompus : OK")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
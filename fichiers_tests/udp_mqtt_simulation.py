@@ -1,8 +1,16 @@
+import argparse
+import os
 import socket
+import sys
+import threading
 import time
 import random
 import paho.mqtt.client as mqtt
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from networking.distance_parser import encode_binary_distances
+from networking.udp_ingest import INGEST_PORT
+
 # Configuration UDP
 UDP_PORT = 12345
 UDP_BROADCAST_IP = "255.255.255.255"
@@ -15,6 +23,11 @@ mqtt_server_ip = None
 mqtt_client = mqtt.Client(client_id="palet", callback_api_version=mqtt.CallbackAPIVersion.VERSION1)
 
 
+# Transport des distances : "mqtt", "udp" (message texte) ou "binary" (message binaire en UDP)
+transport = "mqtt"
+send_interval = 1.0
+ingest_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
 # Variables de contrôle
 ready_to_send_mqtt = False
 mqtt_sending_active = False
@@ -39,7 +52,8 @@ def request_mqtt_ip():
         response = data.decode("utf-8").strip()
         if response != "deconnect":
             mqtt_server_ip = response
-            mqtt_client.connect(mqtt_server_ip, MQTT_PORT)
+            if transport == "mqtt":
+                mqtt_client.connect(mqtt_server_ip, MQTT_PORT)
             ready_to_send_mqtt = True
             print(f"✅ MQTT IP configurée: {mqtt_server_ip}")
     except socket.timeout:
@@ -71,20 +85,39 @@ def handle_udp_commands():
             print("⏸ Signal d'arrêt reçu")
             mqtt_sending_active = False
 
-# Fonction pour générer des distances aléatoires et envoyer MQTT
+# Fonction pour générer des distances aléatoires et les envoyer
 def send_mqtt_data():
+    seq = 0
     while True:
         if mqtt_sending_active and ready_to_send_mqtt:
             for i in range(3):
                 lastDistances[i] = round(random.uniform(1.0, 5.0), 2)
             
-            message = f"{anchors[0]}:{lastDistances[0]};{anchors[1]}:{lastDistances[1]};{anchors[2]}:{lastDistances[2]}"
-            mqtt_client.publish(MQTT_TOPIC, message)
-            print(f"📡 Données envoyées: {message}")
-        time.sleep(1)
+            # Même format que le palet : identifiants des ancres en hexadécimal ("84:1.86;85:1.59;86:1.33")
+            message = f"{anchors[0]:02X}:{lastDistances[0]};{anchors[1]:02X}:{lastDistances[1]};{anchors[2]:02X}:{lastDistances[2]}"
+            if transport == "mqtt":
+                mqtt_client.publish(MQTT_TOPIC, message)
+            elif transport == "udp":
+                ingest_socket.sendto(message.encode(), (mqtt_server_ip, INGEST_PORT))
+            else:
+                # Le message binaire porte l'adresse courte des ancres (0x84)
+                pairs = list(zip(anchors, lastDistances))
+                ingest_socket.sendto(encode_binary_distances(seq, pairs), (mqtt_server_ip, INGEST_PORT))
+                seq += 1
+            print(f"📡 Données envoyées ({transport}): {message}")
+        time.sleep(send_interval)
 
 # Exécution du script
 if __name__ == "__main__":
-    request_mqtt_ip()
-    handle_udp_commands()
+    parser = argparse.ArgumentParser(description="Simulation du palet")
+    parser.add_argument("--udp", action="store_true", help="Envoyer les distances en UDP au lieu de MQTT")
+    parser.add_argument("--binary", action="store_true", help="Envoyer les distances en UDP au format binaire")
+    parser.add_argument("--rate", type=float, default=1.0, help="Nombre de messages par seconde")
+    args = parser.parse_args()
+    transport = "binary" if args.binary else "udp" if args.udp else "mqtt"
+    send_interval = 1.0 / args.rate
+
+    while not ready_to_send_mqtt:
+        request_mqtt_ip()
+    threading.Thread(target=handle_udp_commands, daemon=True).start()
     send_mqtt_data()
@@ -0,0 +1,51 @@
+import threading
+import time
+from PySide6.QtCore import QObject, QTimer, Signal, Slot, Qt
+
+class LatestValueBridge(QObject):
+    """Transmet au thread de l'interface la dernière valeur publiée par un autre thread.
+
+    push() peut être appelé depuis n'importe quel thread (réseau, calcul) : la valeur
+    remplace celle qui n'a pas encore été traitée. L'interface reçoit value_ready au plus
+    max_fps fois par seconde, toujours avec la valeur la plus récente, si bien que le
+    débit des mesures ne dépend plus du coût de l'affichage. Le pont doit être créé
+    dans le thread de l'interface.
+    """
+
+    value_ready = Signal(object)
+    _wake = Signal()
+
+    def __init__(self, max_fps: float = 60.0, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._latest = None
+        self._pending = False
+        self._interval = 1.0 / max_fps
+        self._last_drain = 0.0
+        self._wake.connect(self._schedule_drain, Qt.ConnectionType.QueuedConnection)
+
+    def push(self, value):
+        """Publie une nouvelle valeur (appelable depuis n'importe quel thread)"""
+        with self._lock:
+            self._latest = value
+            if self._pending:
+                return
+            self._pending = True
+        self._wake.emit()
+
+    @Slot()
+    def _schedule_drain(self):
+        delay = self._interval - (time.monotonic() - self._last_drain)
+        if delay > 0:
+            QTimer.singleShot(int(delay * 1000), self._drain)
+        else:
+            self._drain()
+
+    @Slot()
+    def _drain(self):
+        with self._lock:
+            value, self._latest = self._latest, None
+            self._pending = False
+        self._last_drain = time.monotonic()
+        if value is not None:
+            self.value_ready.emit(value)
@@ -1,5 +1,4 @@
 import sys
-import socket
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QLabel,
     QVBoxLayout, QWidget, QPushButton, QHBoxLayout,
@@ -7,13 +6,24 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Signal, QObject, Slot, Qt
 from gui.hockey_field import HockeyField
+from gui.frame_bridge import LatestValueBridge
 from gui.terrain_config import TerrainConfig, TerrainDimensionsDialog
-from networking.mqtt_client import MQTTClient
-from networking.udp_discovery import UDPDiscoveryServer
+from networking.udp_discovery import UDPDiscoveryServer, get_local_ip
+from networking.camera_output import CameraTracking
+from networking.network_core import get_network_core
+from networking.palet_position_sender import PositionSender
+from tracking.anchors import AnchorRegistry
+from tracking.kalman import create_filter
+from tracking.pipeline import TrackingPipeline
+from tracking.puck_position import PuckPositionCalculator
+from tracking.quality import FixQuality
 from match.match_mode import MatchMode
+from utils.logging_setup import configure_logging
+from utils.settings import Settings
 
 class SignalManager(QObject):
     esp32_discovered = Signal(str, str)  # device_name, mac_address
+    mqtt_connection_changed = Signal(bool)  # connected
 
 class ESPListItem(QWidget):
     def __init__(self, device_name, mac_address, parent=None):
@@ -42,15 +52,10 @@ class ESPListItem(QWidget):
         layout.addWidget(self.send_button)
 
 class RollerHockeyApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, settings: Settings = None):
         super().__init__()
-        # d1 qui correspond au capteur situé en bas au mileu (HG)
-        # d2 qui correspond au capteur situé en bas au mileu (HD)
-        # d3 qui correspond au capteur situé en bas au mileu (BM)
-        self.d1 = None
-        self.d2 = None
-        self.d3 = None
         self.setWindowTitle("Palet de Roller Hockey Connecté")
+        self.settings = settings or Settings()
         self.mqtt_client = None
         self.is_connected = False
         self.discovery_server = None
@@ -59,8 +64,35 @@ class RollerHockeyApp(QMainWindow):
         # Créer le gestionnaire de signaux
         self.signal_manager = SignalManager()
         self.signal_manager.esp32_discovered.connect(self.on_esp32_discovered)
+        self.signal_manager.mqtt_connection_changed.connect(self.connection_status_changed)
+        TerrainConfig().set_dimensions(self.settings.terrain.width, self.settings.terrain.height)
+
+        # Pipeline de suivi : les distances reçues par MQTT sont résolues dans son thread,
+        # puis chaque position est transmise à la caméra, à l'affichage et au mode match
+        self.anchor_registry = AnchorRegistry.from_settings(self.settings.anchors)
+        tracking = self.settings.tracking
+        calculator = PuckPositionCalculator(self.anchor_registry, tracking.refine_iterations)
+        self.tracking_pipeline = TrackingPipeline(
+            calculator, primary_tag=tracking.primary_tag,
+            tracking_filter=create_filter(tracking.filter, tracking.process_noise, tracking.measurement_noise),
+            quality=FixQuality(calculator, tracking.residual_scale, tracking.min_quality, tracking.max_speed)
+        )
+        camera = self.settings.camera
+        self.camera_tracking = CameraTracking(
+            camera.rate_hz, camera.deadband,
+            PositionSender(camera.host, camera.port, protocol=camera.protocol),
+            camera.lookahead
+        )
+        self.tracking_pipeline.subscribe(self.camera_tracking.on_fix)
+
+        # L'affichage ne reçoit que les dernières positions de tous les tags, au plus une
+        # fois par image affichée
+        self.position_bridge = LatestValueBridge(max_fps=60)
+        self.position_bridge.value_ready.connect(self.update_puck_position)
+        self.tracking_pipeline.subscribe_tags(self.position_bridge.push)
         
         self._init_ui()
+        self.tracking_pipeline.start()
         self._start_discovery_server()
         
     def _init_ui(self):
@@ -76,7 +108,7 @@ class RollerHockeyApp(QMainWindow):
         self.layout.addWidget(self.match_mode)
         
         # Terrain de hockey (maintenant en deuxième)
-        self.hockey_field = HockeyField()
+        self.hockey_field = HockeyField(self.anchor_registry)
         self.layout.addWidget(self.hockey_field)
         
         # Contrôles MQTT
@@ -90,6 +122,7 @@ class RollerHockeyApp(QMainWindow):
         camera_tracking_layout.setSpacing(5)  # Réduit l'espacement
         self.camera_tracking_checkbox = QCheckBox("Suivi caméra")
         self.camera_tracking_checkbox.stateChanged.connect(self._on_camera_tracking_changed)
+        self.camera_tracking_checkbox.setChecked(self.settings.camera.enabled)
         camera_tracking_layout.addWidget(self.camera_tracking_checkbox)
         camera_tracking_layout.addStretch()
         mqtt_layout.addLayout(camera_tracking_layout)
@@ -151,18 +184,13 @@ class RollerHockeyApp(QMainWindow):
             new_height = dialog.height_input.value()
             config.set_dimensions(new_width, new_height)
 
-    def update_puck_position(self, d1=None, d2=None, d3=None):
-        if d1 is not None:
-            self.d1 = d1
-        if d2 is not None:
-            self.d2 = d2
-        if d3 is not None:
-            self.d3 = d3
-        if self.d1 is not None and self.d2 is not None and self.d3 is not None:
-            try:
-                self.hockey_field.update_from_distances(self.d1, self.d2, self.d3)
-            except Exception as e:
-                print(f"Erreur lors de la mise à jour de la position du palet: {str(e)}")
+    @Slot(object)
+    def update_puck_position(self, snapshot):
+        """Affiche les dernières positions (TagPositions) calculées par le pipeline de suivi"""
+        try:
+            self.hockey_field.set_tag_positions(snapshot.tags, snapshot.positions, snapshot.primary)
+        except Exception as e:
+            print(f"Erreur lors de la mise à jour de la position du palet: {str(e)}")
 
     def update_message_area(self, message):
         """Mettre à jour la zone de message"""
@@ -184,28 +212,66 @@ class RollerHockeyApp(QMainWindow):
         self.discovery_server = UDPDiscoveryServer(discovery_callback)
         self.discovery_server.start()
 
-    @Slot(str, str)
+    def _create_mqtt_client(self):
+        """Crée le client MQTT, ou le serveur de réception UDP selon la configuration.
+
+        Leurs callbacks sont appelés depuis leur thread réseau.
+        """
+        if self.settings.ingest.transport == "udp":
+            from networking.udp_ingest import UDPIngestServer
+            return UDPIngestServer(
+                message_callback=self.tracking_pipeline.submit,
+                connection_callback=self.signal_manager.mqtt_connection_changed.emit,
+                port=self.settings.ingest.udp_port,
+                anchor_ids=self.settings.anchors.ids
+            )
+        # Import différé : paho n'est chargé qu'au démarrage du suivi
+        from networking.mqtt_client import MQTTClient
+        mqtt_settings = self.settings.mqtt
+        return MQTTClient(
+            message_callback=self.tracking_pipeline.submit,
+            connection_callback=self.signal_manager.mqtt_connection_changed.emit,
+            broker_host=mqtt_settings.host,
+            broker_port=mqtt_settings.port,
+            manage_broker=mqtt_settings.manage_broker,
+            anchor_ids=self.settings.anchors.ids,
+            broker=mqtt_settings.broker
+        )
 
     def start_mqtt(self):
         """Démarrer le client MQTT"""
         try:
             if self.mqtt_client is None:
-                self.mqtt_client = MQTTClient(
-                    message_callback=self.update_puck_position,
-                    connection_callback=self.connection_status_changed
-                )
-                self.mqtt_client.start_mosquitto()
-                self.mqtt_client.start_mqtt()
+                self.mqtt_client = self._create_mqtt_client()
+                self.mqtt_client.start()
         except Exception as e:
             self.show_error("Erreur de démarrage", f"Impossible de démarrer le client MQTT: {str(e)}")
             self.mqtt_client = None
             self.connection_status_changed(False)
 
+    def pause_mqtt(self, unsubscribe: bool = False):
+        """Suspend la réception des mesures sans arrêter le broker ni la session MQTT"""
+        if self.mqtt_client:
+            try:
+                self.mqtt_client.pause(unsubscribe)
+            except Exception as e:
+                self.show_error("Erreur de pause", f"Impossible de suspendre le client MQTT: {str(e)}")
+
+    def resume_mqtt(self):
+        """Reprend la réception des mesures, ou démarre le client MQTT s'il n'est pas actif"""
+        if self.mqtt_client is None:
+            self.start_mqtt()
+            return
+        try:
+            self.mqtt_client.resume()
+        except Exception as e:
+            self.show_error("Erreur de reprise", f"Impossible de reprendre le client MQTT: {str(e)}")
+
     def stop_mqtt(self):
         """Arrêter le client MQTT"""
         if self.mqtt_client:
             try:
-                self.mqtt_client.stop_mqtt()
+                self.mqtt_client.stop()
                 self.mqtt_client = None
                 self.connection_status_changed(False)
             except Exception as e:
@@ -256,12 +322,7 @@ class RollerHockeyApp(QMainWindow):
             esp_widget = self.esp_widgets[device_id]
             
             if should_connect:
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                try:
-                    s.connect(('8.8.8.8', 80))
-                    local_ip = s.getsockname()[0]
-                finally:
-                    s.close()
+                local_ip = get_local_ip()
 
                 if self.discovery_server.send_response(device_id, local_ip):
                     esp_widget.is_connected = True
@@ -286,11 +347,8 @@ class RollerHockeyApp(QMainWindow):
             
             if should_send:
                 if self.mqtt_client is None:
-                    self.mqtt_client = MQTTClient(
-                        message_callback=self.update_puck_position,
-                        connection_callback=self.connection_status_changed
-                    )
-                    self.mqtt_client.start_mqtt()
+                    self.mqtt_client = self._create_mqtt_client()
+                    self.mqtt_client.start()
                 
                 self.discovery_server.send_response(device_id, "start")  # Envoi de "start"
                 esp_widget.is_sending = True
@@ -312,6 +370,10 @@ class RollerHockeyApp(QMainWindow):
                 self.stop_mqtt()
             if self.discovery_server:
                 self.discovery_server.stop()
+            self.camera_tracking.set_enabled(False)
+            self.match_mode.stop_recording()
+            self.tracking_pipeline.stop()
+            get_network_core().stop()
             event.accept()
         except Exception as e:
             self.show_error("Erreur de fermeture", f"Erreur lors de la fermeture de l'application: {str(e)}")
@@ -320,9 +382,10 @@ class RollerHockeyApp(QMainWindow):
     def _on_camera_tracking_changed(self, state):
         """Gère le changement d'état de la case à cocher du suivi caméra"""
         is_enabled = state == Qt.CheckState.Checked.value
-        self.hockey_field.position_calculator.set_camera_tracking(is_enabled)
+        self.camera_tracking.set_enabled(is_enabled)
 
 if __name__ == "__main__":
+    configure_logging()
     app = QApplication(sys.argv)
     # Application du style
     app.setStyle("Fusion")
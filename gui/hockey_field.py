@@ -1,24 +1,25 @@
 from PySide6.QtWidgets import QWidget
 from PySide6.QtCore import QRect
 from PySide6.QtGui import QPainter, QPen, QColor, QBrush
-from tracking.puck_position import PuckPositionCalculator
 from gui.terrain_config import TerrainConfig
+from tracking.anchors import AnchorRegistry
 
 class HockeyField(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, anchors: AnchorRegistry = None, parent=None):
         super().__init__(parent)
+        self.anchor_registry = anchors or AnchorRegistry()
         self.config = TerrainConfig()
         self.config.add_observer(self)
         # Marges en pixels pour le dessin
         self.margin = 9
         
-        # Initialisation du calculateur de position
-        self.position_calculator = PuckPositionCalculator()
-
         # Position du palet en mètres
         self.puck_x = self.config.center_x
         self.puck_y = self.config.center_y
         
+        # Autres tags suivis (palets d'entraînement, joueurs...) : liste de (tag, x, y)
+        self.other_tags = []
+        
         # Taille du palet
         self.puck_size = 0.5 * (self.config.width / 40.0)
         
@@ -35,11 +36,9 @@ class HockeyField(QWidget):
         return min(scale_x, scale_y)
 
     def _update_sensors(self):
-        self.sensors = [
-            (0, self.config.height),               # Capteur 1: haut gauche
-            (self.config.width, self.config.height), # Capteur 2: haut droite
-            (self.config.center_x, 0)              # Capteur 3: bas milieu
-        ]
+        # Par défaut : capteur 1 en haut à gauche, capteur 2 en haut à droite, capteur 3 en bas au milieu
+        self.sensors = [(anchor.x, anchor.y)
+                        for anchor in self.anchor_registry.anchors(self.config.width, self.config.height)]
 
     def on_terrain_dimensions_changed(self, width, height):
         self._update_sensors()
@@ -48,27 +47,26 @@ class HockeyField(QWidget):
         self.puck_size = 0.5 * (width / 40.0)
         self.update()
 
-    def update_from_distances(self, d1: float, d2: float, d3: float):
-        """Met à jour la position du palet à partir des distances des capteurs"""
-        if self.position_calculator.validate_distances(d1, d2, d3):
-            position = self.position_calculator.calculate_position(d1, d2, d3)
-            if position:
-                x, y = position
-                self.set_puck_position(x, y)
-                return True
-        return False
-
     def set_puck_position(self, x: float, y: float):
         """Met à jour la position du palet (en mètres)"""
         self.puck_x = x
         self.puck_y = y
-
-        # Notifier le callback si présent
-        if hasattr(self, 'position_callback') and self.position_callback:
-            self.position_callback(x, y)
-
         self.update()  # Redessiner le widget
 
+    def set_tag_positions(self, tags, positions, primary: str):
+        """Met à jour la position de tous les tags suivis (en mètres), le tag principal étant le palet"""
+        other_tags = []
+        for tag, (x, y) in zip(tags, positions.tolist()):
+            if x != x:  # NaN : tag sans position calculée
+                continue
+            if tag == primary:
+                self.puck_x = x
+                self.puck_y = y
+            else:
+                other_tags.append((tag, x, y))
+        self.other_tags = other_tags
+        self.update()
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
@@ -125,10 +123,24 @@ class HockeyField(QWidget):
                 sensor_size
             )
         
+        # Dessiner les autres tags (bleu, avec leur identifiant)
+        puck_pixel_size = self.puck_size * scale
+        painter.setBrush(QBrush(QColor(0, 90, 200)))
+        painter.setPen(QPen(QColor(0, 90, 200), 1))
+        for tag, tag_x, tag_y in self.other_tags:
+            tag_pixel_x = x + tag_x * scale
+            tag_pixel_y = y + (self.config.height - tag_y) * scale  # Inversion de Y
+            painter.drawEllipse(
+                int(tag_pixel_x - puck_pixel_size/2),
+                int(tag_pixel_y - puck_pixel_size/2),
+                int(puck_pixel_size),
+                int(puck_pixel_size)
+            )
+            painter.drawText(int(tag_pixel_x + puck_pixel_size/2 + 2), int(tag_pixel_y), tag)
+        
         # Dessiner le palet
         puck_pixel_x = x + self.puck_x * scale
         puck_pixel_y = y + (self.config.height - self.puck_y) * scale  # Inversion de Y
-        puck_pixel_size = self.puck_size * scale
         
         painter.setBrush(QBrush(QColor(0, 0, 0)))  # Noir
         painter.setPen(QPen(QColor(0, 0, 0), 1))
@@ -1,4 +1,6 @@
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QDoubleSpinBox, QPushButton
+# TerrainConfig ne dépend pas de Qt : il est partagé avec le suivi, qui peut tourner sans interface
+from tracking.terrain import TerrainConfig
 
 class TerrainDimensionsDialog(QDialog):
     def __init__(self, current_width: float, current_height: float, parent=None):
@@ -42,38 +44,3 @@ class TerrainDimensionsDialog(QDialog):
         # Connexions
         self.ok_button.clicked.connect(self.accept)
         self.cancel_button.clicked.connect(self.reject)
-
-
-class TerrainConfig:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(TerrainConfig, cls).__new__(cls)
-            cls._instance._init()
-        return cls._instance
-    
-    def _init(self):
-        self.width = 40.0
-        self.height = 20.0
-        self.observers = []
-    
-    def set_dimensions(self, width: float, height: float):
-        self.width = width
-        self.height = height
-        self._notify_observers()
-    
-    def add_observer(self, observer):
-        self.observers.append(observer)
-    
-    def _notify_observers(self):
-        for observer in self.observers:
-            observer.on_terrain_dimensions_changed(self.width, self.height)
-
-    @property
-    def center_x(self):
-        return self.width / 2
-
-    @property
-    def center_y(self):
-        return self.height / 2
\ No newline at end of file
@@ -0,0 +1,123 @@
+import argparse
+import signal
+import sys
+import threading
+from networking.camera_output import CameraTracking
+from networking.mqtt_client import MQTTClient
+from networking.network_core import get_network_core
+from networking.palet_position_sender import PositionSender
+from networking.udp_discovery import UDPDiscoveryServer, get_local_ip
+from networking.udp_ingest import UDPIngestServer
+from tracking.anchors import AnchorRegistry
+from tracking.kalman import create_filter
+from tracking.pipeline import TrackingPipeline
+from tracking.puck_position import PuckPositionCalculator
+from tracking.quality import FixQuality
+from tracking.terrain import TerrainConfig
+from utils.logging_setup import configure_logging, get_logger
+from utils.settings import load_settings
+
+# Serveur de suivi sans interface : découverte du palet, réception MQTT, trilatération
+# et envoi des positions à la caméra, sans charger PySide6.
+
+logger = get_logger("headless")
+
+class HeadlessTracker:
+    def __init__(self, settings):
+        self.settings = settings
+        TerrainConfig().set_dimensions(settings.terrain.width, settings.terrain.height)
+
+        tracking = settings.tracking
+        calculator = PuckPositionCalculator(AnchorRegistry.from_settings(settings.anchors),
+                                            tracking.refine_iterations)
+        self.pipeline = TrackingPipeline(
+            calculator, primary_tag=tracking.primary_tag,
+            tracking_filter=create_filter(tracking.filter, tracking.process_noise, tracking.measurement_noise),
+            quality=FixQuality(calculator, tracking.residual_scale, tracking.min_quality, tracking.max_speed)
+        )
+        camera = settings.camera
+        self.camera_tracking = CameraTracking(
+            camera.rate_hz, camera.deadband,
+            PositionSender(camera.host, camera.port, protocol=camera.protocol),
+            camera.lookahead
+        )
+        self.pipeline.subscribe(self.camera_tracking.on_fix)
+
+        # Les distances arrivent soit par MQTT, soit directement en UDP
+        if settings.ingest.transport == "udp":
+            self.ingest = UDPIngestServer(
+                message_callback=self.pipeline.submit,
+                connection_callback=self._on_connection_changed,
+                port=settings.ingest.udp_port,
+                anchor_ids=settings.anchors.ids
+            )
+        else:
+            self.ingest = MQTTClient(
+                message_callback=self.pipeline.submit,
+                connection_callback=self._on_connection_changed,
+                broker_host=settings.mqtt.host,
+                broker_port=settings.mqtt.port,
+                manage_broker=settings.mqtt.manage_broker,
+                broker=settings.mqtt.broker,
+                anchor_ids=settings.anchors.ids
+            )
+        self.discovery_server = UDPDiscoveryServer(self._on_puck_discovered)
+
+    def start(self):
+        self.pipeline.start()
+        self.camera_tracking.set_enabled(self.settings.camera.enabled)
+        self.ingest.start()
+        self.discovery_server.start()
+        logger.info("Suivi démarré, en attente du palet")
+
+    def stop(self):
+        self.discovery_server.stop()
+        self.ingest.stop()
+        self.camera_tracking.set_enabled(False)
+        self.pipeline.stop()
+        get_network_core().stop()
+        logger.info("Suivi arrêté")
+
+    def _on_connection_changed(self, connected: bool):
+        if self.settings.ingest.transport == "udp":
+            logger.info("Réception UDP %s", "active" if connected else "arrêtée")
+        else:
+            logger.info("Broker MQTT %s", "connecté" if connected else "déconnecté")
+
+    def _on_puck_discovered(self, device_name: str, device_id: str):
+        """Sans interface, le palet découvert est connecté au broker et démarré automatiquement"""
+        broker_ip = self.settings.mqtt.host
+        if broker_ip in ("localhost", "127.0.0.1"):
+            broker_ip = get_local_ip()
+        logger.info("Palet découvert : %s, broker %s", device_name, broker_ip)
+        if self.discovery_server.send_response(device_id, broker_ip):
+            self.discovery_server.send_response(device_id, "start")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suivi du palet sans interface graphique")
+    parser.add_argument("-c", "--config", help="Fichier de configuration JSON (voir pucktracker.example.json)")
+    parser.add_argument("--log-level", help="Niveau de log (DEBUG, INFO, WARNING...)")
+    args = parser.parse_args(argv)
+
+    settings = load_settings(args.config)
+    configure_logging(args.log_level or settings.log_level)
+
+    tracker = HeadlessTracker(settings)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    try:
+        tracker.start()
+    except Exception as e:
+        logger.error("Impossible de démarrer le suivi : %s", e)
+        tracker.stop()
+        return 1
+    try:
+        stop_event.wait()
+    finally:
+        tracker.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,43 @@
+import argparse
 import sys
-from PySide6.QtWidgets import QApplication
-from gui.gui import RollerHockeyApp
+from utils.startup import StartupProfiler
+
+def main():
+    profiler = StartupProfiler()
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("-c", "--config", help="Fichier de configuration JSON (voir pucktracker.example.json)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Affiche la durée de chaque phase du démarrage")
+    parser.add_argument("--quit-after-startup", action="store_true",
+                        help="Quitte dès que la fenêtre est affichée (mesure du démarrage)")
+    args, qt_args = parser.parse_known_args()
+
+    with profiler.phase("import PySide6"):
+        from PySide6.QtWidgets import QApplication
+        from PySide6.QtCore import QTimer
+    with profiler.phase("import gui"):
+        from gui.gui import RollerHockeyApp
+        from utils.logging_setup import configure_logging
+        from utils.settings import load_settings
+
+    settings = load_settings(args.config)
+    configure_logging(settings.log_level if args.config else None)
+    with profiler.phase("QApplication"):
+        app = QApplication(sys.argv[:1] + qt_args)  # Créer l'instance QApplication en premier
+    with profiler.phase("fenêtre principale"):
+        window = RollerHockeyApp(settings)
+        window.show()
+
+    def on_first_event_loop():
+        profiler.mark("boucle d'événements")
+        if args.startup_report:
+            profiler.print_report()
+        if args.quit_after_startup:
+            window.close()
+            app.quit()
+
+    QTimer.singleShot(0, on_first_event_loop)
+    return app.exec()
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)  # Créer l'instance QApplication en premier
-    window = RollerHockeyApp()
-    window.show()
-    sys.exit(app.exec())
+    sys.exit(main())
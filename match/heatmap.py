@@ -0,0 +1,219 @@
+import numpy as np
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QDialog
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QPainter, QPen, QColor, QBrush, QLinearGradient
+
+# Influence gaussienne exp(-0.3·d²) de chaque position, sur un rayon de 5 cellules
+INFLUENCE_RADIUS = 5
+_KERNEL = np.exp(-0.3 * np.arange(-INFLUENCE_RADIUS, INFLUENCE_RADIUS + 1) ** 2)
+
+def accumulate_heatmap(positions, width: float, height: float, cols: int, rows: int) -> np.ndarray:
+    """Grille (rows, cols) de fréquence de passage, normalisée à 1.
+
+    Les positions sont comptées par cellule (bincount), puis la grille est lissée par le
+    noyau gaussien, séparable : une convolution des lignes puis une des colonnes, de coût
+    indépendant du nombre de positions. Le noyau couvre le carré de 11 x 11 cellules
+    plutôt que le disque de rayon 5 : dans les coins du carré, une position pèse au plus
+    exp(-0.3·26) ≈ 4e-4 au lieu de 0.
+    """
+    grid = np.zeros((rows, cols))
+    positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+    positions = positions[np.isfinite(positions).all(axis=1)]
+    if not len(positions):
+        return grid
+
+    # Cellule de chaque position, positions hors du terrain ramenées au bord
+    x = np.clip(positions[:, 0], 0, width)
+    y = np.clip(positions[:, 1], 0, height)
+    grid_x = (x / width * (cols - 1)).astype(np.intp)
+    grid_y = (y / height * (rows - 1)).astype(np.intp)
+    counts = np.bincount(grid_y * cols + grid_x, minlength=rows * cols).reshape(rows, cols)
+
+    # Convolution séparable, l'influence au-delà des bords du terrain est perdue
+    r = INFLUENCE_RADIUS
+    padded = np.pad(counts.astype(float), ((0, 0), (r, r)))
+    for k, weight in enumerate(_KERNEL):
+        grid += weight * padded[:, k:k + cols]
+    padded = np.pad(grid, ((r, r), (0, 0)))
+    grid = np.zeros((rows, cols))
+    for k, weight in enumerate(_KERNEL):
+        grid += weight * padded[k:k + rows, :]
+
+    # Normaliser la grille
+    peak = grid.max()
+    if peak > 0:
+        grid /= peak
+    return grid
+
+class HockeyFieldHeatmap(QWidget):
+    def __init__(self, positions, parent=None):
+        super().__init__(parent)
+        self.positions = positions
+        self.setMinimumSize(600, 400)
+        
+        # Dimensions réelles du terrain en mètres
+        self.real_width = 40.0
+        self.real_height = 20.0
+        self.margin = 20
+        
+        # Créer une grille pour la heatmap
+        self.grid_cols = 80  # Une cellule tous les 0.5 mètres
+        self.grid_rows = 40
+        self.intensity_grid = np.zeros((self.grid_rows, self.grid_cols))
+        
+        # Calculer la heatmap
+        self._calculate_heatmap()
+
+    def _calculate_heatmap(self):
+        self.intensity_grid = accumulate_heatmap(self.positions, self.real_width, self.real_height,
+                                                 self.grid_cols, self.grid_rows)
+
+    def get_color(self, value):
+        if value == 0:
+            return QColor(0, 0, 0, 0)
+        
+        colors = [
+            (0.0, QColor(0, 0, 255, 100)),     # Bleu plus transparent
+            (0.3, QColor(0, 255, 0, 130)),     # Vert
+            (0.6, QColor(255, 255, 0, 160)),   # Jaune
+            (0.8, QColor(255, 128, 0, 180)),   # Orange
+            (1.0, QColor(255, 0, 0, 200))      # Rouge
+        ]
+        
+        for i in range(len(colors)-1):
+            if colors[i][0] <= value <= colors[i+1][0]:
+                t = (value - colors[i][0]) / (colors[i+1][0] - colors[i][0])
+                c1 = colors[i][1]
+                c2 = colors[i+1][1]
+                
+                return QColor(
+                    int(c1.red() * (1-t) + c2.red() * t),
+                    int(c1.green() * (1-t) + c2.green() * t),
+                    int(c1.blue() * (1-t) + c2.blue() * t),
+                    int(c1.alpha() * (1-t) + c2.alpha() * t)
+                )
+        return colors[-1][1]
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        
+        # Calculer l'échelle
+        scale_x = (self.width() - 2 * self.margin) / self.real_width
+        scale_y = (self.height() - 2 * self.margin) / self.real_height
+        scale = min(scale_x, scale_y)
+        
+        # Dimensions et position du terrain en pixels
+        field_width = self.real_width * scale
+        field_height = self.real_height * scale
+        x = (self.width() - field_width) / 2
+        y = (self.height() - field_height) / 2
+        
+        # Dessiner les éléments du terrain d'abord
+        self._draw_field_base(painter, x, y, field_width, field_height)
+        
+        # Appliquer le clipping avant de dessiner la heatmap
+        painter.setClipRect(int(x), int(y), int(field_width), int(field_height))
+        
+        # Dessiner la heatmap
+        cell_width = field_width / self.grid_cols
+        cell_height = field_height / self.grid_rows
+        
+        # Parcourir la grille pour dessiner la heatmap
+        for i in range(self.grid_rows):
+            for j in range(self.grid_cols):
+                value = self.intensity_grid[i, j]
+                if value > 0.05:  # Seuil minimum pour éviter le bruit
+                    color = self.get_color(value)
+                    painter.setBrush(QBrush(color))
+                    painter.setPen(Qt.PenStyle.NoPen)
+                    
+                    rect_x = x + (j * cell_width)
+                    rect_y = y + (i * cell_height)
+                    # Taille plus grande pour assurer le chevauchement et la fluidité
+                    painter.drawEllipse(
+                        int(rect_x - cell_width/2),
+                        int(rect_y - cell_height/2),
+                        int(cell_width * 2),
+                        int(cell_height * 2)
+                    )
+        
+        # Désactiver le clipping
+        painter.setClipping(False)
+        
+        # Redessiner les bordures du terrain
+        self._draw_field_borders(painter, x, y, field_width, field_height, scale)
+        
+        # Dessiner la légende
+        self._draw_legend(painter)
+
+    def _draw_field_base(self, painter, x, y, field_width, field_height):
+        # Fond blanc du terrain
+        painter.setBrush(QBrush(Qt.GlobalColor.white))
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.drawRect(int(x), int(y), int(field_width), int(field_height))
+
+    def _draw_field_borders(self, painter, x, y, field_width, field_height, scale):
+        painter.setPen(QPen(QColor(0, 0, 0), 2))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        
+        # Rectangle principal
+        painter.drawRect(int(x), int(y), int(field_width), int(field_height))
+        
+        # Ligne centrale
+        center_x = x + field_width / 2
+        painter.drawLine(int(center_x), int(y), int(center_x), int(y + field_height))
+        
+        # Cercle central
+        circle_diameter = 9 * (self.real_width / 40.0) * scale
+        circle_x = center_x - circle_diameter / 2
+        circle_y = y + (field_height - circle_diameter) / 2
+        painter.drawEllipse(int(circle_x), int(circle_y), int(circle_diameter), int(circle_diameter))
+        
+        # Zones de but
+        goal_width = 5.5 * (self.real_width / 40.0) * scale
+        goal_height = 4.5 * (self.real_width / 40.0) * scale
+        painter.drawRect(int(x), int(y + (field_height - goal_height) / 2), 
+                        int(goal_width), int(goal_height))
+        painter.drawRect(int(x + field_width - goal_width), int(y + (field_height - goal_height) / 2),
+                        int(goal_width), int(goal_height))
+
+    def _draw_legend(self, painter):
+        legend_width = 200
+        legend_height = 20
+        legend_x = self.width() - legend_width - 20
+        legend_y = self.height() - legend_height - 20
+        
+        gradient = QLinearGradient(legend_x, 0, legend_x + legend_width, 0)
+        gradient.setColorAt(0.0, QColor(0, 0, 255, 100))
+        gradient.setColorAt(0.3, QColor(0, 255, 0, 130))
+        gradient.setColorAt(0.6, QColor(255, 255, 0, 160))
+        gradient.setColorAt(0.8, QColor(255, 128, 0, 180))
+        gradient.setColorAt(1.0, QColor(255, 0, 0, 200))
+        
+        painter.fillRect(legend_x, legend_y, legend_width, legend_height, gradient)
+        painter.drawRect(legend_x, legend_y, legend_width, legend_height)
+        
+        painter.drawText(legend_x, legend_y - 5, "Fréquence de passage")
+        painter.drawText(legend_x, legend_y + legend_height + 15, "Faible")
+        painter.drawText(legend_x + legend_width - 40, legend_y + legend_height + 15, "Élevé")
+
+class HeatmapDialog(QDialog):
+    def __init__(self, positions, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Heatmap du Match")
+        self.setModal(True)
+        self.resize(800, 600)
+        
+        layout = QVBoxLayout()
+        
+        # Création du widget de heatmap
+        self.heatmap_widget = HockeyFieldHeatmap(positions)
+        layout.addWidget(self.heatmap_widget)
+        
+        # Bouton fermer
+        close_button = QPushButton("Fermer")
+        close_button.clicked.connect(self.close)
+        layout.addWidget(close_button)
+        
+        self.setLayout(layout)
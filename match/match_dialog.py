@@ -0,0 +1,51 @@
+from PySide6.QtWidgets import (
+    QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QSpinBox, QDialog
+)
+
+class MatchConfigDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Configuration du Match")
+        self.setModal(True)
+        
+        layout = QVBoxLayout()
+        
+        # Équipe 1
+        team1_layout = QHBoxLayout()
+        team1_label = QLabel("Équipe 1:")
+        self.team1_input = QLineEdit()
+        team1_layout.addWidget(team1_label)
+        team1_layout.addWidget(self.team1_input)
+        layout.addLayout(team1_layout)
+        
+        # Équipe 2
+        team2_layout = QHBoxLayout()
+        team2_label = QLabel("Équipe 2:")
+        self.team2_input = QLineEdit()
+        team2_layout.addWidget(team2_label)
+        team2_layout.addWidget(self.team2_input)
+        layout.addLayout(team2_layout)
+        
+        # Durée du match
+        duration_layout = QHBoxLayout()
+        duration_label = QLabel("Durée (minutes):")
+        self.duration_input = QSpinBox()
+        self.duration_input.setRange(1, 60)
+        self.duration_input.setValue(20)  # Valeur par défaut
+        duration_layout.addWidget(duration_label)
+        duration_layout.addWidget(self.duration_input)
+        layout.addLayout(duration_layout)
+        
+        # Boutons
+        button_layout = QHBoxLayout()
+        self.ok_button = QPushButton("OK")
+        self.cancel_button = QPushButton("Annuler")
+        button_layout.addWidget(self.ok_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+        
+        # Connexions
+        self.ok_button.clicked.connect(self.accept)
+        self.cancel_button.clicked.connect(self.reject)
@@ -1,263 +1,13 @@
-import numpy as np
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-    QLineEdit, QPushButton, QSpinBox, QDialog, QSizePolicy,QMessageBox
+    QPushButton, QSizePolicy, QMessageBox
 )
 from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QPainter, QPen, QColor, QBrush, QLinearGradient
+from utils.logging_setup import get_logger
+# La boîte de configuration, l'enregistreur et la heatmap (NumPy) ne sont chargés qu'à
+# leur première utilisation
 
-class MatchConfigDialog(QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Configuration du Match")
-        self.setModal(True)
-        
-        layout = QVBoxLayout()
-        
-        # Équipe 1
-        team1_layout = QHBoxLayout()
-        team1_label = QLabel("Équipe 1:")
-        self.team1_input = QLineEdit()
-        team1_layout.addWidget(team1_label)
-        team1_layout.addWidget(self.team1_input)
-        layout.addLayout(team1_layout)
-        
-        # Équipe 2
-        team2_layout = QHBoxLayout()
-        team2_label = QLabel("Équipe 2:")
-        self.team2_input = QLineEdit()
-        team2_layout.addWidget(team2_label)
-        team2_layout.addWidget(self.team2_input)
-        layout.addLayout(team2_layout)
-        
-        # Durée du match
-        duration_layout = QHBoxLayout()
-        duration_label = QLabel("Durée (minutes):")
-        self.duration_input = QSpinBox()
-        self.duration_input.setRange(1, 60)
-        self.duration_input.setValue(20)  # Valeur par défaut
-        duration_layout.addWidget(duration_label)
-        duration_layout.addWidget(self.duration_input)
-        layout.addLayout(duration_layout)
-        
-        # Boutons
-        button_layout = QHBoxLayout()
-        self.ok_button = QPushButton("OK")
-        self.cancel_button = QPushButton("Annuler")
-        button_layout.addWidget(self.ok_button)
-        button_layout.addWidget(self.cancel_button)
-        layout.addLayout(button_layout)
-        
-        self.setLayout(layout)
-        
-        # Connexions
-        self.ok_button.clicked.connect(self.accept)
-        self.cancel_button.clicked.connect(self.reject)
-
-class HockeyFieldHeatmap(QWidget):
-    def __init__(self, positions, parent=None):
-        super().__init__(parent)
-        self.positions = positions
-        self.setMinimumSize(600, 400)
-        
-        # Dimensions réelles du terrain en mètres
-        self.real_width = 40.0
-        self.real_height = 20.0
-        self.margin = 20
-        
-        # Créer une grille pour la heatmap
-        self.grid_cols = 80  # Une cellule tous les 0.5 mètres
-        self.grid_rows = 40
-        self.intensity_grid = np.zeros((self.grid_rows, self.grid_cols))
-        
-        # Calculer la heatmap
-        self._calculate_heatmap()
-
-    def _calculate_heatmap(self):
-        if len(self.positions) > 0:
-            positions = np.array(self.positions)
-            
-            # Pour chaque position, calculer son influence sur la grille
-            for x, y in positions:
-                # S'assurer que x et y sont dans les limites
-                x = max(0, min(x, self.real_width))
-                y = max(0, min(y, self.real_height))
-                
-                # Convertir les coordonnées en indices de grille
-                grid_x = int((x / self.real_width) * (self.grid_cols - 1))
-                grid_y = int((y / self.real_height) * (self.grid_rows - 1))
-                
-                # Rayon d'influence en cellules
-                influence_radius = 5
-                
-                # Appliquer une influence gaussienne autour du point
-                for dy in range(-influence_radius, influence_radius + 1):
-                    for dx in range(-influence_radius, influence_radius + 1):
-                        nx = grid_x + dx
-                        ny = grid_y + dy
-                        
-                        # Vérifier les limites avant d'accéder à la grille
-                        if 0 <= nx < self.grid_cols and 0 <= ny < self.grid_rows:
-                            # Calculer la distance au point en unités de grille
-                            distance = np.sqrt(dx*dx + dy*dy)
-                            # Influence gaussienne qui diminue avec la distance
-                            if distance <= influence_radius:
-                                intensity = np.exp(-0.3 * (distance * distance))
-                                self.intensity_grid[ny, nx] += intensity
-            
-            # Normaliser la grille
-            if self.intensity_grid.max() > 0:
-                self.intensity_grid = self.intensity_grid / self.intensity_grid.max()
-
-    def get_color(self, value):
-        if value == 0:
-            return QColor(0, 0, 0, 0)
-        
-        colors = [
-            (0.0, QColor(0, 0, 255, 100)),     # Bleu plus transparent
-            (0.3, QColor(0, 255, 0, 130)),     # Vert
-            (0.6, QColor(255, 255, 0, 160)),   # Jaune
-            (0.8, QColor(255, 128, 0, 180)),   # Orange
-            (1.0, QColor(255, 0, 0, 200))      # Rouge
-        ]
-        
-        for i in range(len(colors)-1):
-            if colors[i][0] <= value <= colors[i+1][0]:
-                t = (value - colors[i][0]) / (colors[i+1][0] - colors[i][0])
-                c1 = colors[i][1]
-                c2 = colors[i+1][1]
-                
-                return QColor(
-                    int(c1.red() * (1-t) + c2.red() * t),
-                    int(c1.green() * (1-t) + c2.green() * t),
-                    int(c1.blue() * (1-t) + c2.blue() * t),
-                    int(c1.alpha() * (1-t) + c2.alpha() * t)
-                )
-        return colors[-1][1]
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        # Calculer l'échelle
-        scale_x = (self.width() - 2 * self.margin) / self.real_width
-        scale_y = (self.height() - 2 * self.margin) / self.real_height
-        scale = min(scale_x, scale_y)
-        
-        # Dimensions et position du terrain en pixels
-        field_width = self.real_width * scale
-        field_height = self.real_height * scale
-        x = (self.width() - field_width) / 2
-        y = (self.height() - field_height) / 2
-        
-        # Dessiner les éléments du terrain d'abord
-        self._draw_field_base(painter, x, y, field_width, field_height)
-        
-        # Appliquer le clipping avant de dessiner la heatmap
-        painter.setClipRect(int(x), int(y), int(field_width), int(field_height))
-        
-        # Dessiner la heatmap
-        cell_width = field_width / self.grid_cols
-        cell_height = field_height / self.grid_rows
-        
-        # Parcourir la grille pour dessiner la heatmap
-        for i in range(self.grid_rows):
-            for j in range(self.grid_cols):
-                value = self.intensity_grid[i, j]
-                if value > 0.05:  # Seuil minimum pour éviter le bruit
-                    color = self.get_color(value)
-                    painter.setBrush(QBrush(color))
-                    painter.setPen(Qt.PenStyle.NoPen)
-                    
-                    rect_x = x + (j * cell_width)
-                    rect_y = y + (i * cell_height)
-                    # Taille plus grande pour assurer le chevauchement et la fluidité
-                    painter.drawEllipse(
-                        int(rect_x - cell_width/2),
-                        int(rect_y - cell_height/2),
-                        int(cell_width * 2),
-                        int(cell_height * 2)
-                    )
-        
-        # Désactiver le clipping
-        painter.setClipping(False)
-        
-        # Redessiner les bordures du terrain
-        self._draw_field_borders(painter, x, y, field_width, field_height, scale)
-        
-        # Dessiner la légende
-        self._draw_legend(painter)
-
-    def _draw_field_base(self, painter, x, y, field_width, field_height):
-        # Fond blanc du terrain
-        painter.setBrush(QBrush(Qt.GlobalColor.white))
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRect(int(x), int(y), int(field_width), int(field_height))
-
-    def _draw_field_borders(self, painter, x, y, field_width, field_height, scale):
-        painter.setPen(QPen(QColor(0, 0, 0), 2))
-        painter.setBrush(Qt.BrushStyle.NoBrush)
-        
-        # Rectangle principal
-        painter.drawRect(int(x), int(y), int(field_width), int(field_height))
-        
-        # Ligne centrale
-        center_x = x + field_width / 2
-        painter.drawLine(int(center_x), int(y), int(center_x), int(y + field_height))
-        
-        # Cercle central
-        circle_diameter = 9 * (self.real_width / 40.0) * scale
-        circle_x = center_x - circle_diameter / 2
-        circle_y = y + (field_height - circle_diameter) / 2
-        painter.drawEllipse(int(circle_x), int(circle_y), int(circle_diameter), int(circle_diameter))
-        
-        # Zones de but
-        goal_width = 5.5 * (self.real_width / 40.0) * scale
-        goal_height = 4.5 * (self.real_width / 40.0) * scale
-        painter.drawRect(int(x), int(y + (field_height - goal_height) / 2), 
-                        int(goal_width), int(goal_height))
-        painter.drawRect(int(x + field_width - goal_width), int(y + (field_height - goal_height) / 2),
-                        int(goal_width), int(goal_height))
-
-    def _draw_legend(self, painter):
-        legend_width = 200
-        legend_height = 20
-        legend_x = self.width() - legend_width - 20
-        legend_y = self.height() - legend_height - 20
-        
-        gradient = QLinearGradient(legend_x, 0, legend_x + legend_width, 0)
-        gradient.setColorAt(0.0, QColor(0, 0, 255, 100))
-        gradient.setColorAt(0.3, QColor(0, 255, 0, 130))
-        gradient.setColorAt(0.6, QColor(255, 255, 0, 160))
-        gradient.setColorAt(0.8, QColor(255, 128, 0, 180))
-        gradient.setColorAt(1.0, QColor(255, 0, 0, 200))
-        
-        painter.fillRect(legend_x, legend_y, legend_width, legend_height, gradient)
-        painter.drawRect(legend_x, legend_y, legend_width, legend_height)
-        
-        painter.drawText(legend_x, legend_y - 5, "Fréquence de passage")
-        painter.drawText(legend_x, legend_y + legend_height + 15, "Faible")
-        painter.drawText(legend_x + legend_width - 40, legend_y + legend_height + 15, "Élevé")
-
-class HeatmapDialog(QDialog):
-    def __init__(self, positions, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Heatmap du Match")
-        self.setModal(True)
-        self.resize(800, 600)
-        
-        layout = QVBoxLayout()
-        
-        # Création du widget de heatmap
-        self.heatmap_widget = HockeyFieldHeatmap(positions)
-        layout.addWidget(self.heatmap_widget)
-        
-        # Bouton fermer
-        close_button = QPushButton("Fermer")
-        close_button.clicked.connect(self.close)
-        layout.addWidget(close_button)
-        
-        self.setLayout(layout)
+logger = get_logger("match")
 
 class MatchMode(QWidget):
     def __init__(self, main_app):
@@ -266,7 +16,7 @@ class MatchMode(QWidget):
         self.match_running = False
         self.match_paused = False
         self.halftime_shown = False
-        self.positions = []
+        self.recorder = None  # Enregistrement du match en cours ou du dernier match
         self.score1 = 0
         self.score2 = 0
         
@@ -374,6 +124,7 @@ class MatchMode(QWidget):
         self.start_button = QPushButton("Nouveau Match")
         self.pause_button = QPushButton("Pause")
         self.heatmap_button = QPushButton("Voir Heatmap")
+        self.replay_button = QPushButton("Revoir un Match")
         self.pause_button.setEnabled(False)
         self.heatmap_button.setEnabled(False)
         
@@ -393,10 +144,12 @@ class MatchMode(QWidget):
         self.start_button.setStyleSheet(control_button_style)
         self.pause_button.setStyleSheet(control_button_style)
         self.heatmap_button.setStyleSheet(control_button_style)
+        self.replay_button.setStyleSheet(control_button_style)
         
         control_layout.addWidget(self.start_button)
         control_layout.addWidget(self.pause_button)
         control_layout.addWidget(self.heatmap_button)
+        control_layout.addWidget(self.replay_button)
         layout.addLayout(control_layout)
         
         self.setLayout(layout)
@@ -405,6 +158,7 @@ class MatchMode(QWidget):
         self.start_button.clicked.connect(self._on_start_match)
         self.pause_button.clicked.connect(self._on_pause_match)
         self.heatmap_button.clicked.connect(self._show_heatmap)
+        self.replay_button.clicked.connect(self._on_replay)
         self.team1_plus_button.clicked.connect(self._increment_team1_score)
         self.team1_minus_button.clicked.connect(self._decrement_team1_score)
         self.team2_plus_button.clicked.connect(self._increment_team2_score)
@@ -442,13 +196,11 @@ class MatchMode(QWidget):
             self.match_paused = True
             self.match_timer.stop()
             self.pause_button.setText("Reprendre")
-            self.main_app.stop_mqtt()  # Arrêter le suivi
+            self.main_app.pause_mqtt()  # Suspendre le suivi, le broker reste actif
 
-            # Envoyer le signal "stop" à l'ESP32
+            # Envoyer le signal "stop" aux ESP32
             if self.main_app.discovery_server:
-                esp32_addr, esp32_ip = self.main_app.discovery_server.get_last_esp32()
-                if esp32_addr:
-                    self.main_app.discovery_server.send_response(esp32_ip, "stop")
+                self.main_app.discovery_server.send_to_all("stop")
             
             # Centrer le palet
             self.main_app.hockey_field.set_puck_position(20, 10)
@@ -457,13 +209,11 @@ class MatchMode(QWidget):
             self.match_paused = False
             self.match_timer.start(1000)
             self.pause_button.setText("Pause")
-            self.main_app.start_mqtt()  # Reprendre le suivi
+            self.main_app.resume_mqtt()  # Reprendre le suivi
 
-            # Envoyer le signal "start" à l'ESP32
+            # Envoyer le signal "start" aux ESP32
             if self.main_app.discovery_server:
-                esp32_addr, esp32_ip = self.main_app.discovery_server.get_last_esp32()
-                if esp32_addr:
-                    self.main_app.discovery_server.send_response(esp32_ip, "start")
+                self.main_app.discovery_server.send_to_all("start")
     
     def _show_halftime_message(self):
         msg = QMessageBox()
@@ -490,6 +240,7 @@ class MatchMode(QWidget):
 
     def _on_start_match(self):
         if not self.match_running:
+            from match.match_dialog import MatchConfigDialog
             dialog = MatchConfigDialog(self)
             if dialog.exec():
                 # Configuration du match
@@ -507,9 +258,10 @@ class MatchMode(QWidget):
                 # Démarrer le match
                 self.match_running = True
                 self.match_paused = False
-                self.positions = []
+                self._start_recording()
                 self.start_button.setText("Arrêter le Match")
                 self.heatmap_button.setEnabled(False)
+                self.replay_button.setEnabled(False)
                 self.pause_button.setEnabled(True)
                 self.pause_button.setText("Pause")
                 
@@ -526,14 +278,10 @@ class MatchMode(QWidget):
                 # Démarrer le suivi du palet
                 self.main_app.start_mqtt()
                 
-                # Envoyer le signal "start" à l'ESP32
+                # Envoyer le signal "start" aux ESP32
                 if self.main_app.discovery_server:
-                    esp32_addr, esp32_ip = self.main_app.discovery_server.get_last_esp32()
-                    if esp32_addr:
-                        self.main_app.discovery_server.send_response(esp32_ip, "start")
+                    self.main_app.discovery_server.send_to_all("start")
                 
-                # Connexion au callback de position
-                self.main_app.hockey_field.position_callback = self._on_puck_position
         else:
             self._end_match()
 
@@ -543,6 +291,7 @@ class MatchMode(QWidget):
         self.match_timer.stop()
         self.start_button.setText("Nouveau Match")
         self.heatmap_button.setEnabled(True)
+        self.replay_button.setEnabled(True)
         self.pause_button.setEnabled(False)
         self.pause_button.setText("Pause")
         
@@ -555,22 +304,57 @@ class MatchMode(QWidget):
         # Arrêter le suivi du palet
         self.main_app.stop_mqtt()
 
-        # Envoyer le signal "stop" à l'ESP32
+        # Envoyer le signal "stop" aux ESP32
         if self.main_app.discovery_server:
-            esp32_addr, esp32_ip = self.main_app.discovery_server.get_last_esp32()
-            if esp32_addr:
-                self.main_app.discovery_server.send_response(esp32_ip, "stop")
+            self.main_app.discovery_server.send_to_all("stop")
         
-        # Déconnecter le callback de position
-        self.main_app.hockey_field.position_callback = None
+        self.stop_recording()
         
         # Reset du palet au centre
         self.main_app.hockey_field.set_puck_position(20, 10)
 
-    def _on_puck_position(self, x, y):
-        if self.match_running and not self.match_paused:
-            self.positions.append([x, y])
+    def _start_recording(self):
+        """Enregistre les mesures du match, dans un fichier si la configuration le prévoit"""
+        import os
+        import time
+        from tracking.recording import MatchRecorder
+        settings = self.main_app.settings.recording
+        path = None
+        if settings.enabled:
+            try:
+                os.makedirs(settings.directory, exist_ok=True)
+                path = os.path.join(settings.directory, time.strftime("match_%Y%m%d_%H%M%S.ptrec"))
+            except OSError as e:
+                logger.error("Impossible de créer le dossier des enregistrements %s: %s", settings.directory, e)
+        calculator = self.main_app.tracking_pipeline.calculator
+        self.recorder = MatchRecorder(path, calculator.anchors,
+                                      (calculator.config.width, calculator.config.height))
+        self.recorder.start()
+        self.main_app.tracking_pipeline.set_recorder(self.recorder)
+
+    def stop_recording(self):
+        """Fin de l'enregistrement : les mesures en attente sont écrites"""
+        self.main_app.tracking_pipeline.set_recorder(None)
+        if self.recorder is not None:
+            self.recorder.close()
 
     def _show_heatmap(self):
-        dialog = HeatmapDialog(self.positions, self)
-        dialog.exec()
\ No newline at end of file
+        from match.heatmap import HeatmapDialog
+        pipeline = self.main_app.tracking_pipeline
+        positions = self.recorder.positions(pipeline.primary_tag) if self.recorder is not None else []
+        dialog = HeatmapDialog(positions, self)
+        dialog.exec()
+
+    def _on_replay(self):
+        from PySide6.QtWidgets import QFileDialog
+        from match.replay_dialog import ReplayDialog
+        path, _ = QFileDialog.getOpenFileName(self, "Revoir un match", self.main_app.settings.recording.directory,
+                                              "Enregistrements de match (*.ptrec)")
+        if not path:
+            return
+        try:
+            dialog = ReplayDialog(path, self.main_app, self)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Erreur de relecture", f"Impossible d'ouvrir {path}: {str(e)}")
+            return
+        dialog.exec()
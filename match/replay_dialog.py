@@ -0,0 +1,140 @@
+import time
+from PySide6.QtWidgets import (
+    QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSlider, QComboBox, QDialog
+)
+from PySide6.QtCore import Qt, QTimer
+from tracking.frames import PuckFix
+from tracking.replay import REPLAY_SPEEDS, MappedRecording, ReplayEngine
+
+class ReplayDialog(QDialog):
+    """Relecture d'un match enregistré sur le terrain de l'application principale.
+
+    Les positions rejouées sont affichées par HockeyField et, si le suivi caméra est
+    activé, envoyées à la caméra. La heatmap est celle du match jusqu'à l'instant rejoué.
+    """
+
+    SLIDER_STEPS = 1000
+
+    def __init__(self, path: str, main_app, parent=None):
+        super().__init__(parent)
+        self.main_app = main_app
+        self.recording = MappedRecording(path)
+        self.engine = ReplayEngine(self.recording, main_app.tracking_pipeline.primary_tag)
+        self.setWindowTitle("Relecture du match")
+        self.setModal(True)
+
+        layout = QVBoxLayout()
+        self.time_label = QLabel()
+        self.time_label.setStyleSheet("font-size: 18px; font-weight: bold;")
+        self.time_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.time_label)
+
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.setRange(0, self.SLIDER_STEPS)
+        layout.addWidget(self.slider)
+
+        # Contrôles : image précédente, lecture, image suivante, vitesse, heatmap
+        controls = QHBoxLayout()
+        self.previous_button = QPushButton("◀|")
+        self.play_button = QPushButton("Lecture")
+        self.next_button = QPushButton("|▶")
+        self.speed_input = QComboBox()
+        for speed in REPLAY_SPEEDS:
+            self.speed_input.addItem(f"{speed}x", speed)
+        self.heatmap_button = QPushButton("Voir Heatmap")
+        controls.addWidget(self.previous_button)
+        controls.addWidget(self.play_button)
+        controls.addWidget(self.next_button)
+        controls.addWidget(self.speed_input)
+        controls.addStretch()
+        controls.addWidget(self.heatmap_button)
+        layout.addLayout(controls)
+        self.setLayout(layout)
+
+        # Horloge de la relecture, au rythme de l'affichage
+        self.timer = QTimer(self)
+        self.timer.setInterval(33)
+        self._last_tick = None
+
+        # Connexions
+        self.play_button.clicked.connect(self._on_play)
+        self.previous_button.clicked.connect(lambda: self._on_step(-1))
+        self.next_button.clicked.connect(lambda: self._on_step(1))
+        self.speed_input.currentIndexChanged.connect(self._on_speed_changed)
+        self.slider.sliderMoved.connect(self._on_seek)
+        self.heatmap_button.clicked.connect(self._show_heatmap)
+        self.timer.timeout.connect(self._on_tick)
+
+        self._show_state()
+
+    def _on_play(self):
+        engine = self.engine
+        if engine.playing:
+            self._pause()
+            return
+        if engine.finished:
+            engine.seek(self.recording.start_time)
+        engine.playing = True
+        self._last_tick = time.monotonic()
+        self.timer.start()
+        self.play_button.setText("Pause")
+
+    def _pause(self):
+        self.engine.playing = False
+        self.timer.stop()
+        self.play_button.setText("Lecture")
+
+    def _on_tick(self):
+        now = time.monotonic()
+        self.engine.advance(now - self._last_tick)
+        self._last_tick = now
+        if not self.engine.playing:
+            self._pause()
+        self._show_state()
+
+    def _on_step(self, direction: int):
+        self._pause()
+        self.engine.step(direction)
+        self._show_state()
+
+    def _on_speed_changed(self, index: int):
+        self.engine.speed = float(self.speed_input.itemData(index))
+
+    def _on_seek(self, value: int):
+        recording = self.recording
+        self.engine.seek(recording.start_time + recording.duration * value / self.SLIDER_STEPS)
+        self._show_state()
+
+    def _show_state(self):
+        engine = self.engine
+        recording = self.recording
+        elapsed = int(engine.time - recording.start_time)
+        total = int(recording.duration)
+        self.time_label.setText(f"{elapsed // 60:02d}:{elapsed % 60:02d} / {total // 60:02d}:{total % 60:02d}")
+        if not self.slider.isSliderDown() and recording.duration > 0:
+            self.slider.setValue(int(self.SLIDER_STEPS * (engine.time - recording.start_time) / recording.duration))
+
+        positions = engine.visible_positions()
+        self.main_app.hockey_field.set_tag_positions(recording.tags, positions, engine.primary_tag)
+        slot = recording.slot(engine.primary_tag)
+        if slot is not None:
+            x, y = positions[slot].tolist()
+            if x == x:
+                # Horodatage de l'envoi : la caméra n'extrapole pas une position rejouée
+                self.main_app.camera_tracking.on_fix(PuckFix(x, y, time.monotonic(), engine.primary_tag))
+
+    def _show_heatmap(self):
+        from match.heatmap import HeatmapDialog
+        self._pause()
+        positions = self.recording.positions(self.engine.primary_tag, until=self.engine.time)
+        dialog = HeatmapDialog(positions, self)
+        dialog.exec()
+
+    def done(self, result):
+        self.timer.stop()
+        # Fin de la relecture : plus aucun tag affiché, palet au centre
+        field = self.main_app.hockey_field
+        field.set_tag_positions((), self.engine.positions[:0], None)
+        field.set_puck_position(field.config.center_x, field.config.center_y)
+        self.recording.close()
+        super().done(result)
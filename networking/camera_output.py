@@ -0,0 +1,148 @@
+import math
+import threading
+import time
+from networking.palet_position_sender import PositionSender
+from tracking.terrain import TerrainConfig
+
+# Anticipation maximale (s) : au-delà, l'extrapolation n'a plus de sens
+MAX_PREDICTION = 0.5
+
+class CameraOutputStage:
+    """Étage de sortie entre le calcul de position et l'envoi UDP vers la caméra.
+
+    Les positions soumises sont regroupées pour ne pas dépasser rate_hz envois par
+    seconde, et une position n'est envoyée que si elle s'éloigne de plus de deadband
+    mètres de la dernière position envoyée. Seule la dernière position soumise est
+    conservée : la caméra ne reçoit jamais une position périmée. Les envois sont
+    planifiés dans la boucle réseau (NetworkCore) du sender.
+
+    Quand la vitesse du palet est connue (filtre de suivi activé), la position envoyée
+    est extrapolée du délai mesuré entre la réception des distances et l'envoi, plus
+    lookahead secondes pour le retard du réseau et de la caméra.
+    """
+
+    def __init__(self, sender, rate_hz: float = 30.0, deadband: float = 0.1, lookahead: float = 0.0):
+        self.sender = sender
+        self.core = sender.core
+        self.config = TerrainConfig()
+        self.rate_hz = rate_hz
+        self.deadband = deadband  # Déplacement minimal (m) pour déclencher un envoi
+        self.lookahead = lookahead
+        self.running = False
+        self._lock = threading.Lock()
+        self._latest = None  # (x, y, vx, vy, timestamp, force) en attente d'envoi
+        self._last_sent = None
+        self._next_send = 0.0
+        self._timer = None  # Envoi planifié dans la boucle réseau
+
+    def start(self):
+        """Active l'envoi des positions"""
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self._latest = None
+            self._last_sent = None
+
+    def stop(self):
+        """Désactive l'envoi, la position en attente est abandonnée"""
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+            self._latest = None
+        if self.core.running:
+            self.core.call(self._cancel_timer)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def submit(self, x: float, y: float, force: bool = False,
+               vx: float = 0.0, vy: float = 0.0, timestamp: float = None):
+        """Soumet une nouvelle position, qui remplace celle encore en attente.
+
+        force ignore la zone morte, par exemple pour recentrer la caméra. vx, vy et
+        timestamp (time.monotonic() de la mesure) permettent d'extrapoler la position.
+        """
+        with self._lock:
+            if not self.running:
+                return
+            idle = self._latest is None
+            self._latest = (x, y, vx, vy, timestamp,
+                            force or (self._latest is not None and self._latest[5]))
+        # La boucle n'est réveillée que si aucune position n'attend déjà son créneau d'envoi
+        if idle:
+            self.core.call_soon(self._schedule)
+
+    def _schedule(self):
+        if self._timer is None:
+            delay = max(self._next_send - time.monotonic(), 0.0)
+            self._timer = self.core.loop.call_later(delay, self._flush)
+
+    def _flush(self):
+        self._timer = None
+        with self._lock:
+            if self._latest is None:
+                return
+            x, y, vx, vy, timestamp, force = self._latest
+            self._latest = None
+
+        if timestamp is not None and (vx or vy):
+            horizon = min(time.monotonic() - timestamp + self.lookahead, MAX_PREDICTION)
+            x = max(0.0, min(self.config.width, x + vx * horizon))
+            y = max(0.0, min(self.config.height, y + vy * horizon))
+
+        if not force and self._last_sent is not None:
+            last_x, last_y = self._last_sent
+            if math.hypot(x - last_x, y - last_y) <= self.deadband:
+                return
+        if self.sender.send_position(x, y):
+            self._last_sent = (x, y)
+            period = 1.0 / self.rate_hz if self.rate_hz > 0 else 0.0
+            self._next_send = time.monotonic() + period
+
+
+class CameraTracking:
+    """Suivi caméra : abonné du pipeline de suivi qui envoie les positions à la caméra.
+
+    Regroupe l'envoi UDP persistant et l'étage de sortie à cadence limitée, et renvoie
+    les dimensions du terrain à la caméra lorsqu'elles changent.
+    """
+
+    def __init__(self, rate_hz: float = 30.0, deadband: float = 0.1, sender: PositionSender = None,
+                 lookahead: float = 0.0):
+        self.config = TerrainConfig()
+        self.config.add_observer(self)
+        self.enabled = False
+        # Socket UDP persistante vers l'ESP32 de la caméra
+        self.position_sender = sender or PositionSender()
+        # Cadence maximale (Hz) et zone morte (m) des positions envoyées à la caméra
+        self.camera_output = CameraOutputStage(self.position_sender, rate_hz, deadband, lookahead)
+
+    def set_enabled(self, enabled: bool):
+        """Active ou désactive le suivi caméra"""
+        self.enabled = enabled
+        if enabled:
+            self.position_sender.start()
+            self.camera_output.start()
+            # Envoyer les dimensions du terrain lors de l'activation
+            self.position_sender.send_taille_terrain(self.config.width, self.config.height)
+        else:
+            self.camera_output.stop()
+            self.position_sender.stop()
+
+    def on_terrain_dimensions_changed(self, width, height):
+        if self.enabled:
+            self.position_sender.send_taille_terrain(width, height)
+
+    def on_fix(self, fix):
+        """Abonné du pipeline : n'envoie la position que si le suivi caméra est activé"""
+        if self.enabled:
+            self.camera_output.submit(fix.x, fix.y, vx=fix.vx, vy=fix.vy, timestamp=fix.timestamp)
+
+    def reset_to_center(self):
+        """Réinitialise la position au centre"""
+        if self.enabled:
+            self.camera_output.submit(self.config.center_x, self.config.center_y, force=True)
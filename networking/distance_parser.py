@@ -0,0 +1,115 @@
+import math
+import re
+import struct
+from typing import Iterable, Optional, Tuple
+from tracking.anchors import DEFAULT_ANCHOR_IDS, MIN_ANCHORS, AnchorId, anchor_address
+
+# Format publié par le palet sur palet/rollerhockey : "84:1.86;85:1.59;86:1.33", une
+# paire "identifiant du capteur:distance en mètres" par capteur. L'identifiant est
+# l'adresse courte UWB du capteur en hexadécimal (voir tracking.anchors)
+MAX_PAYLOAD_SIZE = 256
+
+_VALUE = rb"[-+0-9.eE]+"
+_ITEM = rb"[0-9A-Fa-f]+:" + _VALUE
+# Syntaxe générale d'un message : des paires "id:valeur" séparées par ';'
+_FRAME_RE = re.compile(_ITEM + rb"(?:;" + _ITEM + rb")*")
+
+# Variante binaire, utilisée par le transport UDP : en-tête "<BBHB" (magic, version,
+# numéro de séquence, nombre de mesures) suivi d'une paire "<Hf" par capteur
+# (adresse courte du capteur, 0x86 pour "86" dans le message texte, distance en mètres)
+BINARY_MAGIC = 0xB6
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<BBHB")
+BINARY_ITEM = struct.Struct("<Hf")
+
+Distances = Tuple[Optional[float], ...]
+
+class DistanceParser:
+    """Analyse les messages de distances du palet directement sur les octets reçus.
+
+    Le message complet tel que publié par le palet (capteurs par identifiant croissant)
+    est reconnu par une seule expression régulière précompilée, sans décodage, découpage
+    ni dictionnaire par message. Les autres messages (partiels ou dans un autre ordre)
+    sont validés puis découpés paire par paire. parse() renvoie une distance par capteur
+    de anchor_ids, dans cet ordre, avec None pour un capteur absent du message, ou None
+    si le message est mal formé. Les capteurs inconnus sont ignorés.
+    """
+
+    def __init__(self, anchor_ids: Iterable[AnchorId] = DEFAULT_ANCHOR_IDS):
+        self.anchor_ids = tuple(anchor_ids)
+        if len(self.anchor_ids) < MIN_ANCHORS:
+            raise ValueError(f"Au moins {MIN_ANCHORS} identifiants de capteurs attendus")
+        addresses = tuple(anchor_address(anchor_id) for anchor_id in self.anchor_ids)
+        if len(set(addresses)) != len(addresses):
+            raise ValueError(f"Identifiants de capteurs en double : {self.anchor_ids}")
+        self._empty = (None,) * len(self.anchor_ids)
+        # Identifiants écrits comme par le palet ("%02X")
+        self._keys = tuple(f"{address:02X}:".encode() for address in addresses)
+        self._index = {address: i for i, address in enumerate(addresses)}
+
+        # Message complet : groupes dans l'ordre de publication, remis ensuite dans l'ordre de anchor_ids
+        published = sorted(range(len(addresses)), key=lambda i: addresses[i])
+        self._full_re = re.compile(b";".join(
+            self._keys[i] + b"(" + _VALUE + b")" for i in published))
+        self._groups = tuple(published.index(i) + 1 for i in range(len(self.anchor_ids)))
+        # Cas courant de trois capteurs : conversion déroulée, sans tuple intermédiaire
+        self._three = len(self._groups) == 3
+        self._g1, self._g2, self._g3 = self._groups[:3]
+
+    def parse(self, payload: bytes) -> Optional[Distances]:
+        """Renvoie les distances d'un message, ou None s'il est mal formé"""
+        if len(payload) > MAX_PAYLOAD_SIZE:
+            return None
+        try:
+            match = self._full_re.fullmatch(payload)
+            if match is not None:
+                if self._three:
+                    return float(match[self._g1]), float(match[self._g2]), float(match[self._g3])
+                return tuple(map(float, match.group(*self._groups)))
+
+            if _FRAME_RE.fullmatch(payload) is None:
+                return None
+            distances = list(self._empty)
+            for item in payload.split(b";"):
+                anchor_id, _, value = item.partition(b":")
+                index = self._index.get(int(anchor_id, 16))
+                if index is not None:
+                    # Un capteur présent deux fois rend le message ambigu
+                    if distances[index] is not None:
+                        return None
+                    distances[index] = float(value)
+        except ValueError:
+            return None
+        distances = tuple(distances)
+        if distances == self._empty:
+            return None
+        return distances
+
+    def parse_binary(self, payload: bytes) -> Optional[Distances]:
+        """Renvoie les distances d'un message binaire, ou None s'il est mal formé"""
+        if len(payload) < BINARY_HEADER.size or len(payload) > MAX_PAYLOAD_SIZE:
+            return None
+        magic, version, _, count = BINARY_HEADER.unpack_from(payload)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            return None
+        if len(payload) != BINARY_HEADER.size + count * BINARY_ITEM.size:
+            return None
+        distances = list(self._empty)
+        for anchor_id, value in BINARY_ITEM.iter_unpack(memoryview(payload)[BINARY_HEADER.size:]):
+            index = self._index.get(anchor_id)
+            if index is not None:
+                if distances[index] is not None or not math.isfinite(value):
+                    return None
+                distances[index] = value
+        distances = tuple(distances)
+        if distances == self._empty:
+            return None
+        return distances
+
+def encode_binary_distances(seq: int, distances: Iterable[Tuple[int, float]]) -> bytes:
+    """Construit un message binaire à partir de paires (adresse courte du capteur, distance)"""
+    items = [BINARY_ITEM.pack(anchor_id, value) for anchor_id, value in distances]
+    return BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, seq & 0xFFFF, len(items)) + b"".join(items)
+
+# Analyse un message avec les identifiants de capteurs par défaut (84, 85, 86)
+parse_distances = DistanceParser().parse
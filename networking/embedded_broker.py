@@ -0,0 +1,289 @@
+import asyncio
+import struct
+import time
+from typing import Dict, Set
+from utils.logging_setup import get_logger
+
+logger = get_logger("networking.broker")
+
+# Types de paquets MQTT 3.1.1 (4 bits de poids fort du premier octet)
+CONNECT = 1
+CONNACK = 2
+PUBLISH = 3
+PUBACK = 4
+SUBSCRIBE = 8
+SUBACK = 9
+UNSUBSCRIBE = 10
+UNSUBACK = 11
+PINGREQ = 12
+PINGRESP = 13
+DISCONNECT = 14
+
+PINGRESP_PACKET = bytes((PINGRESP << 4, 0))
+MAX_PACKET_SIZE = 64 * 1024
+# Au-delà de ce volume en attente d'envoi, les messages destinés à un abonné lent sont abandonnés
+MAX_PENDING_WRITE = 256 * 1024
+
+def encode_remaining_length(length: int) -> bytes:
+    """Encode la longueur restante d'un paquet MQTT (entier de longueur variable)"""
+    out = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        if length:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def encode_publish(topic: bytes, payload: bytes) -> bytes:
+    """Construit un paquet PUBLISH QoS 0"""
+    body_len = 2 + len(topic) + len(payload)
+    return b"".join((bytes((PUBLISH << 4,)), encode_remaining_length(body_len),
+                     struct.pack("!H", len(topic)), topic, payload))
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """Vérifie si un topic correspond à un filtre d'abonnement (jokers + et #)"""
+    if topic_filter == topic:
+        return True
+    filter_levels = topic_filter.split("/")
+    topic_levels = topic.split("/")
+    for i, level in enumerate(filter_levels):
+        if level == "#":
+            return True
+        if i >= len(topic_levels):
+            return False
+        if level != "+" and level != topic_levels[i]:
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+def _valid_filter(topic_filter: str) -> bool:
+    if not topic_filter:
+        return False
+    levels = topic_filter.split("/")
+    for i, level in enumerate(levels):
+        if "#" in level and (level != "#" or i != len(levels) - 1):
+            return False
+        if "+" in level and level != "+":
+            return False
+    return True
+
+class _ProtocolError(Exception):
+    pass
+
+class _Session(asyncio.Protocol):
+    """Connexion d'un client au broker : découpe le flux TCP en paquets MQTT"""
+
+    def __init__(self, broker: "EmbeddedBroker"):
+        self.broker = broker
+        self.transport = None
+        self.buffer = bytearray()
+        self.client_id = None
+        self.filters: Set[str] = set()
+        self.keepalive = 0
+        self.last_activity = time.monotonic()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.broker._sessions.add(self)
+
+    def connection_lost(self, exc):
+        self.broker._remove_session(self)
+
+    def data_received(self, data: bytes):
+        self.last_activity = time.monotonic()
+        buffer = self.buffer
+        buffer += data
+        try:
+            while True:
+                # En-tête fixe : type/flags puis longueur restante sur 1 à 4 octets
+                length = 0
+                multiplier = 1
+                pos = 1
+                while True:
+                    if pos >= len(buffer):
+                        return
+                    byte = buffer[pos]
+                    length += (byte & 0x7F) * multiplier
+                    pos += 1
+                    if not byte & 0x80:
+                        break
+                    multiplier *= 128
+                    if pos > 4:
+                        raise _ProtocolError("longueur restante invalide")
+                if length > MAX_PACKET_SIZE:
+                    raise _ProtocolError(f"paquet trop grand ({length} octets)")
+                end = pos + length
+                if len(buffer) < end:
+                    return
+                header = buffer[0]
+                body = bytes(buffer[pos:end])
+                del buffer[:end]
+                self._handle(header >> 4, header & 0x0F, body)
+                if self.transport.is_closing():
+                    return
+        except (_ProtocolError, struct.error, UnicodeDecodeError, IndexError) as e:
+            logger.warning("Client MQTT %s déconnecté : %s", self.client_id, e)
+            self.transport.close()
+
+    def _handle(self, packet_type: int, flags: int, body: bytes):
+        if self.client_id is None and packet_type != CONNECT:
+            raise _ProtocolError("paquet reçu avant CONNECT")
+        if packet_type == PUBLISH:
+            self._on_publish(flags, body)
+        elif packet_type == PINGREQ:
+            self.transport.write(PINGRESP_PACKET)
+        elif packet_type == CONNECT:
+            self._on_connect(body)
+        elif packet_type == SUBSCRIBE:
+            self._on_subscribe(body)
+        elif packet_type == UNSUBSCRIBE:
+            self._on_unsubscribe(body)
+        elif packet_type == DISCONNECT:
+            self.transport.close()
+        elif packet_type != PUBACK:
+            raise _ProtocolError(f"type de paquet non pris en charge : {packet_type}")
+
+    def _on_connect(self, body: bytes):
+        if self.client_id is not None:
+            raise _ProtocolError("second CONNECT")
+        name_len = struct.unpack_from("!H", body, 0)[0]
+        pos = 2 + name_len
+        protocol_name = body[2:pos]
+        level, connect_flags, self.keepalive = struct.unpack_from("!BBH", body, pos)
+        pos += 4
+        if (protocol_name, level) not in ((b"MQTT", 4), (b"MQIsdp", 3)):
+            # Code 1 : version du protocole non acceptée
+            self.transport.write(bytes((CONNACK << 4, 2, 0, 1)))
+            self.transport.close()
+            return
+        id_len = struct.unpack_from("!H", body, pos)[0]
+        client_id = body[pos + 2:pos + 2 + id_len].decode("utf-8")
+        self.client_id = client_id or f"anonyme-{id(self):x}"
+        self.broker._register(self)
+        self.transport.write(bytes((CONNACK << 4, 2, 0, 0)))
+
+    def _on_publish(self, flags: int, body: bytes):
+        qos = (flags >> 1) & 0x03
+        topic_len = struct.unpack_from("!H", body, 0)[0]
+        pos = 2 + topic_len
+        topic = body[2:pos]
+        if qos == 1:
+            packet_id = body[pos:pos + 2]
+            pos += 2
+            self.transport.write(bytes((PUBACK << 4, 2)) + packet_id)
+        elif qos:
+            raise _ProtocolError("PUBLISH QoS 2 non pris en charge")
+        self.broker._dispatch(topic, body[pos:])
+
+    def _on_subscribe(self, body: bytes):
+        packet_id = body[:2]
+        pos = 2
+        granted = bytearray()
+        while pos < len(body):
+            filter_len = struct.unpack_from("!H", body, pos)[0]
+            topic_filter = body[pos + 2:pos + 2 + filter_len].decode("utf-8")
+            pos += 3 + filter_len  # Filtre puis QoS demandée, toujours accordée en QoS 0
+            if _valid_filter(topic_filter):
+                self.filters.add(topic_filter)
+                granted.append(0)
+            else:
+                granted.append(0x80)
+        if not granted:
+            raise _ProtocolError("SUBSCRIBE sans filtre")
+        self.broker._routes.clear()
+        self.transport.write(bytes((SUBACK << 4,)) + encode_remaining_length(2 + len(granted))
+                             + packet_id + bytes(granted))
+
+    def _on_unsubscribe(self, body: bytes):
+        packet_id = body[:2]
+        pos = 2
+        while pos < len(body):
+            filter_len = struct.unpack_from("!H", body, pos)[0]
+            self.filters.discard(body[pos + 2:pos + 2 + filter_len].decode("utf-8"))
+            pos += 2 + filter_len
+        self.broker._routes.clear()
+        self.transport.write(bytes((UNSUBACK << 4, 2)) + packet_id)
+
+class EmbeddedBroker:
+    """Broker MQTT 3.1.1 minimal exécuté dans la boucle réseau : QoS 0, jokers, sans
+    messages retenus, sessions persistantes ni authentification."""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 1883):
+        self.host = host
+        self.port = port
+        self._server = None
+        self._keepalive_task = None
+        self._sessions: Set[_Session] = set()
+        self._clients: Dict[str, _Session] = {}
+        self._routes: Dict[bytes, tuple] = {}  # Cache topic -> abonnés, vidé à chaque (dés)abonnement
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    async def start_serving(self):
+        """Ouvre le port d'écoute dans la boucle asyncio courante"""
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(lambda: _Session(self), self.host, self.port,
+                                                reuse_address=True)
+        self._keepalive_task = loop.create_task(self._check_keepalive())
+        logger.info("Broker MQTT intégré à l'écoute sur %s:%s", self.host, self.port)
+
+    async def close(self):
+        """Ferme le port d'écoute et toutes les connexions clientes"""
+        if self._server is None:
+            return
+        self._keepalive_task.cancel()
+        self._server.close()
+        for session in list(self._sessions):
+            session.transport.close()
+        await self._server.wait_closed()
+        self._server = None
+        logger.info("Broker MQTT intégré arrêté")
+
+    def _register(self, session: _Session):
+        # Un nouveau CONNECT avec le même identifiant remplace la connexion précédente
+        previous = self._clients.get(session.client_id)
+        if previous is not None and previous is not session:
+            previous.transport.close()
+        self._clients[session.client_id] = session
+
+    def _remove_session(self, session: _Session):
+        self._sessions.discard(session)
+        if self._clients.get(session.client_id) is session:
+            del self._clients[session.client_id]
+        if session.filters:
+            self._routes.clear()
+
+    def _subscribers(self, topic: bytes) -> tuple:
+        subscribers = self._routes.get(topic)
+        if subscribers is None:
+            name = topic.decode("utf-8")
+            subscribers = tuple(s for s in self._sessions
+                                if any(topic_matches(f, name) for f in s.filters))
+            self._routes[topic] = subscribers
+        return subscribers
+
+    def _dispatch(self, topic: bytes, payload: bytes):
+        subscribers = self._subscribers(topic)
+        if not subscribers:
+            return
+        packet = encode_publish(topic, payload)
+        for session in subscribers:
+            transport = session.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > MAX_PENDING_WRITE:
+                continue
+            transport.write(packet)
+
+    async def _check_keepalive(self):
+        """Déconnecte les clients silencieux depuis plus d'une fois et demie leur keepalive"""
+        while True:
+            await asyncio.sleep(1.0)
+            now = time.monotonic()
+            for session in list(self._sessions):
+                if session.keepalive and now - session.last_activity > 1.5 * session.keepalive:
+                    logger.warning("Client MQTT %s sans activité, déconnexion", session.client_id)
+                    session.transport.close()
@@ -1,21 +1,63 @@
+import asyncio
 import os
 import platform
+import socket
 import subprocess
 import time
 import paho.mqtt.client as mqtt
+from networking.distance_parser import DistanceParser, DEFAULT_ANCHOR_IDS
+from networking.network_core import NetworkCore, get_network_core
+from tracking.frames import DEFAULT_TAG, FrameAssembler
+from utils.logging_setup import get_logger
+
+logger = get_logger("networking.mqtt")
+
+# Un tag publie sur palet/rollerhockey/<identifiant du tag> ; le topic historique sans
+# identifiant correspond au tag DEFAULT_TAG
+TOPIC = "palet/rollerhockey"
+TAG_TOPICS = TOPIC + "/+"
+_TAG_PREFIX = TOPIC + "/"
 
 class MQTTClient:
-    def __init__(self, message_callback, connection_callback):
+    """Client MQTT recevant les distances publiées par le palet, un DistanceFrame par
+    message. paho est piloté par la boucle réseau (NetworkCore), sans thread propre."""
+
+    def __init__(self, message_callback, connection_callback,
+                 broker_host: str = "localhost", broker_port: int = 1883,
+                 manage_broker: bool = True, anchor_ids=DEFAULT_ANCHOR_IDS,
+                 broker_start_timeout: float = 5.0, broker: str = "mosquitto",
+                 core: NetworkCore = None, reconnect_delay: float = 2.0):
+        if broker not in ("mosquitto", "embedded"):
+            raise ValueError(f"Broker inconnu : {broker}")
         self.mqtt_client = mqtt.Client()
         self.mqtt_client.on_connect = self.on_connect
         self.mqtt_client.on_message = self.on_message
         self.mqtt_client.on_disconnect = self.on_disconnect
+        self.mqtt_client.on_socket_open = self._on_socket_open
+        self.mqtt_client.on_socket_close = self._on_socket_close
+        self.mqtt_client.on_socket_register_write = self._on_socket_register_write
+        self.mqtt_client.on_socket_unregister_write = self._on_socket_unregister_write
+        self.core = core or get_network_core()
+        self.reconnect_delay = reconnect_delay  # Délai entre deux tentatives de reconnexion (s)
+        self._misc_task = None
         self.message_callback = message_callback
         self.connection_callback = connection_callback
         self.system = platform.system().lower()  # Détecte l'OS en cours
-        self.architecture = self._get_architecture()  # Détecte l'architecture
-        self.mosquitto_path = self._get_mosquitto_path()
+        self.broker = broker
+        if broker == "mosquitto":
+            self.architecture = self._get_architecture()  # Détecte l'architecture
+            self.mosquitto_path = self._get_mosquitto_path()
         self.mosquitto_process = None  # Stocke le processus Mosquitto
+        self.embedded_broker = None  # Broker intégré, s'il a été démarré par ce client
+        self.broker_host = broker_host
+        self.broker_port = broker_port
+        self.manage_broker = manage_broker
+        self.broker_start_timeout = broker_start_timeout  # Délai maximal de démarrage du broker (s)
+        # Identifiants des capteurs HG, HD et BM dans les messages du palet
+        self.parser = DistanceParser(anchor_ids)
+        self.assembler = FrameAssembler()
+        self.paused = False
+        self._unsubscribed = False  # Abonnement retiré pendant la pause
 
     def _get_architecture(self):
         """Dectection de l'architecture système"""
@@ -32,10 +74,14 @@ class MQTTClient:
             raise RuntimeError(f"Unsupported architecture: {arch}")
 
     def start_mosquitto(self):
-        """Démarrer le service Mosquitto avec la configuration spécifique."""
+        """Démarrer le service Mosquitto, ou réutiliser un broker qui écoute déjà sur le port"""
         if self.mosquitto_process and self.mosquitto_process.poll() is None:
             return
-        
+        self.mosquitto_process = None
+        if self._broker_accepts_connections():
+            logger.info("Broker MQTT déjà actif sur le port %s, réutilisation", self.broker_port)
+            return
+
         # Configure LD_LIBRARY_PATH pour linux lorsque l'application ce lance via exécutable généré par PyInstaller 
         if self.system == "linux":
             mosquitto_bin_dir = os.path.join(os.path.dirname(self.mosquitto_path), 'lib')
@@ -45,20 +91,70 @@ class MQTTClient:
 
         config_path = os.path.join(os.path.dirname(__file__), '..', 'mosquitto', 'mosquitto.conf')
         start_cmd = [self.mosquitto_path, "-c", config_path]
+        start = time.monotonic()
         self.mosquitto_process = subprocess.Popen(start_cmd)
-        time.sleep(2)  # Attendez que le service Mosquitto démarre
+        self._wait_for_broker()
+        logger.info("Broker Mosquitto prêt en %.0f ms", (time.monotonic() - start) * 1000)
+
+    def start_broker(self):
+        """Démarrer le broker choisi (Mosquitto ou broker intégré)"""
+        if self.broker == "mosquitto":
+            self.start_mosquitto()
+        elif self.embedded_broker is None:
+            if self._broker_accepts_connections():
+                logger.info("Broker MQTT déjà actif sur le port %s, réutilisation", self.broker_port)
+                return
+            # Import différé : le broker intégré n'est chargé que s'il est utilisé
+            from networking.embedded_broker import EmbeddedBroker
+            broker = EmbeddedBroker(port=self.broker_port)
+            # Le broker est servi par la même boucle réseau que le client
+            self.core.call(broker.start_serving, timeout=self.broker_start_timeout)
+            self.embedded_broker = broker
+
+    def stop_broker(self):
+        """Arrêter le broker, uniquement s'il a été démarré par ce client"""
+        if self.broker == "mosquitto":
+            self.stop_mosquitto()
+        elif self.embedded_broker is not None:
+            if self.core.running:
+                self.core.call(self.embedded_broker.close)
+            self.embedded_broker = None
+
+    def _broker_accepts_connections(self, timeout: float = 0.2) -> bool:
+        """Vérifie si un broker accepte les connexions TCP sur le port configuré"""
+        host = "127.0.0.1" if self.broker_host == "localhost" else self.broker_host
+        try:
+            with socket.create_connection((host, self.broker_port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def _wait_for_broker(self, interval: float = 0.01):
+        """Attend que le broker démarré accepte les connexions, dans la limite de broker_start_timeout"""
+        deadline = time.monotonic() + self.broker_start_timeout
+        while not self._broker_accepts_connections():
+            returncode = self.mosquitto_process.poll()
+            if returncode is not None:
+                self.mosquitto_process = None
+                raise RuntimeError(f"Le broker Mosquitto s'est arrêté au démarrage (code {returncode})")
+            if time.monotonic() >= deadline:
+                self.stop_mosquitto()
+                raise RuntimeError(f"Le broker Mosquitto n'accepte pas de connexion après "
+                                   f"{self.broker_start_timeout:.1f} s")
+            time.sleep(interval)
 
     def stop_mosquitto(self):
-        """Arrêter le service Mosquitto."""
+        """Arrêter le service Mosquitto, uniquement s'il a été démarré par ce client."""
         if self.mosquitto_process and self.mosquitto_process.poll() is None:
             self.mosquitto_process.terminate()
             try:
                 self.mosquitto_process.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                print("Le processus Mosquitto ne s'est pas arrêté, forçant l'arrêt...")
+                logger.warning("Le processus Mosquitto ne s'est pas arrêté, forçant l'arrêt...")
                 self.mosquitto_process.kill()
         else:
-            print("Le service Mosquitto n'est pas en cours d'exécution.")
+            logger.info("Aucun broker Mosquitto démarré par l'application à arrêter.")
+        self.mosquitto_process = None
 
     def _is_mosquitto_running(self):
         """Vérifie si le service Mosquitto est en cours d'exécution."""
@@ -95,32 +191,103 @@ class MQTTClient:
 
     def start_mqtt(self):
         try:
-            self.start_mosquitto()  # Assurez-vous que Mosquitto est démarré
-            broker = "localhost"
-            port = 1883
-            self.mqtt_client.connect(broker, port)
-            self.mqtt_client.loop_start()
+            self.assembler.reset()
+            self.paused = False
+            self._unsubscribed = False
+            if self.manage_broker:
+                self.start_broker()  # Assurez-vous que le broker est démarré
+            # Pas de délai : la connexion rend la main d'elle-même (connect_timeout de paho)
+            self.core.call(self._connect, timeout=None)
         except Exception as e:
-            print(f"Erreur lors du démarrage MQTT: {e}")
+            logger.error("Erreur lors du démarrage MQTT: %s", e)
             self.stop_mqtt()
             raise
 
     def stop_mqtt(self):
         """Arrêter proprement le client MQTT et le service Mosquitto."""
         try:
-            if self.mqtt_client:
-                self.mqtt_client.loop_stop()
-                self.mqtt_client.disconnect()
-                time.sleep(0.1)  # Petit délai pour permettre la déconnexion
+            if self.core.running:
+                self.core.call(self._disconnect)
 
             if self.connection_callback:
                 self.connection_callback(False)
 
-            self.stop_mosquitto()  # Arrête le service Mosquitto
+            if self.manage_broker:
+                self.stop_broker()  # Arrête le broker
         except Exception as e:
-            print(f"Erreur lors de l'arrêt du client MQTT: {e}")
+            logger.error("Erreur lors de l'arrêt du client MQTT: %s", e)
             raise
 
+    async def _connect(self):
+        # Connexion TCP au broker dans l'exécuteur : la boucle réseau n'est jamais bloquée
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.mqtt_client.connect, self.broker_host, self.broker_port)
+        if self._misc_task is None:
+            self._misc_task = asyncio.get_running_loop().create_task(self._misc_loop())
+
+    def _disconnect(self):
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+            self._misc_task = None
+        self.mqtt_client.disconnect()
+
+    async def _misc_loop(self):
+        """Keepalive de paho, et reconnexion après une perte de connexion"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(1.0)
+            if self.mqtt_client.loop_misc() != mqtt.MQTT_ERR_NO_CONN:
+                continue
+            try:
+                await loop.run_in_executor(None, self.mqtt_client.reconnect)
+            except OSError as e:
+                logger.warning("Reconnexion au broker MQTT impossible : %s", e)
+                await asyncio.sleep(self.reconnect_delay)
+
+    def _in_loop(self, callback, *args):
+        # Pendant une connexion, paho appelle les callbacks de socket depuis l'exécuteur
+        if self.core.in_loop_thread():
+            callback(*args)
+        else:
+            self.core.call_soon(callback, *args)
+
+    def _on_socket_open(self, client, userdata, sock):
+        self._in_loop(self.core.loop.add_reader, sock, client.loop_read)
+
+    def _on_socket_close(self, client, userdata, sock):
+        self._in_loop(self.core.loop.remove_reader, sock)
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self._in_loop(self.core.loop.add_writer, sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self._in_loop(self.core.loop.remove_writer, sock)
+
+    # Même cycle de vie que UDPIngestServer, les deux transports sont interchangeables
+    def start(self):
+        self.start_mqtt()
+
+    def stop(self):
+        self.stop_mqtt()
+
+    def pause(self, unsubscribe: bool = False):
+        """Suspend la transmission des mesures (et l'abonnement avec unsubscribe), la session
+        MQTT et le broker restent actifs"""
+        self.paused = True
+        if unsubscribe and not self._unsubscribed:
+            self._unsubscribed = True
+            self.core.call(self.mqtt_client.unsubscribe, [TOPIC, TAG_TOPICS])
+
+    def resume(self):
+        """Reprend la transmission des mesures après pause()"""
+        if self._unsubscribed:
+            self._unsubscribed = False
+            self.core.call(self._subscribe)
+        self.paused = False
+
+    def _subscribe(self):
+        self.mqtt_client.subscribe([(TOPIC, 0), (TAG_TOPICS, 0)])
+
     def on_disconnect(self, client, userdata, rc):
         """Appelé lors de la déconnexion du broker MQTT"""
         if self.connection_callback:
@@ -128,35 +295,30 @@ class MQTTClient:
 
     def on_connect(self, client, userdata, flags, rc):
         if rc == 0:
-            topic = "palet/rollerhockey"
-            client.subscribe(topic, 0)
+            if not self._unsubscribed:
+                self._subscribe()
             if self.connection_callback:
                 self.connection_callback(True)
         else:
-            print(f"Échec de connexion, code: {rc}")
+            logger.error("Échec de connexion, code: %s", rc)
             if self.connection_callback:
                 self.connection_callback(False)
 
     def on_message(self, client, userdata, msg):
+        if self.paused:
+            return
+        timestamp = time.monotonic()
         try:
-            # Décodage du message MQTT
-            payload = msg.payload.decode()
-            # Extraction des valeurs
-            data = payload.split(";")  # Séparer les paires "clé:valeur"
-            values = {int(item.split(":")[0]): float(item.split(":")[1]) for item in data}
-
-            # Condition sur les adresses
-            # 84 correspond à d3 qui correspond au capteur situé en bas au mileu (BM)
-            if 84 in values:
-                dist = values[84]
-                self.message_callback(None, None, dist)
-            # 85 correspond à d2 qui correspond au capteur situé en haut à droite (HD)
-            if 85 in values:
-                dist = values[85]
-                self.message_callback(None, dist, None)
-            # 86 correspond à d1 qui correspond au capteur situé en haut à gauche (HG)
-            if 86 in values:
-                dist = values[86]
-                self.message_callback(dist, None, None)
+            distances = self.parser.parse(msg.payload)
+            if distances is None:
+                logger.warning("Message invalide : %r", msg.payload)
+                return
+
+            # Un seul appel par message, une fois les trois distances connues
+            topic = msg.topic
+            tag = topic[len(_TAG_PREFIX):] if topic.startswith(_TAG_PREFIX) else DEFAULT_TAG
+            frame = self.assembler.push(distances, timestamp, tag)
+            if frame is not None:
+                self.message_callback(frame)
         except Exception as e:
-            print(f"Erreur lors du traitement du message: {e}")
+            logger.warning("Erreur lors du traitement du message: %s", e)
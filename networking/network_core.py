@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from utils.logging_setup import get_logger
+
+logger = get_logger("networking.core")
+
+class NetworkCore:
+    """Boucle asyncio unique, dans un thread dédié, qui porte tout le réseau. Les autres
+    threads n'y agissent que par call_soon() et call()."""
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """Démarre la boucle dans son thread et attend qu'elle soit prête"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            ready = threading.Event()
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name="NetworkCore")
+            self._thread.daemon = True
+            self._thread.start()
+            ready.wait()
+
+    def stop(self, timeout: float = 2.0):
+        """Annule les tâches en cours, ferme la boucle et attend la fin du thread"""
+        with self._lock:
+            if self._thread is None:
+                return
+            thread, loop = self._thread, self.loop
+            self._thread = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("La boucle réseau ne s'est pas arrêtée en %.1f s", timeout)
+
+    def _run(self, ready: threading.Event):
+        loop = self.loop
+        asyncio.set_event_loop(loop)
+        # Seuls les appels bloquants passent par des threads auxiliaires : résolutions de noms
+        # (getaddrinfo) et connexion du client MQTT, qui ne doit pas retarder une résolution
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="NetworkCoreExecutor")
+        loop.set_default_executor(executor)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            # Annulation des tâches restantes, qui ferment leurs transports dans leur bloc finally
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            # Une résolution en cours ne peut pas être interrompue : elle n'est pas attendue
+            executor.shutdown(wait=False, cancel_futures=True)
+            loop.close()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def call_soon(self, callback, *args):
+        """Exécute callback dans la boucle réseau, sans attendre (appelable depuis n'importe quel thread)"""
+        if self.in_loop_thread():
+            self.loop.call_soon(callback, *args)
+        elif self._thread is not None:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def call(self, function, *args, timeout: float = 5.0):
+        """Exécute function (fonction ou coroutine) dans la boucle réseau et renvoie son résultat"""
+        if self.in_loop_thread():
+            if asyncio.iscoroutinefunction(function):
+                raise RuntimeError("Impossible d'attendre une coroutine depuis la boucle réseau")
+            return function(*args)
+        if self._thread is None:
+            raise RuntimeError("La boucle réseau n'est pas démarrée")
+
+        async def wrapper():
+            result = function(*args)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+
+        return asyncio.run_coroutine_threadsafe(wrapper(), self.loop).result(timeout)
+
+    def create_task(self, coro) -> asyncio.Task:
+        """Lance une tâche dans la boucle réseau et la renvoie"""
+        if self.in_loop_thread():
+            return self.loop.create_task(coro)
+        return self.call(self.loop.create_task, coro)
+
+_core = None
+_core_lock = threading.Lock()
+
+def get_network_core() -> NetworkCore:
+    """Renvoie la boucle réseau partagée par l'application, démarrée au premier appel"""
+    global _core
+    with _core_lock:
+        if _core is None:
+            _core = NetworkCore()
+        _core.start()
+        return _core
@@ -1,22 +1,206 @@
+import asyncio
 import socket
+import struct
+import time
+from networking.network_core import NetworkCore, get_network_core
+from utils.logging_setup import get_logger
+
+logger = get_logger("networking.camera")
 
 udp_ip = "esp32-device.local"  # Utilisez le nom mDNS de l'ESP32
 udp_port = 4210  # Le port UDP sur lequel l'ESP32 écoute
 
-def send_position(x: float, y: float):
-    try:
-        message = f"X{x}Y{y}\n"
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.sendto(message.encode(), (udp_ip, udp_port))
-        sock.close()
-    except Exception as e:
-        print(f"Erreur : {e}")
-
-def send_taille_terrain(x: float, y: float):
-    try:
-        message = f"Xmax={x},Ymax={y}\n"
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.sendto(message.encode(), (udp_ip, udp_port))
-        sock.close()
-    except Exception as e:
-        print(f"Erreur : {e}")
\ No newline at end of file
+# Trame binaire des positions (little-endian, 12 octets) :
+# octet magique, version, numéro de séquence (uint16), horodatage en ms (uint32),
+# x et y en centimètres (uint16). L'octet magique n'est pas du texte, ce qui permet à
+# l'ESP32 de distinguer une trame binaire d'une commande ASCII "X..Y..".
+BINARY_MAGIC = 0xB5
+BINARY_VERSION = 1
+BINARY_FRAME = struct.Struct("<BBHIHH")
+
+# Négociation : l'ESP32 répond "PROTO=<version>" à "PROTO?<version>", un ancien
+# firmware ne répond pas et le format ASCII est conservé
+PROTO_HELLO = f"PROTO?{BINARY_VERSION}\n".encode()
+PROTO_ACK = f"PROTO={BINARY_VERSION}".encode()
+
+def encode_binary_position(seq: int, timestamp_ms: int, x: float, y: float) -> bytes:
+    """Encode une position (en mètres) dans une trame binaire"""
+    x_cm = min(max(int(round(x * 100)), 0), 0xFFFF)
+    y_cm = min(max(int(round(y * 100)), 0), 0xFFFF)
+    return BINARY_FRAME.pack(BINARY_MAGIC, BINARY_VERSION, seq & 0xFFFF,
+                             timestamp_ms & 0xFFFFFFFF, x_cm, y_cm)
+
+class PositionSender(asyncio.DatagramProtocol):
+    """Envoi UDP des positions du palet vers l'ESP32 de la caméra.
+
+    Le nom mDNS est résolu une seule fois par une tâche de la boucle réseau (NetworkCore),
+    puis à nouveau après une erreur d'envoi ou à l'expiration du TTL. Les envois passent
+    par un unique transport UDP connecté : send() ne bloque jamais l'appelant, une
+    position qui ne peut pas partir tout de suite est simplement abandonnée.
+
+    protocol vaut "auto" (trame binaire si l'ESP32 la confirme, ASCII sinon), "binary"
+    ou "ascii".
+    """
+
+    def __init__(self, host: str = udp_ip, port: int = udp_port,
+                 resolve_ttl: float = 60.0, retry_delay: float = 2.0,
+                 protocol: str = "auto", negotiation_timeout: float = 0.5,
+                 negotiation_retry: float = 1.0, core: NetworkCore = None):
+        if protocol not in ("auto", "binary", "ascii"):
+            raise ValueError(f"Protocole inconnu : {protocol}")
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.negotiation_timeout = negotiation_timeout
+        # Premier délai (s) avant de renégocier après une négociation sans réponse, doublé à chaque échec
+        self.negotiation_retry = negotiation_retry
+        self.binary = protocol == "binary"  # Format effectivement utilisé
+        self._seq = 0
+        self._t0 = time.monotonic()
+        self.resolve_ttl = resolve_ttl  # Durée de validité de l'adresse résolue (s)
+        self.retry_delay = retry_delay  # Délai avant une nouvelle résolution après échec (s)
+        self.core = core or get_network_core()
+        self.running = False
+        self.transport = None
+        self._task = None
+        self._resolve_event = None
+        self._ack = None  # Réponse attendue pendant la négociation
+        self._terrain_message = None  # Renvoyé à chaque nouvelle résolution
+
+    def start(self):
+        """Démarre la tâche de résolution de l'adresse de l'ESP32"""
+        if self.running:
+            return
+        self.running = True
+        self.core.call(self._start)
+
+    def _start(self):
+        self._resolve_event = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._resolve_loop())
+
+    def stop(self):
+        """Annule la tâche de résolution et ferme le transport"""
+        if not self.running:
+            return
+        self.running = False
+        if self.core.running:
+            self.core.call(self._stop)
+
+    def _stop(self):
+        # Une résolution en cours (getaddrinfo) est abandonnée sans être attendue
+        self._task.cancel()
+        self._task = None
+        transport, self.transport = self.transport, None
+        if transport:
+            transport.close()
+
+    async def _resolve_loop(self):
+        while True:
+            resolved = await self._resolve()
+            deadline = time.monotonic() + (self.resolve_ttl if resolved else self.retry_delay)
+            backoff = self.negotiation_retry
+            while True:
+                # Accusé PROTO perdu (ou ancien firmware) : nouvelle négociation à intervalle
+                # croissant, sans attendre la prochaine résolution
+                retry = resolved and self.protocol == "auto" and not self.binary
+                delay = deadline - time.monotonic()
+                if retry:
+                    delay = min(delay, backoff)
+                if delay <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._resolve_event.wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    if not retry or self.transport is None:
+                        break
+                self.binary = await self._negotiate(self.transport)
+                backoff = min(backoff * 2, self.resolve_ttl)
+            self._resolve_event.clear()
+
+    async def _resolve(self) -> bool:
+        """Résout l'adresse de l'ESP32 et remplace le transport connecté"""
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(self.host, self.port, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+            transport, _ = await loop.create_datagram_endpoint(lambda: self, remote_addr=infos[0][4])
+        except OSError as e:
+            logger.warning("Erreur de résolution de %s : %s", self.host, e)
+            return False
+
+        try:
+            if self.protocol == "auto":
+                self.binary = await self._negotiate(transport)
+            elif self.protocol == "binary":
+                self._hello(transport)
+        except asyncio.CancelledError:
+            transport.close()
+            raise
+        old_transport, self.transport = self.transport, transport
+        if old_transport:
+            old_transport.close()
+
+        # La caméra a pu redémarrer : lui renvoyer les dimensions du terrain
+        if self._terrain_message:
+            self._send(self._terrain_message)
+        return True
+
+    async def _negotiate(self, transport) -> bool:
+        """Demande à l'ESP32 s'il accepte les trames binaires"""
+        self._ack = asyncio.get_running_loop().create_future()
+        try:
+            self._hello(transport)
+            await asyncio.wait_for(self._ack, self.negotiation_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._ack = None
+
+    def _hello(self, transport):
+        # L'ESP32 oublie sa séquence à chaque "PROTO?" : la numérotation repart de zéro
+        self._seq = 0
+        transport.sendto(PROTO_HELLO)
+
+    def datagram_received(self, data: bytes, addr):
+        if self._ack is not None and not self._ack.done() and data.strip() == PROTO_ACK:
+            self._ack.set_result(True)
+
+    def error_received(self, exc):
+        # ESP32 injoignable ou adresse changée : forcer une nouvelle résolution
+        self._request_resolve()
+
+    def _request_resolve(self):
+        if self.running and self._resolve_event is not None:
+            self._resolve_event.set()
+
+    def send(self, message: bytes) -> bool:
+        """Envoie un message sans jamais bloquer, renvoie False si le message est abandonné"""
+        if self.core.in_loop_thread():
+            return self._send(message)
+        if self.transport is None:
+            return False
+        self.core.call_soon(self._send, message)
+        return True
+
+    def _send(self, message: bytes) -> bool:
+        transport = self.transport
+        if transport is None or transport.is_closing():
+            return False
+        if transport.get_write_buffer_size():
+            # Tampon d'émission plein : la prochaine position remplacera celle-ci
+            return False
+        transport.sendto(message)
+        return True
+
+    def send_position(self, x: float, y: float) -> bool:
+        """Envoie une position en mètres, au centimètre près en binaire, au mètre près en ASCII"""
+        if self.binary:
+            self._seq = (self._seq + 1) & 0xFFFF
+            timestamp_ms = int((time.monotonic() - self._t0) * 1000)
+            return self.send(encode_binary_position(self._seq, timestamp_ms, x, y))
+        return self.send(f"X{int(x)}Y{int(y)}\n".encode())
+
+    def send_taille_terrain(self, x: float, y: float) -> bool:
+        self._terrain_message = f"Xmax={x},Ymax={y}\n".encode()
+        return self.send(self._terrain_message)
@@ -1,13 +1,36 @@
+import asyncio
 import socket
-import threading
-from typing import Dict, Callable
+from typing import Callable
+from networking.network_core import NetworkCore, get_network_core
+from utils.logging_setup import get_logger
 
-class UDPDiscoveryServer:
-    def __init__(self, callback: Callable[[str, str], None]):
+logger = get_logger("networking.discovery")
+
+def get_local_ip() -> str:
+    """Adresse IP locale utilisée pour joindre le réseau, communiquée au palet comme adresse du broker"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(('8.8.8.8', 80))
+        return s.getsockname()[0]
+    finally:
+        s.close()
+
+class UDPDiscoveryServer(asyncio.DatagramProtocol):
+    """Écoute des demandes de découverte du palet ("REQUEST_IP") sur le port 12345.
+
+    Plusieurs palets (tags) peuvent être découverts : chacun est identifié par son
+    adresse IP (device_id). La socket est gérée par la boucle réseau (NetworkCore) : le
+    callback de découverte est appelé dans le thread de cette boucle et doit rendre la
+    main rapidement.
+    """
+
+    def __init__(self, callback: Callable[[str, str], None], core: NetworkCore = None, port: int = 12345):
         self.callback = callback
+        self.core = core or get_network_core()
+        self.port = port
         self.running = False
-        self.udp_socket = None
-        self.server_thread = None
+        self.transport = None
+        self.devices = {}  # device_id (IP) -> adresse (ip, port) du palet
         self.esp32_addr = None
         self.last_esp32_ip = None  # Stockage de la dernière IP
     
@@ -15,66 +38,79 @@ class UDPDiscoveryServer:
         return self.esp32_addr, self.last_esp32_ip
 
     def start(self):
+        if self.running:
+            return
+        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        udp_socket.bind(('', self.port))
+        udp_socket.setblocking(False)
+        self.core.call(self._open, udp_socket)
         self.running = True
-        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        self.udp_socket.bind(('', 12345))
-        
-        self.server_thread = threading.Thread(target=self._listen_for_devices)
-        self.server_thread.daemon = True
-        self.server_thread.start()
+
+    async def _open(self, udp_socket):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: self, sock=udp_socket)
 
     def stop(self):
+        if not self.running:
+            return
         self.running = False
-        if self.udp_socket:
-            self.udp_socket.close()
-        if self.server_thread:
-            self.server_thread.join()
+        # La fermeture est faite par la boucle réseau : aucun thread bloqué à réveiller
+        if self.core.running:
+            self.core.call(self.transport.close)
+        self.transport = None
 
-    def _listen_for_devices(self):
-        while self.running:
-            try:
-                data, addr = self.udp_socket.recvfrom(1024)
-                message = data.decode()
-                
-                if message == "REQUEST_IP":
-                    if self.esp32_addr is None or self.esp32_addr == addr:
-                        self.esp32_addr = addr
-                        self.last_esp32_ip = addr[0]  # Stocker l'IP
-                        device_name = f"Palet_{addr[0]}"
-                        device_id = addr[0]
+    def datagram_received(self, data: bytes, addr):
+        try:
+            message = data.decode()
+            if message == "REQUEST_IP":
+                device_id = addr[0]
+                if self.devices.get(device_id) != addr:
+                    self.devices[device_id] = addr
+                    self.esp32_addr = addr
+                    self.last_esp32_ip = device_id  # Stocker l'IP
 
-                        if self.callback:
-                            self.callback(device_name, device_id)
-                    
-            except Exception as e:
-                print(f"Erreur UDP: {e}")
-                if not self.running:
-                    break
-                    
-            except Exception as e:
-                print(f"Erreur UDP: {e}")
-                if not self.running:
-                    break
+                # Un palet redémarré redemande l'IP : le callback est appelé à chaque demande
+                if self.callback:
+                    self.callback(f"Palet_{device_id}", device_id)
+        except Exception as e:
+            logger.error("Erreur UDP: %s", e)
+
+    def error_received(self, exc):
+        logger.error("Erreur UDP: %s", exc)
 
     def send_response(self, device_id: str, message):
         try:
-            if self.esp32_addr is None:
+            addr = self.devices.get(device_id)
+            if addr is None or self.transport is None:
                 return False
                 
             if isinstance(message, str):
-                sent = self.udp_socket.sendto(message.encode(), self.esp32_addr)
+                self.core.call_soon(self.transport.sendto, message.encode(), addr)
                 if message == "deconnect":
-                    self.esp32_addr = None
+                    self._forget(device_id)
                 return True
             elif isinstance(message, dict):
                 if 'broker_ip' in message:
                     broker_ip = message['broker_ip']
-                    sent = self.udp_socket.sendto(broker_ip.encode(), self.esp32_addr)
+                    self.core.call_soon(self.transport.sendto, broker_ip.encode(), addr)
                     return True
                     
             return False
         except Exception as e:
-            print(f"Erreur envoi UDP: {e}")
-            return False
\ No newline at end of file
+            logger.error("Erreur envoi UDP: %s", e)
+            return False
+
+    def send_to_all(self, message) -> bool:
+        """Envoie message à tous les palets découverts, vrai si au moins un envoi a eu lieu"""
+        sent = False
+        for device_id in list(self.devices):
+            sent = self.send_response(device_id, message) or sent
+        return sent
+
+    def _forget(self, device_id: str):
+        self.devices.pop(device_id, None)
+        if self.last_esp32_ip == device_id:
+            self.last_esp32_ip = next(reversed(self.devices), None)
+            self.esp32_addr = self.devices.get(self.last_esp32_ip)
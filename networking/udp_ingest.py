@@ -0,0 +1,114 @@
+import asyncio
+import socket
+import time
+from networking.distance_parser import DistanceParser, DEFAULT_ANCHOR_IDS, BINARY_HEADER, BINARY_MAGIC
+from networking.network_core import NetworkCore, get_network_core
+from tracking.frames import DEFAULT_TAG, FrameAssembler
+from utils.logging_setup import get_logger
+
+logger = get_logger("networking.ingest")
+
+INGEST_PORT = 12346
+_BINARY_PREFIX = bytes((BINARY_MAGIC,))
+# Un datagramme binaire de moins de REORDER_WINDOW numéros en retard est un doublon ou un
+# message réordonné ; un retard plus grand, ou un silence de RESYNC_AFTER (s), est un
+# redémarrage du palet et la séquence repart du numéro reçu
+REORDER_WINDOW = 64
+RESYNC_AFTER = 1.0
+
+class UDPIngestServer(asyncio.DatagramProtocol):
+    """Réception directe des distances envoyées par le palet en UDP, sans broker MQTT.
+
+    Chaque datagramme contient un message texte identique à celui publié sur MQTT
+    ("84:1.86;85:1.59;86:1.33") ou sa variante binaire (voir distance_parser). Comme pour
+    MQTTClient, message_callback est appelé une fois par message avec un DistanceFrame
+    complet. Chaque adresse IP source est un tag distinct (un ESP32 par palet). Les
+    messages binaires arrivés après un message plus récent du même tag sont ignorés.
+    Les datagrammes sont reçus et traités dans la boucle réseau (NetworkCore).
+    """
+
+    def __init__(self, message_callback, connection_callback=None,
+                 port: int = INGEST_PORT, anchor_ids=DEFAULT_ANCHOR_IDS, core: NetworkCore = None):
+        self.message_callback = message_callback
+        self.connection_callback = connection_callback
+        self.port = port
+        self.core = core or get_network_core()
+        self.parser = DistanceParser(anchor_ids)
+        self.assembler = FrameAssembler()
+        self.paused = False
+        self.running = False
+        self.transport = None
+        self._last_seq = {}  # Tag -> (dernier numéro de séquence binaire reçu, instant de réception)
+
+    def start(self):
+        if self.running:
+            return
+        self.assembler.reset()
+        self._last_seq = {}
+        self.paused = False
+        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        udp_socket.bind(('', self.port))
+        udp_socket.setblocking(False)
+        self.core.call(self._open, udp_socket)
+        self.running = True
+        logger.info("Réception UDP des distances sur le port %s", self.port)
+        if self.connection_callback:
+            self.connection_callback(True)
+
+    async def _open(self, udp_socket):
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: self, sock=udp_socket)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.core.running:
+            self.core.call(self.transport.close)
+        self.transport = None
+        if self.connection_callback:
+            self.connection_callback(False)
+
+    def pause(self, unsubscribe: bool = False):
+        """Suspend la transmission des mesures, le port reste ouvert (unsubscribe est propre à MQTT)"""
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def datagram_received(self, payload: bytes, addr):
+        if not self.paused:
+            self.handle_datagram(payload, time.monotonic(), addr[0])
+
+    def error_received(self, exc):
+        logger.error("Erreur UDP: %s", exc)
+
+    def handle_datagram(self, payload: bytes, timestamp: float, tag: str = DEFAULT_TAG):
+        """Traite un datagramme reçu (appelé dans la boucle réseau)"""
+        try:
+            if payload[:1] == _BINARY_PREFIX:
+                distances = self.parser.parse_binary(payload)
+                # Seul un message valide fait avancer la séquence du tag
+                if distances is not None and self._is_stale(payload, timestamp, tag):
+                    return
+            else:
+                distances = self.parser.parse(payload)
+            if distances is None:
+                logger.warning("Message invalide : %r", payload)
+                return
+            frame = self.assembler.push(distances, timestamp, tag)
+            if frame is not None:
+                self.message_callback(frame)
+        except Exception as e:
+            logger.warning("Erreur lors du traitement du message: %s", e)
+
+    def _is_stale(self, payload: bytes, timestamp: float, tag: str) -> bool:
+        """Vrai pour un datagramme binaire déjà reçu ou un peu plus ancien que le dernier (réordonné par le réseau)"""
+        seq = BINARY_HEADER.unpack_from(payload)[2]
+        last = self._last_seq.get(tag)
+        if last is not None and timestamp - last[1] < RESYNC_AFTER \
+                and (last[0] - seq) & 0xFFFF < REORDER_WINDOW:
+            return True
+        self._last_seq[tag] = (seq, timestamp)
+        return False
@@ -0,0 +1,87 @@
+from typing import Iterable, NamedTuple, Optional, Tuple, Union
+
+# Identifiants des capteurs par défaut, dans l'ordre d1, d2, d3. Un identifiant est
+# l'adresse courte UWB du capteur telle que le palet l'écrit, en hexadécimal : 86 ou
+# "86" désigne l'adresse 0x86, "8A" l'adresse 0x8A.
+# 86 correspond à d1 qui correspond au capteur situé en haut à gauche (HG)
+# 85 correspond à d2 qui correspond au capteur situé en haut à droite (HD)
+# 84 correspond à d3 qui correspond au capteur situé en bas au milieu (BM)
+DEFAULT_ANCHOR_IDS = (86, 85, 84)
+
+# Nombre minimal de distances pour calculer une position
+MIN_ANCHORS = 3
+
+AnchorId = Union[int, str]
+
+def anchor_address(anchor_id: AnchorId) -> int:
+    """Adresse courte UWB d'un capteur à partir de son identifiant (hexadécimal)"""
+    return int(str(anchor_id), 16)
+
+class Anchor(NamedTuple):
+    """Capteur (ancre UWB) fixé au bord du terrain"""
+    id: AnchorId  # Identifiant du capteur dans les messages du palet
+    x: float     # Position en mètres
+    y: float
+    weight: float = 1.0  # Poids de ses mesures dans les moindres carrés
+
+class AnchorRegistry:
+    """Registre des capteurs : identifiant, position sur le terrain et poids de chacun.
+
+    Sans liste explicite, le registre contient les trois capteurs historiques (HG, HD,
+    BM), placés d'après les dimensions du terrain. Une liste explicite (anchors.layout
+    dans la configuration) donne des positions fixes en mètres et permet d'utiliser
+    plus de trois capteurs sur les grands terrains.
+    """
+
+    def __init__(self, anchors: Optional[Iterable[Anchor]] = None,
+                 default_ids: Iterable[AnchorId] = DEFAULT_ANCHOR_IDS):
+        self.fixed: Optional[Tuple[Anchor, ...]] = None
+        if anchors is not None:
+            self.fixed = tuple(Anchor(*anchor) for anchor in anchors)
+            ids = [anchor.id for anchor in self.fixed]
+            if any(anchor.weight <= 0 for anchor in self.fixed):
+                raise ValueError("Le poids d'un capteur doit être strictement positif")
+        else:
+            ids = list(default_ids)
+            if len(ids) != 3:
+                raise ValueError("Trois identifiants de capteurs attendus (HG, HD, BM)")
+        if len(ids) < MIN_ANCHORS:
+            raise ValueError(f"Au moins {MIN_ANCHORS} capteurs sont nécessaires")
+        try:
+            addresses = [anchor_address(anchor_id) for anchor_id in ids]
+        except ValueError:
+            raise ValueError(f"Identifiants de capteurs non hexadécimaux : {ids}")
+        if len(set(addresses)) != len(ids):
+            raise ValueError(f"Identifiants de capteurs en double : {ids}")
+        self.ids: Tuple[AnchorId, ...] = tuple(ids)
+
+    @classmethod
+    def from_settings(cls, settings) -> "AnchorRegistry":
+        """Construit le registre depuis la section anchors de la configuration (AnchorSettings)"""
+        if not settings.layout:
+            return cls(default_ids=(settings.HG, settings.HD, settings.BM))
+        try:
+            anchors = [Anchor(item["id"], float(item["x"]), float(item["y"]),
+                              float(item.get("weight", 1.0)))
+                       for item in settings.layout]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Capteur mal décrit dans anchors.layout "
+                             f"(champs id, x, y et weight optionnel attendus) : {e}")
+        return cls(anchors)
+
+    @property
+    def follows_terrain(self) -> bool:
+        """Vrai si la position des capteurs dépend des dimensions du terrain"""
+        return self.fixed is None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def anchors(self, width: float, height: float) -> Tuple[Anchor, ...]:
+        """Capteurs dans l'ordre des distances des messages, pour un terrain de ces dimensions"""
+        if self.fixed is not None:
+            return self.fixed
+        hg, hd, bm = self.ids
+        return (Anchor(hg, 0.0, float(height)),
+                Anchor(hd, float(width), float(height)),
+                Anchor(bm, width / 2, 0.0))
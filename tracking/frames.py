@@ -0,0 +1,62 @@
+import math
+from typing import NamedTuple, Tuple, TYPE_CHECKING
+from tracking.anchors import MIN_ANCHORS
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Identifiant du tag quand la source n'en fournit pas (topic MQTT historique)
+DEFAULT_TAG = "palet"
+
+class DistanceFrame(NamedTuple):
+    """Distances mesurées par le palet vers les capteurs, à un instant donné"""
+    # Une distance par capteur du registre (tracking.anchors), dans son ordre : par défaut
+    # d1 (HG), d2 (HD) et d3 (BM). NaN pour un capteur dont la distance n'est pas connue
+    distances: Tuple[float, ...]
+    timestamp: float  # time.monotonic() à la réception
+    tag: str = DEFAULT_TAG  # Tag (palet) à l'origine de la mesure
+
+class PuckFix(NamedTuple):
+    """Position du palet calculée à partir d'un DistanceFrame"""
+    x: float  # En mètres
+    y: float
+    timestamp: float  # Horodatage du DistanceFrame d'origine
+    tag: str = DEFAULT_TAG
+    vx: float = 0.0  # Vitesse (m/s), estimée par le filtre de suivi s'il est activé
+    vy: float = 0.0
+    quality: float = 1.0  # Qualité de la position, de 0 (douteuse) à 1 (voir tracking.quality)
+
+class TagPositions(NamedTuple):
+    """Dernière position connue de chaque tag suivi, publiée après chaque lot de mesures"""
+    tags: Tuple[str, ...]
+    positions: "np.ndarray"   # Tableau (N, 2) des positions x, y en mètres
+    timestamps: "np.ndarray"  # Tableau (N,) des horodatages des mesures
+    primary: str  # Tag du palet de jeu, suivi par la caméra et enregistré en match
+
+class FrameAssembler:
+    """Complète les mesures partielles d'un tag avec les dernières distances reçues de ce tag.
+
+    Un DistanceFrame est produit dès que MIN_ANCHORS distances sont connues : avec plus de
+    trois capteurs, ceux qui ne sont pas encore à portée du tag restent à NaN.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # Dernières distances connues de chaque tag, pour compléter les messages partiels
+        self._last = {}
+
+    def push(self, distances, timestamp: float, tag: str = DEFAULT_TAG):
+        """Renvoie un DistanceFrame, ou None tant que moins de MIN_ANCHORS distances sont connues"""
+        if None in distances:
+            last = self._last.get(tag)
+            if last is not None:
+                distances = tuple(previous if d is None else d for d, previous in zip(distances, last))
+            self._last[tag] = distances
+            if len(distances) - distances.count(None) < MIN_ANCHORS:
+                return None
+            distances = tuple(math.nan if d is None else d for d in distances)
+        else:
+            self._last[tag] = distances
+        return DistanceFrame(distances, timestamp, tag)
@@ -0,0 +1,154 @@
+from typing import Optional
+from tracking.frames import PuckFix
+
+FILTER_MODELS = ("none", "cv", "ca")
+# Bruits de processus réglés par rejeu d'un match simulé (fichiers_tests/bench_kalman.py)
+DEFAULT_PROCESS_NOISE = {"cv": 100.0, "ca": 3000.0}
+
+class KalmanFilter:
+    """Filtre de Kalman du palet, à vitesse constante ("cv") ou accélération constante ("ca").
+
+    Les axes x et y sont filtrés indépendamment avec le même modèle et les mêmes bruits :
+    ils partagent donc une seule matrice de covariance (symétrique, 2x2 ou 3x3), gardée
+    dans des attributs float et mise à jour en place. Aucune liste ni matrice n'est
+    créée par mesure : un échantillon coûte quelques dizaines d'opérations sur des floats.
+
+    process_noise est la densité spectrale du bruit d'accélération ("cv", m²/s³) ou de
+    jerk ("ca", m²/s⁵), par défaut celle de DEFAULT_PROCESS_NOISE, measurement_noise
+    l'écart type (m) des positions calculées. Le filtre repart de la mesure suivante
+    après un trou de plus de reset_gap secondes (palet perdu, match en pause).
+    """
+
+    __slots__ = ("model", "q", "r", "reset_gap", "initialized", "timestamp",
+                 "px", "vx", "ax", "py", "vy", "ay",
+                 "p00", "p01", "p02", "p11", "p12", "p22")
+
+    def __init__(self, model: str = "cv", process_noise: Optional[float] = None,
+                 measurement_noise: float = 0.15, reset_gap: float = 1.0):
+        if model not in DEFAULT_PROCESS_NOISE:
+            raise ValueError(f"Modèle de filtre inconnu : {model} (cv ou ca)")
+        self.model = model
+        self.q = float(process_noise if process_noise is not None else DEFAULT_PROCESS_NOISE[model])
+        self.r = float(measurement_noise) ** 2
+        self.reset_gap = reset_gap
+        self.reset()
+
+    def reset(self):
+        """Oublie l'état : la prochaine mesure réinitialise le filtre"""
+        self.initialized = False
+        self.timestamp = 0.0
+        self.px = self.vx = self.ax = 0.0
+        self.py = self.vy = self.ay = 0.0
+        self.p00 = self.p01 = self.p02 = self.p11 = self.p12 = self.p22 = 0.0
+
+    def _initialize(self, x: float, y: float, timestamp: float):
+        self.initialized = True
+        self.timestamp = timestamp
+        self.px, self.py = x, y
+        self.vx = self.vy = self.ax = self.ay = 0.0
+        # Position connue à la précision de la mesure, vitesse et accélération inconnues
+        self.p00 = self.r
+        self.p01 = self.p02 = self.p12 = 0.0
+        self.p11 = 100.0
+        self.p22 = 1000.0 if self.model == "ca" else 0.0
+
+    def update(self, x: float, y: float, timestamp: float, quality: float = 1.0):
+        """Intègre une position mesurée et renvoie (x, y, vx, vy) filtrés.
+
+        Le bruit de mesure est divisé par quality (0 < quality ≤ 1) : une position douteuse
+        pèse moins dans l'estimation.
+        """
+        dt = timestamp - self.timestamp
+        if not self.initialized or dt > self.reset_gap or dt < 0:
+            self._initialize(x, y, timestamp)
+            return x, y, 0.0, 0.0
+        self.timestamp = timestamp
+        q = self.q
+
+        if self.model == "cv":
+            # Prédiction : F = [[1, dt], [0, 1]], bruit d'accélération blanc continu
+            if dt > 0:
+                self.px += dt * self.vx
+                self.py += dt * self.vy
+                p01, p11 = self.p01, self.p11
+                qdt = q * dt
+                self.p00 += dt * (2 * p01 + dt * p11) + qdt * dt * dt / 3
+                self.p01 = p01 + dt * p11 + qdt * dt / 2
+                self.p11 = p11 + qdt
+
+            # Correction par la position mesurée (H = [1, 0])
+            p00, p01 = self.p00, self.p01
+            s = p00 + self.r / quality
+            k0, k1 = p00 / s, p01 / s
+            ex, ey = x - self.px, y - self.py
+            self.px += k0 * ex
+            self.py += k0 * ey
+            self.vx += k1 * ex
+            self.vy += k1 * ey
+            self.p00 = p00 - k0 * p00
+            self.p01 = p01 - k0 * p01
+            self.p11 -= k1 * p01
+            return self.px, self.py, self.vx, self.vy
+
+        # Prédiction : F = [[1, dt, dt²/2], [0, 1, dt], [0, 0, 1]], bruit de jerk blanc continu
+        if dt > 0:
+            h = dt * dt / 2
+            self.px += dt * self.vx + h * self.ax
+            self.vx += dt * self.ax
+            self.py += dt * self.vy + h * self.ay
+            self.vy += dt * self.ay
+            p00, p01, p02 = self.p00, self.p01, self.p02
+            p11, p12, p22 = self.p11, self.p12, self.p22
+            a0 = p00 + dt * p01 + h * p02
+            a1 = p01 + dt * p11 + h * p12
+            a2 = p02 + dt * p12 + h * p22
+            b1 = p11 + dt * p12
+            b2 = p12 + dt * p22
+            dt2 = dt * dt
+            dt3 = dt2 * dt
+            self.p00 = a0 + dt * a1 + h * a2 + q * dt3 * dt2 / 20
+            self.p01 = a1 + dt * a2 + q * dt2 * dt2 / 8
+            self.p02 = a2 + q * dt3 / 6
+            self.p11 = b1 + dt * b2 + q * dt3 / 3
+            self.p12 = b2 + q * dt2 / 2
+            self.p22 = p22 + q * dt
+
+        # Correction par la position mesurée (H = [1, 0, 0])
+        p00, p01, p02 = self.p00, self.p01, self.p02
+        s = p00 + self.r / quality
+        k0, k1, k2 = p00 / s, p01 / s, p02 / s
+        ex, ey = x - self.px, y - self.py
+        self.px += k0 * ex
+        self.py += k0 * ey
+        self.vx += k1 * ex
+        self.vy += k1 * ey
+        self.ax += k2 * ex
+        self.ay += k2 * ey
+        self.p00 = p00 - k0 * p00
+        self.p01 = p01 - k0 * p01
+        self.p02 = p02 - k0 * p02
+        self.p11 -= k1 * p01
+        self.p12 -= k1 * p02
+        self.p22 -= k2 * p02
+        return self.px, self.py, self.vx, self.vy
+
+    def filter_fix(self, fix: PuckFix) -> PuckFix:
+        """Renvoie la position filtrée correspondant à une position calculée"""
+        x, y, vx, vy = self.update(fix.x, fix.y, fix.timestamp, fix.quality)
+        return PuckFix(x, y, fix.timestamp, fix.tag, vx, vy, fix.quality)
+
+    def predict(self, horizon: float):
+        """Position (x, y) prévue horizon secondes après la dernière mesure, sans modifier l'état"""
+        if self.model == "cv":
+            return self.px + horizon * self.vx, self.py + horizon * self.vy
+        h = horizon * horizon / 2
+        return (self.px + horizon * self.vx + h * self.ax,
+                self.py + horizon * self.vy + h * self.ay)
+
+def create_filter(model: str, process_noise: Optional[float] = None, measurement_noise: float = 0.15):
+    """Crée le filtre configuré, ou None pour "none" (positions transmises telles quelles)"""
+    if model not in FILTER_MODELS:
+        raise ValueError(f"Filtre inconnu : {model} ({', '.join(FILTER_MODELS)})")
+    if model == "none":
+        return None
+    return KalmanFilter(model, process_noise, measurement_noise)
@@ -0,0 +1,247 @@
+import queue
+import threading
+from typing import Callable, List, Optional
+from tracking.frames import DistanceFrame, PuckFix, TagPositions
+from tracking.kalman import KalmanFilter
+from tracking.puck_position import PuckPositionCalculator
+from tracking.quality import FixQuality
+from tracking.recording import MatchRecorder
+from tracking.tags import TagTable
+from utils.logging_setup import get_logger
+
+logger = get_logger("tracking.pipeline")
+
+_STOP = object()
+
+class TrackingPipeline:
+    """Pipeline de suivi des palets, exécuté dans son propre thread.
+
+    Les DistanceFrame soumis par le réseau sont mis en file. Le thread du pipeline vide
+    la file par lots, valide et résout chaque lot par moindres carrés vectorisés, note la
+    qualité de chaque position (FixQuality) en abandonnant les positions impossibles,
+    puis met à jour la table des tags (TagTable). Deux types d'abonnés :
+
+    - subscribe() : chaque position calculée (PuckFix) du tag principal, le palet de jeu,
+      pour la caméra... ;
+    - subscribe_tags() : la dernière position de tous les tags (TagPositions), une fois
+      par lot, pour l'affichage.
+
+    Le tag principal est primary_tag, ou à défaut le premier tag reçu. Si un filtre de
+    suivi (KalmanFilter) est donné, ses positions sont lissées et leur vitesse estimée
+    avant d'être publiées, y compris dans la table des tags. Si le calculateur affine ses
+    positions (refine_iterations) et que warm_start est vrai, l'affinage peut partir de la
+    dernière position de chaque tag quand elle explique mieux les distances. Un
+    enregistreur (set_recorder) reçoit chaque lot : distances brutes et positions publiées.
+
+    Les abonnés et l'enregistreur sont appelés dans le thread du pipeline et doivent
+    rendre la main rapidement. Le pipeline ne dépend pas de Qt et fonctionne aussi sans
+    interface.
+    """
+
+    def __init__(self, calculator: PuckPositionCalculator = None, queue_size: int = 64,
+                 primary_tag: Optional[str] = None, tracking_filter: Optional[KalmanFilter] = None,
+                 quality: Optional[FixQuality] = None, warm_start: bool = True):
+        self.calculator = calculator or PuckPositionCalculator()
+        self.primary_tag = primary_tag
+        self.tracking_filter = tracking_filter
+        self.quality = quality or FixQuality(self.calculator)
+        self.warm_start = warm_start
+        self.recorder: Optional[MatchRecorder] = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._subscribers = ()
+        self._tag_subscribers = ()
+        self._subscribers_lock = threading.Lock()
+        self._thread = None
+        self.tag_table = None  # Créée au premier lot, dans le thread du pipeline (import de NumPy)
+
+    def subscribe(self, callback: Callable[[PuckFix], None]):
+        """Abonne callback aux positions calculées du tag principal"""
+        with self._subscribers_lock:
+            self._subscribers = self._subscribers + (callback,)
+
+    def unsubscribe(self, callback: Callable[[PuckFix], None]):
+        with self._subscribers_lock:
+            self._subscribers = tuple(s for s in self._subscribers if s != callback)
+
+    def subscribe_tags(self, callback: Callable[[TagPositions], None]):
+        """Abonne callback aux positions de tous les tags, publiées après chaque lot"""
+        with self._subscribers_lock:
+            self._tag_subscribers = self._tag_subscribers + (callback,)
+
+    def unsubscribe_tags(self, callback: Callable[[TagPositions], None]):
+        with self._subscribers_lock:
+            self._tag_subscribers = tuple(s for s in self._tag_subscribers if s != callback)
+
+    def set_recorder(self, recorder: Optional[MatchRecorder]):
+        """Enregistre les lots suivants avec recorder, ou arrête l'enregistrement (None)"""
+        self.recorder = recorder
+
+    def start(self):
+        """Démarre le thread du pipeline"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="TrackingPipeline")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le thread du pipeline, les mesures encore en file sont abandonnées"""
+        if self._thread is None:
+            return
+        self._discard_pending()
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, frame: DistanceFrame):
+        """Soumet une mesure sans jamais bloquer (appelable depuis n'importe quel thread).
+
+        Si la file est pleine, la mesure la plus ancienne est abandonnée.
+        """
+        while True:
+            try:
+                self._queue.put_nowait(frame)
+                return
+            except queue.Full:
+                self._discard_pending(1)
+
+    def _discard_pending(self, count: Optional[int] = None):
+        try:
+            while count is None or count > 0:
+                self._queue.get_nowait()
+                if count is not None:
+                    count -= 1
+        except queue.Empty:
+            pass
+
+    def process_batch(self, frames: List[DistanceFrame]) -> List[PuckFix]:
+        """Résout un lot de mesures, met à jour la table des tags et renvoie les
+        positions du tag principal, dans l'ordre des mesures"""
+        table = self.tag_table
+        if table is None:
+            table = self.tag_table = TagTable()
+        np = table._np
+        if self.primary_tag is None:
+            self.primary_tag = frames[0].tag
+            logger.info("Tag principal : %s", self.primary_tag)
+
+        n = len(frames)
+        slot_of = table.slot
+        distances = np.array([frame.distances for frame in frames], dtype=float).reshape(n, -1)
+        timestamps = np.fromiter((frame.timestamp for frame in frames), dtype=float, count=n)
+        slots = np.fromiter((slot_of(frame.tag) for frame in frames), dtype=np.intp, count=n)
+
+        calculator = self.calculator
+        # Géométrie des capteurs lue une seule fois : elle peut être remplacée pendant le lot
+        geometry = calculator.geometry
+        recorder = self.recorder
+        if recorder is not None:
+            recorded = (distances, timestamps, slots)
+            rows = np.arange(n)
+        valid = calculator.valid_distances_mask(distances, geometry)
+        if not valid.all():
+            distances, timestamps, slots = distances[valid], timestamps[valid], slots[valid]
+            if recorder is not None:
+                rows = rows[valid]
+        if not len(slots):
+            if recorder is not None:
+                self._record(recorder, *recorded)
+            return []
+        usable = calculator.usable_mask(distances, geometry)
+        if not usable.all():
+            distances = np.where(usable, distances, np.nan)
+        starts = table.positions[slots] if self.warm_start and calculator.refine_iterations else None
+        positions = calculator.solve_positions(distances, starts, geometry)
+
+        # Qualité de chaque position : les positions impossibles sont abandonnées
+        quality_stage = self.quality
+        quality = quality_stage.score_batch(distances, positions, geometry)
+        reacquired = quality_stage.gate(quality, positions, timestamps, slots, table)
+        kept = (quality > 0) & (quality >= quality_stage.min_quality)
+        if not kept.all():
+            positions, timestamps, slots = positions[kept], timestamps[kept], slots[kept]
+            quality, reacquired = quality[kept], reacquired[kept]
+            if recorder is not None:
+                rows = rows[kept]
+        if not len(slots):
+            if recorder is not None:
+                self._record(recorder, *recorded)
+            return []
+        calculator.clamp_positions(positions, geometry)
+        table.update(slots, positions, timestamps)
+
+        primary_slot = table.index.get(self.primary_tag)
+        fixes = []
+        if primary_slot is not None:
+            primary_rows = np.flatnonzero(slots == primary_slot)
+            primary = self.primary_tag
+            fixes = [PuckFix(float(positions[i, 0]), float(positions[i, 1]), float(timestamps[i]), primary,
+                             quality=float(quality[i]))
+                     for i in primary_rows]
+            tracking_filter = self.tracking_filter
+            if tracking_filter is not None and fixes:
+                filtered = []
+                for fix, reset in zip(fixes, reacquired[primary_rows].tolist()):
+                    # Palet retrouvé loin de sa dernière position : le filtre repart de cette mesure
+                    if reset:
+                        tracking_filter.reset()
+                    filtered.append(tracking_filter.filter_fix(fix))
+                fixes = filtered
+                positions[primary_rows] = [fix[:2] for fix in fixes]
+                table.positions[primary_slot] = fixes[-1][:2]
+        if recorder is not None:
+            self._record(recorder, *recorded, rows, positions, quality)
+        return fixes
+
+    def _record(self, recorder: MatchRecorder, distances, timestamps, slots, rows=None,
+                positions=None, quality=None):
+        """Transmet un lot à l'enregistreur : NaN et qualité nulle pour les mesures rejetées"""
+        np = self.tag_table._np
+        n = len(timestamps)
+        published = np.full((n, 2), np.nan)
+        scores = np.zeros(n)
+        if rows is not None:
+            published[rows] = positions
+            scores[rows] = quality
+        recorder.record(timestamps, slots, distances, published, scores, self.tag_table.tags)
+
+    def _next_batch(self) -> List:
+        """Attend une mesure puis prend toutes celles déjà en file"""
+        batch = [self._queue.get()]
+        try:
+            while True:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = _STOP in batch
+            if stop:
+                batch = batch[:batch.index(_STOP)]
+            if batch:
+                try:
+                    fixes = self.process_batch(batch)
+                except Exception as e:
+                    logger.error("Erreur lors du calcul d'un lot de positions: %s", e)
+                    fixes = []
+                self._publish(fixes)
+            if stop:
+                return
+
+    def _publish(self, fixes: List[PuckFix]):
+        for fix in fixes:
+            for callback in self._subscribers:
+                try:
+                    callback(fix)
+                except Exception as e:
+                    logger.error("Erreur dans un abonné du pipeline de suivi: %s", e)
+        tag_subscribers = self._tag_subscribers
+        if tag_subscribers and self.tag_table is not None and len(self.tag_table):
+            snapshot = self.tag_table.snapshot(self.primary_tag)
+            for callback in tag_subscribers:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logger.error("Erreur dans un abonné du pipeline de suivi: %s", e)
@@ -1,121 +1,103 @@
 import math
-import numpy as np
-from typing import Tuple, Optional
-from networking.palet_position_sender import send_position, send_taille_terrain
-from gui.terrain_config import TerrainConfig
+from typing import NamedTuple, Optional, Tuple, TYPE_CHECKING
+from tracking.anchors import Anchor, AnchorRegistry, MIN_ANCHORS
+from tracking.terrain import TerrainConfig
+from tracking.trilateration import TrilaterationSolver, get_solver
+from utils.logging_setup import get_logger
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = get_logger("tracking")
+
+class SensorGeometry(NamedTuple):
+    """Géométrie des capteurs pour des dimensions de terrain données, jamais modifiée :
+    un changement de dimensions la remplace en une seule affectation"""
+    anchors: Tuple[Anchor, ...]
+    solver: TrilaterationSolver
+    max_distances: Tuple[float, ...]  # Distance maximale possible depuis chaque capteur (m)
+    width: float
+    height: float
 
 class PuckPositionCalculator:
-    def __init__(self):
-        # Position des capteurs (x, y) en mètres
+    """Calcule la position du palet à partir de ses distances aux capteurs du registre.
+
+    Les distances sont données dans l'ordre du registre (par défaut d1, d2, d3). Une
+    distance absente (NaN), infinie, nulle ou au-delà du coin du terrain le plus éloigné
+    du capteur est ignorée ; il faut au moins MIN_ANCHORS distances exploitables.
+
+    Avec refine_iterations > 0, la solution linéarisée est affinée par quelques itérations
+    de Levenberg-Marquardt sur les distances (TrilaterationSolver.refine_batch).
+
+    Les dimensions du terrain changent dans le thread de l'interface pendant que le
+    pipeline calcule : un lot lit geometry une seule fois et la passe aux méthodes.
+    """
+
+    def __init__(self, anchors: AnchorRegistry = None, refine_iterations: int = 0):
         self.config = TerrainConfig()
+        self.registry = anchors or AnchorRegistry()
+        self.refine_iterations = refine_iterations
+        self.geometry = self._build_geometry(self.config.width, self.config.height)
         self.config.add_observer(self)
-        self._update_sensors()
-        self.camera_tracking_enabled = False
-        
-    def set_camera_tracking(self, enabled: bool):
-        """Active ou désactive le suivi caméra"""
-        self.camera_tracking_enabled = enabled
-        if enabled:
-            # Envoyer les dimensions du terrain lors de l'activation
-            send_taille_terrain(self.config.width, self.config.height)
 
-    def _update_sensors(self):
-        # sensor1_pos qui correspond au capteur situé en bas au mileu (HG)
-        # sensor2_pos qui correspond au capteur situé en bas au mileu (HD)
-        # sensor3_pos qui correspond au capteur situé en bas au mileu (BM)
-        self.sensor1_pos = (0, self.config.height)
-        self.sensor2_pos = (self.config.width, self.config.height)
-        self.sensor3_pos = (self.config.center_x, 0)
+    def _build_geometry(self, width: float, height: float) -> SensorGeometry:
+        anchors = self.registry.anchors(width, height)
+        positions = tuple((anchor.x, anchor.y) for anchor in anchors)
+        # Solveur précalculé pour cette géométrie
+        solver = get_solver(positions, tuple(anchor.weight for anchor in anchors))
+        if not solver.well_conditioned:
+            logger.error("Capteurs alignés : la position du palet ne peut pas être calculée")
+        # Distance maximale possible depuis chaque capteur : celle du coin du terrain le plus éloigné
+        corners = ((0, 0), (width, 0), (0, height), (width, height))
+        max_distances = tuple(
+            max(math.hypot(cx - x, cy - y) for cx, cy in corners) + 0.1 for x, y in positions)
+        return SensorGeometry(anchors, solver, max_distances, width, height)
 
     def on_terrain_dimensions_changed(self, width, height):
-        self._update_sensors()
-        if self.camera_tracking_enabled:
-            send_taille_terrain(width, height)
+        self.geometry = self._build_geometry(width, height)
 
-    def calculate_position(self, d1: float, d2: float, d3: float) -> Optional[Tuple[float, float]]:
-        """Calcule la position du palet par trilatération"""
-        try:
-            # Position des capteurs
-            x1, y1 = self.sensor1_pos
-            x2, y2 = self.sensor2_pos
-            x3, y3 = self.sensor3_pos
-            
-            # Vérifier si les distances sont valides
-            if not all(isinstance(d, (int, float)) for d in [d1, d2, d3]) or \
-            any(math.isnan(d) for d in [d1, d2, d3]) or \
-            any(d <= 0 for d in [d1, d2, d3]):
-                print(f"Distances invalides : d1={d1}, d2={d2}, d3={d3}")
-                return self.config.center_x, self.config.center_y
-            
-            # Carrés des distances
-            # d1 qui correspond au capteur situé en bas au mileu (HG)
-            # d2 qui correspond au capteur situé en bas au mileu (HD)
-            # d3 qui correspond au capteur situé en bas au mileu (BM)
-            d1_sq = d1 * d1
-            d2_sq = d2 * d2
-            d3_sq = d3 * d3
-            
-            # Constantes pour simplifier les équations
-            k1 = (x1*x1 + y1*y1 - d1_sq)
-            k2 = (x2*x2 + y2*y2 - d2_sq)
-            k3 = (x3*x3 + y3*y3 - d3_sq)
-            
-            # Résolution du système d'équations
-            A = np.array([
-                [2*(x2-x1), 2*(y2-y1)],
-                [2*(x3-x1), 2*(y3-y1)]
-            ])
-            
-            b = np.array([k2 - k1, k3 - k1])
-            
-            # Vérifier le conditionnement de la matrice A
-            if np.linalg.cond(A) > 1e10:  # Si le conditionnement est trop grand
-                print("Matrice mal conditionnée")
-                return self.config.center_x, self.config.center_y
-            
-            # Résoudre le système de manière plus robuste
-            try:
-                solution = np.linalg.lstsq(A, b, rcond=None)[0]
-                x, y = solution
-                
-                # Vérifier si la solution est valide
-                if np.any(np.isnan([x, y])) or np.any(np.isinf([x, y])):
-                    print("Solution invalide (NaN ou Inf)")
-                    return self.config.center_x, self.config.center_y
-                
-                # Limiter les coordonnées aux dimensions du terrain
-                x = max(0, min(self.config.width, x))
-                y = max(0, min(self.config.height, y))
-                
-                # N'envoyer la position que si le suivi caméra est activé
-                if self.camera_tracking_enabled:
-                    send_position(int(x), int(y))
-                
-                print(f"X:{round(x, 2)}, Y:{round(y, 2)}")
-                return x, y
+    @property
+    def anchors(self) -> Tuple[Anchor, ...]:
+        return self.geometry.anchors
 
-            except np.linalg.LinAlgError as e:
-                print(f"Erreur dans la résolution du système : {e}")
-                return self.config.center_x, self.config.center_y
+    def solve_positions(self, distances: "np.ndarray", starts: Optional["np.ndarray"] = None,
+                        geometry: Optional[SensorGeometry] = None) -> "np.ndarray":
+        """Positions (N, 2) d'un lot de mesures, sans les limiter au terrain ; NaN pour une
+        mesure sans assez de distances exploitables. starts (N, 2) donne des points de
+        départ optionnels à l'affinage (NaN sinon)"""
+        import numpy as np
+        geometry = geometry or self.geometry
+        d = np.asarray(distances, dtype=float)
+        if d.ndim != 2 or d.shape[1] != len(geometry.anchors):
+            raise ValueError(f"Tableau de distances (N, {len(geometry.anchors)}) attendu, reçu {d.shape}")
+        if d.shape[0] == 0:
+            return np.empty((0, 2))
+        usable = self.usable_mask(d, geometry)
+        if not usable.all():
+            d = np.where(usable, d, np.nan)
+        with np.errstate(invalid='ignore', over='ignore'):
+            solution = geometry.solver.solve_batch(d)
+            if self.refine_iterations:
+                solution = geometry.solver.refine_batch(d, solution, self.refine_iterations, starts)
+            solution[~np.isfinite(solution).all(axis=1)] = np.nan
+        return solution
 
-        except Exception as e:
-            print(f"Erreur lors du calcul de la position: {e}")
-            return self.config.center_x, self.config.center_y
+    def clamp_positions(self, positions: "np.ndarray", geometry: Optional[SensorGeometry] = None) -> "np.ndarray":
+        """Limite en place un tableau (N, 2) de positions aux dimensions du terrain"""
+        import numpy as np
+        geometry = geometry or self.geometry
+        np.clip(positions[:, 0], 0, geometry.width, out=positions[:, 0])
+        np.clip(positions[:, 1], 0, geometry.height, out=positions[:, 1])
+        return positions
 
-    def validate_distances(self, d1: float, d2: float, d3: float) -> bool:
-        """Vérifie si les distances sont physiquement possibles"""
-        max_d12 = math.sqrt(self.config.width**2 + self.config.height**2) + 0.1
-        max_d3 = math.sqrt(self.config.center_x**2 + self.config.center_y**2) + 0.1
-        
-        if d1 < 0 or d2 < 0 or d3 < 0:
-            return False
-            
-        if d1 > max_d12 or d2 > max_d12 or d3 > max_d3:
-            return False
-            
-        return True
+    def usable_mask(self, distances: "np.ndarray", geometry: Optional[SensorGeometry] = None) -> "np.ndarray":
+        """Tableau (N, capteurs) indiquant les distances exploitables d'un lot de mesures"""
+        import numpy as np
+        geometry = geometry or self.geometry
+        d = np.asarray(distances, dtype=float)
+        with np.errstate(invalid='ignore'):
+            return (d > 0) & (d <= np.asarray(geometry.max_distances))
 
-    def reset_to_center(self):
-        """Réinitialise la position au centre"""
-        if self.camera_tracking_enabled:
-            send_position(self.config.center_x, self.config.center_y)
\ No newline at end of file
+    def valid_distances_mask(self, distances: "np.ndarray", geometry: Optional[SensorGeometry] = None) -> "np.ndarray":
+        """Lignes d'un tableau (N, capteurs) ayant au moins MIN_ANCHORS distances exploitables"""
+        return self.usable_mask(distances, geometry).sum(axis=1) >= MIN_ANCHORS
@@ -0,0 +1,205 @@
+import json
+import struct
+import threading
+import time
+from typing import List, NamedTuple, Optional, Sequence, TYPE_CHECKING
+from tracking.anchors import Anchor
+from utils.logging_setup import get_logger
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = get_logger("tracking.recording")
+
+# Format d'un enregistrement de match (.ptrec), en petit-boutiste :
+#
+#   FILE_MAGIC, longueur (uint32) puis en-tête JSON : version, capteurs, dimensions du
+#   terrain, heure de début (time.time() et time.monotonic() au même instant)
+#   puis une suite de blocs, ajoutés à la fin du fichier au fil du match :
+#   CHUNK_HEADER (CHUNK_MAGIC, nombre d'enregistrements, longueur de la liste des tags,
+#   horodatages du premier et du dernier enregistrement), liste JSON des tags, puis les
+#   enregistrements de taille fixe (record_dtype)
+#
+# Un bloc est écrit en une fois : si l'application s'arrête brutalement, seul le dernier
+# bloc peut être incomplet et il est ignoré à la lecture.
+FILE_MAGIC = b"PUCKREC1"
+CHUNK_MAGIC = b"CHNK"
+CHUNK_HEADER = struct.Struct("<4sIIdd")
+FORMAT_VERSION = 1
+
+def record_dtype(anchor_count: int) -> "np.dtype":
+    """Enregistrement d'une mesure : horodatage (time.monotonic()), position publiée
+    (NaN si la mesure a été rejetée), qualité, slot du tag dans la liste des tags du bloc,
+    puis les distances brutes (NaN pour un capteur absent)"""
+    import numpy as np
+    return np.dtype([("timestamp", "<f8"), ("x", "<f4"), ("y", "<f4"), ("quality", "<f4"),
+                     ("tag", "<u2"), ("distances", "<f4", (anchor_count,))])
+
+class Recording(NamedTuple):
+    """Enregistrement de match relu depuis un fichier"""
+    header: dict
+    tags: List[str]
+    records: "np.ndarray"  # Tableau structuré (record_dtype)
+
+class MatchRecorder:
+    """Enregistre les mesures d'un match : distances brutes et positions publiées.
+
+    record() est appelé par le pipeline de suivi pour chaque lot : les mesures sont
+    copiées dans un tableau NumPy préalloué (agrandi par doublement), sans aucune écriture
+    disque. Un thread d'écriture ajoute au fichier les mesures en attente, par blocs,
+    dès que chunk_size mesures sont en attente ou au plus tard toutes les flush_interval
+    secondes. Avec path à None, le match n'est gardé qu'en mémoire.
+    """
+
+    def __init__(self, path: Optional[str], anchors: Sequence[Anchor], terrain=(40.0, 20.0),
+                 chunk_size: int = 1024, flush_interval: float = 1.0, capacity: int = 4096):
+        import numpy as np
+        self._np = np
+        self.path = path
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.dtype = record_dtype(len(anchors))
+        self.header = {
+            "version": FORMAT_VERSION,
+            "anchors": [anchor._asdict() for anchor in anchors],
+            "terrain": list(terrain),
+            "started": time.time(),
+            "started_monotonic": time.monotonic(),
+        }
+        self._records = np.zeros(capacity, dtype=self.dtype)
+        self._count = 0
+        self._written = 0
+        self._tags: List[str] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def __len__(self):
+        return self._count
+
+    def start(self):
+        """Démarre le thread d'écriture (sans effet pour un enregistrement en mémoire)"""
+        if self.path is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="MatchRecorder")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self):
+        """Arrête l'enregistrement, après l'écriture des mesures encore en attente"""
+        self._closed = True
+        if self._thread is not None:
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+    def record(self, timestamps: "np.ndarray", slots: "np.ndarray", distances: "np.ndarray",
+               positions: "np.ndarray", quality: "np.ndarray", tags: Sequence[str]):
+        """Ajoute un lot de mesures (appelé dans le thread du pipeline de suivi)"""
+        n = len(timestamps)
+        with self._lock:
+            if self._closed or not n:
+                return
+            if len(tags) != len(self._tags):
+                self._tags = list(tags)
+            start = self._count
+            if start + n > len(self._records):
+                self._grow(start + n)
+            rows = self._records[start:start + n]
+            rows["timestamp"] = timestamps
+            rows["x"] = positions[:, 0]
+            rows["y"] = positions[:, 1]
+            rows["quality"] = quality
+            rows["tag"] = slots
+            rows["distances"] = distances
+            self._count = start + n
+            pending = self._count - self._written
+        if pending >= self.chunk_size:
+            self._wake.set()
+
+    def _grow(self, needed: int):
+        capacity = len(self._records)
+        while capacity < needed:
+            capacity *= 2
+        records = self._np.zeros(capacity, dtype=self.dtype)
+        records[:self._count] = self._records[:self._count]
+        self._records = records
+
+    @property
+    def records(self) -> "np.ndarray":
+        """Mesures enregistrées jusqu'ici (tableau structuré, record_dtype)"""
+        with self._lock:
+            return self._records[:self._count]
+
+    @property
+    def tags(self) -> List[str]:
+        return list(self._tags)
+
+    def positions(self, tag: Optional[str] = None) -> "np.ndarray":
+        """Positions (N, 2) publiées pendant le match, pour un tag ou pour tous"""
+        np = self._np
+        records = self.records
+        accepted = ~np.isnan(records["x"])
+        if tag is not None:
+            if tag not in self._tags:
+                return np.empty((0, 2))
+            accepted &= records["tag"] == self._tags.index(tag)
+        return np.column_stack((records["x"][accepted], records["y"][accepted])).astype(float)
+
+    def _run(self):
+        try:
+            with open(self.path, "wb") as f:
+                header = json.dumps(self.header).encode("utf-8")
+                f.write(FILE_MAGIC + struct.pack("<I", len(header)) + header)
+                done = False
+                while not done:
+                    self._wake.wait(self.flush_interval)
+                    self._wake.clear()
+                    done = self._closed
+                    self._write_pending(f)
+            logger.info("Match enregistré : %s (%d mesures)", self.path, self._written)
+        except OSError as e:
+            logger.error("Erreur lors de l'enregistrement du match dans %s: %s", self.path, e)
+
+    def _write_pending(self, f):
+        with self._lock:
+            start, end = self._written, self._count
+            if start == end:
+                return
+            chunk = self._records[start:end].copy()
+            tags = json.dumps(self._tags).encode("utf-8")
+        f.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(chunk), len(tags),
+                                  float(chunk["timestamp"][0]), float(chunk["timestamp"][-1])))
+        f.write(tags)
+        f.write(chunk.tobytes())
+        f.flush()
+        self._written = end
+
+def load_recording(path: str) -> Recording:
+    """Relit un enregistrement de match ; un dernier bloc incomplet est ignoré"""
+    import numpy as np
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(FILE_MAGIC)] != FILE_MAGIC:
+        raise ValueError(f"{path} n'est pas un enregistrement de match")
+    offset = len(FILE_MAGIC)
+    (length,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    header = json.loads(data[offset:offset + length])
+    offset += length
+    dtype = record_dtype(len(header["anchors"]))
+
+    chunks, tags = [], []
+    while offset + CHUNK_HEADER.size <= len(data):
+        magic, count, tags_length, _, _ = CHUNK_HEADER.unpack_from(data, offset)
+        start = offset + CHUNK_HEADER.size + tags_length
+        end = start + count * dtype.itemsize
+        if magic != CHUNK_MAGIC or end > len(data):
+            logger.warning("Bloc incomplet ignoré à la fin de %s", path)
+            break
+        tags = json.loads(data[offset + CHUNK_HEADER.size:start])
+        chunks.append(np.frombuffer(data, dtype=dtype, count=count, offset=start))
+        offset = end
+    records = np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+    return Recording(header, tags, records)
@@ -0,0 +1,231 @@
+import json
+import mmap
+import struct
+from typing import List, Optional
+from tracking.recording import CHUNK_HEADER, CHUNK_MAGIC, FILE_MAGIC, record_dtype
+from utils.logging_setup import get_logger
+
+logger = get_logger("tracking.replay")
+
+REPLAY_SPEEDS = (1, 2, 5, 10, 25, 50)
+# Un tag sans position dans cette fenêtre (s) avant l'instant rejoué n'est pas affiché
+STALE_AFTER = 1.0
+
+class MappedRecording:
+    """Enregistrement de match (tracking.recording) ouvert par projection en mémoire.
+
+    À l'ouverture, seuls les en-têtes des blocs sont lus pour construire l'index : rang
+    de la première mesure, horodatages de début et de fin et position de chaque bloc. Les
+    mesures restent dans le fichier et ne sont lues qu'à la demande, par des vues NumPy
+    sur la projection : un enregistrement de plusieurs heures s'ouvre immédiatement.
+    """
+
+    def __init__(self, path: str):
+        import numpy as np
+        self._np = np
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._mmap
+        if data[:len(FILE_MAGIC)] != FILE_MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} n'est pas un enregistrement de match")
+        offset = len(FILE_MAGIC)
+        (length,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        self.header = json.loads(data[offset:offset + length])
+        offset += length
+        self.dtype = record_dtype(len(self.header["anchors"]))
+
+        offsets, counts, first, last = [], [], [], []
+        tags_range = None
+        size = len(data)
+        while offset + CHUNK_HEADER.size <= size:
+            magic, count, tags_length, t_first, t_last = CHUNK_HEADER.unpack_from(data, offset)
+            start = offset + CHUNK_HEADER.size + tags_length
+            end = start + count * self.dtype.itemsize
+            if magic != CHUNK_MAGIC or end > size:
+                logger.warning("Bloc incomplet ignoré à la fin de %s", path)
+                break
+            offsets.append(start)
+            counts.append(count)
+            first.append(t_first)
+            last.append(t_last)
+            tags_range = (offset + CHUNK_HEADER.size, start)
+            offset = end
+        # Les slots des tags sont stables : la liste du dernier bloc contient tous les tags
+        self.tags: List[str] = json.loads(data[tags_range[0]:tags_range[1]]) if tags_range else []
+        self._offsets = offsets
+        self._counts = np.array(counts, dtype=np.int64)
+        self._starts = np.concatenate(([0], np.cumsum(self._counts)))
+        self._first = np.array(first)
+        self._last = np.array(last)
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    @property
+    def start_time(self) -> float:
+        return float(self._first[0]) if len(self._first) else 0.0
+
+    @property
+    def end_time(self) -> float:
+        return float(self._last[-1]) if len(self._last) else 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.end_time - self.start_time
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Des vues sur les mesures existent encore : la projection sera libérée avec elles
+            pass
+
+    def chunk(self, index: int) -> "np.ndarray":
+        """Mesures d'un bloc, vue en lecture seule sur le fichier"""
+        return self._np.frombuffer(self._mmap, dtype=self.dtype, count=int(self._counts[index]),
+                                   offset=self._offsets[index])
+
+    def locate(self, timestamp: float) -> int:
+        """Rang de la première mesure d'horodatage ≥ timestamp (len(self) si aucune), par
+        recherche dichotomique dans l'index des blocs puis dans le bloc trouvé"""
+        chunk = int(self._np.searchsorted(self._last, timestamp, side="left"))
+        if chunk == len(self._offsets):
+            return len(self)
+        within = self._np.searchsorted(self.chunk(chunk)["timestamp"], timestamp, side="left")
+        return int(self._starts[chunk] + within)
+
+    def records(self, start: int, stop: int) -> "np.ndarray":
+        """Mesures de rang start à stop (exclu) ; seuls les blocs concernés sont lus"""
+        np = self._np
+        start, stop = max(start, 0), min(stop, len(self))
+        if start >= stop:
+            return np.zeros(0, dtype=self.dtype)
+        first = int(np.searchsorted(self._starts, start, side="right")) - 1
+        last = int(np.searchsorted(self._starts, stop, side="left"))
+        parts = [self.chunk(i) for i in range(first, last)]
+        records = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        offset = int(self._starts[first])
+        return records[start - offset:stop - offset]
+
+    def slot(self, tag: Optional[str]) -> Optional[int]:
+        return self.tags.index(tag) if tag in self.tags else None
+
+    def positions(self, tag: Optional[str] = None, until: Optional[float] = None) -> "np.ndarray":
+        """Positions (N, 2) publiées pour un tag (ou tous), jusqu'à l'instant until"""
+        np = self._np
+        stop = len(self) if until is None or until >= self.end_time else self.locate(until)
+        slot = self.slot(tag)
+        if tag is not None and slot is None:
+            return np.empty((0, 2))
+        parts = []
+        for i in range(int(np.searchsorted(self._starts, stop, side="left"))):
+            records = self.chunk(i)[:max(stop - int(self._starts[i]), 0)]
+            accepted = ~np.isnan(records["x"])
+            if tag is not None:
+                accepted &= records["tag"] == slot
+            parts.append(np.column_stack((records["x"][accepted], records["y"][accepted])))
+        if not parts:
+            return np.empty((0, 2))
+        return np.concatenate(parts).astype(float)
+
+class ReplayEngine:
+    """Relecture d'un enregistrement : horloge à vitesse réglable, saut dans le temps et
+    image par image, dernière position de chaque tag à l'instant rejoué.
+
+    L'horloge n'est pas cadencée ici : advance() est appelé régulièrement par l'interface
+    avec le temps écoulé. Chaque appel ne lit que les mesures écoulées depuis le précédent.
+    """
+
+    def __init__(self, recording: MappedRecording, primary_tag: Optional[str] = None):
+        np = recording._np
+        self._np = np
+        self.recording = recording
+        self.primary_tag = primary_tag if primary_tag in recording.tags else \
+            (recording.tags[0] if recording.tags else None)
+        self.speed = 1.0
+        self.playing = False
+        self.time = recording.start_time
+        self.index = 0  # Rang de la prochaine mesure à rejouer
+        count = len(recording.tags)
+        self.positions = np.full((count, 2), np.nan)  # Dernière position de chaque tag
+        self.timestamps = np.full(count, -np.inf)
+
+    @property
+    def finished(self) -> bool:
+        return self.index >= len(self.recording)
+
+    def _apply(self, records: "np.ndarray"):
+        np = self._np
+        accepted = records[~np.isnan(records["x"])]
+        if not len(accepted):
+            return
+        # Dernière position de chaque tag dans ces mesures
+        slots, first_from_end = np.unique(accepted["tag"][::-1], return_index=True)
+        last = len(accepted) - 1 - first_from_end
+        self.positions[slots, 0] = accepted["x"][last]
+        self.positions[slots, 1] = accepted["y"][last]
+        self.timestamps[slots] = accepted["timestamp"][last]
+
+    def visible_positions(self) -> "np.ndarray":
+        """Positions (tags, 2) à l'instant rejoué, NaN pour les tags sans position récente"""
+        np = self._np
+        positions = self.positions.copy()
+        positions[self.time - self.timestamps > STALE_AFTER] = np.nan
+        return positions
+
+    def advance(self, elapsed: float) -> "np.ndarray":
+        """Avance l'horloge de elapsed secondes réelles multipliées par la vitesse et
+        renvoie les mesures rejouées ; la lecture s'arrête à la fin de l'enregistrement"""
+        recording = self.recording
+        self.time = min(self.time + elapsed * self.speed, recording.end_time)
+        stop = recording.locate(self.time)
+        if self.time >= recording.end_time:
+            stop = len(recording)
+            self.playing = False
+        records = recording.records(self.index, stop)
+        self.index = stop
+        self._apply(records)
+        return records
+
+    def seek(self, timestamp: float):
+        """Se place à l'instant timestamp (horodatage de l'enregistrement)"""
+        np = self._np
+        recording = self.recording
+        self.time = max(recording.start_time, min(timestamp, recording.end_time))
+        self.index = recording.locate(self.time)
+        if self.time >= recording.end_time:
+            self.index = len(recording)
+        # Positions des tags : seules les mesures de la dernière fenêtre d'affichage comptent
+        self.positions[:] = np.nan
+        self.timestamps[:] = -np.inf
+        self._apply(recording.records(recording.locate(self.time - STALE_AFTER), self.index))
+
+    def step(self, direction: int = 1):
+        """Image par image : se place sur la mesure suivante (1) ou précédente (-1) du tag
+        principal, en ne lisant que les blocs nécessaires"""
+        np = self._np
+        recording = self.recording
+        slot = recording.slot(self.primary_tag)
+        if slot is None:
+            return
+        starts = recording._starts
+        chunk = int(np.searchsorted(starts, self.index, side="right")) - 1
+        while 0 <= chunk < len(recording._offsets):
+            records = recording.chunk(chunk)
+            offset = int(starts[chunk])
+            candidates = np.flatnonzero((records["tag"] == slot) & ~np.isnan(records["x"])) + offset
+            if direction > 0:
+                candidates = candidates[candidates >= self.index]
+            else:
+                candidates = candidates[candidates < self.index - 1]
+            if len(candidates):
+                target = int(candidates[0] if direction > 0 else candidates[-1])
+                self.seek(float(recording.records(target, target + 1)["timestamp"][0]))
+                # Les mesures simultanées suivantes restent à rejouer ; la mesure visée est incluse
+                self.index = target + 1
+                self._apply(recording.records(target, target + 1))
+                return
+            chunk += 1 if direction > 0 else -1
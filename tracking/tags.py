@@ -0,0 +1,58 @@
+from typing import Dict, List, TYPE_CHECKING
+from tracking.frames import TagPositions
+
+if TYPE_CHECKING:
+    import numpy as np
+
+class TagTable:
+    """Table des tags suivis, un emplacement (slot) par tag dans des tableaux NumPy.
+
+    Les mesures d'un lot sont écrites dans les slots par indexation vectorisée : le coût
+    par lot ne dépend pas du nombre de tags et aucun objet Python n'est créé par tag.
+    Les tableaux sont agrandis par doublement quand un nouveau tag apparaît.
+    """
+
+    def __init__(self, capacity: int = 16):
+        import numpy as np
+        self._np = np
+        self.index: Dict[str, int] = {}  # Tag -> slot
+        self.tags: List[str] = []
+        self.positions = np.full((capacity, 2), np.nan)
+        self.timestamps = np.zeros(capacity)
+
+    def __len__(self):
+        return len(self.tags)
+
+    def slot(self, tag: str) -> int:
+        """Renvoie le slot d'un tag, en l'ajoutant à la table s'il est nouveau"""
+        slot = self.index.get(tag)
+        if slot is None:
+            slot = len(self.tags)
+            if slot == len(self.timestamps):
+                self._grow()
+            self.index[tag] = slot
+            self.tags.append(tag)
+        return slot
+
+    def _grow(self):
+        np = self._np
+        capacity = 2 * len(self.timestamps)
+        positions = np.full((capacity, 2), np.nan)
+        positions[:len(self.positions)] = self.positions
+        timestamps = np.zeros(capacity)
+        timestamps[:len(self.timestamps)] = self.timestamps
+        self.positions, self.timestamps = positions, timestamps
+
+    def update(self, slots: "np.ndarray", positions: "np.ndarray", timestamps: "np.ndarray"):
+        """Écrit un lot de positions, dans l'ordre chronologique : la dernière d'un slot l'emporte"""
+        np = self._np
+        # Dernière occurrence de chaque slot dans le lot
+        unique, first_from_end = np.unique(slots[::-1], return_index=True)
+        last = len(slots) - 1 - first_from_end
+        self.positions[unique] = positions[last]
+        self.timestamps[unique] = timestamps[last]
+
+    def snapshot(self, primary: str) -> TagPositions:
+        """Copie des positions courantes, transmissible à un autre thread"""
+        n = len(self.tags)
+        return TagPositions(tuple(self.tags), self.positions[:n].copy(), self.timestamps[:n].copy(), primary)
@@ -0,0 +1,277 @@
+import math
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Point = Tuple[float, float]
+
+def condition_number_2x2(a: float, b: float, c: float, d: float) -> float:
+    """Conditionnement (norme 2) de la matrice [[a, b], [c, d]], calculé sans NumPy"""
+    det = abs(a * d - b * c)
+    if det == 0:
+        return math.inf
+    # Valeurs singulières : racines des valeurs propres de AᵀA
+    t = a*a + b*b + c*c + d*d
+    root = math.sqrt(max(t * t - 4 * det * det, 0.0))
+    s_max = math.sqrt((t + root) / 2)
+    s_min = det / s_max
+    return s_max / s_min
+
+class SubsetFactor:
+    """Factorisation précalculée pour un sous-ensemble de capteurs.
+
+    La position se calcule par x = x0 - Σ gx[k]·d[k]², y = y0 - Σ gy[k]·d[k]², les
+    distances d étant celles des capteurs du sous-ensemble (indices).
+    """
+    __slots__ = ("indices", "x0", "y0", "gx", "gy", "_arrays")
+
+    def __init__(self, indices, x0, y0, gx, gy):
+        self.indices = indices
+        self.x0, self.y0 = x0, y0
+        self.gx, self.gy = gx, gy
+        self._arrays = None  # Version NumPy, créée à la première résolution par lot
+
+class TrilaterationSolver:
+    """Solveur de trilatération par moindres carrés pondérés, pour N ≥ 3 capteurs.
+
+    Le système linéarisé 2·xᵢ·x + 2·yᵢ·y - R = xᵢ² + yᵢ² - dᵢ² (R = x² + y²) ne dépend
+    des mesures que par son second membre. Exprimé autour du barycentre pondéré des
+    capteurs, il se découple : la position vaut p̄ + ½·C⁻¹·Σ wᵢ·uᵢ·(|uᵢ|² - dᵢ²), où
+    uᵢ = pᵢ - p̄ et C = Σ wᵢ·uᵢ·uᵢᵀ. Pour chaque sous-ensemble de capteurs disponibles,
+    cette factorisation se réduit à un point de départ et un coefficient par capteur,
+    calculés une seule fois puis mis en cache : une mesure se résout ensuite en quelques
+    multiplications-additions sur des floats. Avec trois capteurs, c'est la solution
+    exacte de la trilatération. NumPy n'est chargé qu'à la première résolution par lot.
+    """
+
+    def __init__(self, sensors: Sequence[Point], weights: Optional[Sequence[float]] = None):
+        self.sensors = tuple((float(x), float(y)) for x, y in sensors)
+        self.weights = tuple(float(w) for w in weights) if weights is not None else (1.0,) * len(self.sensors)
+        if len(self.weights) != len(self.sensors):
+            raise ValueError("Un poids par capteur attendu")
+        self.key = (self.sensors, self.weights)
+        self.full_mask = (1 << len(self.sensors)) - 1
+        self._factors: Dict[int, Optional[SubsetFactor]] = {}
+        self._full = self.factor(self.full_mask)
+        # Une géométrie dégénérée (capteurs alignés) ne permet pas de résoudre le système
+        self.well_conditioned = self._full is not None
+        self._arrays = None  # Capteurs et poids en NumPy, créés au premier affinage par lot
+
+    def factor(self, mask: int) -> Optional[SubsetFactor]:
+        """Factorisation du sous-ensemble de capteurs dont les bits sont à 1 dans mask,
+        ou None s'il compte moins de trois capteurs ou s'ils sont alignés"""
+        try:
+            return self._factors[mask]
+        except KeyError:
+            pass
+        factor = self._factorize(mask)
+        self._factors[mask] = factor
+        return factor
+
+    def _factorize(self, mask: int) -> Optional[SubsetFactor]:
+        indices = tuple(i for i in range(len(self.sensors)) if mask >> i & 1)
+        if len(indices) < 3:
+            return None
+        sensors = [self.sensors[i] for i in indices]
+        weights = [self.weights[i] for i in indices]
+        total = sum(weights)
+        cx = sum(w * x for w, (x, _) in zip(weights, sensors)) / total
+        cy = sum(w * y for w, (_, y) in zip(weights, sensors)) / total
+        centered = [(x - cx, y - cy) for x, y in sensors]
+
+        # C = Σ wᵢ·uᵢ·uᵢᵀ
+        sxx = sum(w * ux * ux for w, (ux, _) in zip(weights, centered))
+        sxy = sum(w * ux * uy for w, (ux, uy) in zip(weights, centered))
+        syy = sum(w * uy * uy for w, (_, uy) in zip(weights, centered))
+        if condition_number_2x2(sxx, sxy, sxy, syy) > 1e10:
+            return None
+        det = sxx * syy - sxy * sxy
+        i11, i12, i22 = syy / det, -sxy / det, sxx / det
+
+        # gᵢ = ½·wᵢ·C⁻¹·uᵢ, et point de départ p̄ + Σ gᵢ·|uᵢ|²
+        gx = tuple(0.5 * w * (i11 * ux + i12 * uy) for w, (ux, uy) in zip(weights, centered))
+        gy = tuple(0.5 * w * (i12 * ux + i22 * uy) for w, (ux, uy) in zip(weights, centered))
+        norms = [ux * ux + uy * uy for ux, uy in centered]
+        x0 = cx + sum(g * n for g, n in zip(gx, norms))
+        y0 = cy + sum(g * n for g, n in zip(gy, norms))
+        return SubsetFactor(indices, x0, y0, gx, gy)
+
+    def solve(self, distances: Sequence[float]) -> Optional[Point]:
+        """Résout une mesure (une distance par capteur, NaN pour un capteur absent), sans
+        limiter le résultat aux dimensions du terrain"""
+        factor = self._full
+        if factor is not None:
+            # Cas courant : tous les capteurs sont disponibles, un NaN dans le résultat
+            # signale un capteur absent
+            if len(factor.indices) == 3:
+                gx1, gx2, gx3 = factor.gx
+                gy1, gy2, gy3 = factor.gy
+                d1, d2, d3 = distances
+                s1, s2, s3 = d1 * d1, d2 * d2, d3 * d3
+                x = factor.x0 - gx1 * s1 - gx2 * s2 - gx3 * s3
+                y = factor.y0 - gy1 * s1 - gy2 * s2 - gy3 * s3
+            else:
+                x, y = self._combine(factor, distances)
+            if x == x and y == y:
+                return x, y
+
+        mask = self.full_mask
+        for i, d in enumerate(distances):
+            if d != d:
+                mask &= ~(1 << i)
+        factor = self.factor(mask)
+        if factor is None:
+            return None
+        return self._combine(factor, [distances[i] for i in factor.indices])
+
+    @staticmethod
+    def _combine(factor: SubsetFactor, distances: Sequence[float]) -> Point:
+        x, y = factor.x0, factor.y0
+        for d, gx, gy in zip(distances, factor.gx, factor.gy):
+            d_sq = d * d
+            x -= gx * d_sq
+            y -= gy * d_sq
+        return x, y
+
+    def _normal_equations(self, distances: Sequence[float], x: float, y: float):
+        """Coût Σ wᵢ·rᵢ² des résidus de distance rᵢ = |p - pᵢ| - dᵢ en (x, y), et équations
+        normales de Gauss-Newton (JᵀWJ = [[a, b], [b, c]], JᵀWr = (gx, gy))"""
+        cost = a = b = c = gx = gy = 0.0
+        for (sx, sy), w, d in zip(self.sensors, self.weights, distances):
+            if d != d:
+                continue
+            dx, dy = x - sx, y - sy
+            n = math.hypot(dx, dy)
+            if n < 1e-9:
+                continue
+            jx, jy = dx / n, dy / n
+            r = n - d
+            wr = w * r
+            cost += wr * r
+            a += w * jx * jx
+            b += w * jx * jy
+            c += w * jy * jy
+            gx += wr * jx
+            gy += wr * jy
+        return cost, a, b, c, gx, gy
+
+    def refine(self, distances: Sequence[float], x: float, y: float, iterations: int = 3,
+               start: Optional[Point] = None) -> Point:
+        """Affine une position par Levenberg-Marquardt sur les distances elles-mêmes.
+
+        La solution linéarisée minimise l'écart sur les carrés des distances, ce qui
+        amplifie le bruit quand le palet est proche de l'alignement de deux capteurs.
+        Partant de (x, y), ou de start (la position précédente du tag) si elle explique
+        mieux les distances, chaque itération fait un pas de Gauss-Newton amorti, accepté
+        seulement s'il réduit les résidus : au plus iterations + 1 évaluations des résidus.
+        """
+        if not (x == x and y == y):
+            return x, y
+        equations = self._normal_equations(distances, x, y)
+        if start is not None and start[0] == start[0] and start[1] == start[1]:
+            warm = self._normal_equations(distances, start[0], start[1])
+            if warm[0] < equations[0]:
+                (x, y), equations = start, warm
+        cost, a, b, c, gx, gy = equations
+        damping = 1e-3
+        for _ in range(iterations):
+            # Amortissement de Marquardt : diagonale de JᵀWJ multipliée par 1 + damping
+            a2, c2 = a * (1 + damping), c * (1 + damping)
+            det = a2 * c2 - b * b
+            if det <= 0:
+                break
+            step_x = (c2 * gx - b * gy) / det
+            step_y = (a2 * gy - b * gx) / det
+            candidate = self._normal_equations(distances, x - step_x, y - step_y)
+            if candidate[0] < cost:
+                x, y = x - step_x, y - step_y
+                cost, a, b, c, gx, gy = candidate
+                damping *= 0.1
+                # Convergé : les itérations restantes ne déplaceraient plus la position
+                if step_x * step_x + step_y * step_y < 1e-8:
+                    break
+            else:
+                damping *= 10
+        return x, y
+
+    def solve_batch(self, distances: "np.ndarray") -> "np.ndarray":
+        """Résout un tableau (N, capteurs) de distances et renvoie un tableau (N, 2) de
+        positions, NaN pour les mesures sans sous-ensemble de capteurs exploitable"""
+        import numpy as np
+        d = np.asarray(distances, dtype=float)
+        positions = np.full((d.shape[0], 2), np.nan)
+        available = ~np.isnan(d)
+        with np.errstate(invalid='ignore', over='ignore'):
+            squared = d * d
+            if available.all():
+                masks, rows_of = (self.full_mask,), lambda mask: slice(None)
+            else:
+                bits = np.left_shift(1, np.arange(d.shape[1]))
+                row_masks = available @ bits
+                masks = np.unique(row_masks).tolist()
+                rows_of = lambda mask: row_masks == mask
+            for mask in masks:
+                factor = self.factor(mask)
+                if factor is None:
+                    continue
+                if factor._arrays is None:
+                    factor._arrays = (np.array(factor.indices), np.array((factor.x0, factor.y0)),
+                                      np.column_stack((factor.gx, factor.gy)))
+                indices, origin, gradient = factor._arrays
+                rows = rows_of(mask)
+                positions[rows] = origin - squared[rows][:, indices] @ gradient
+        return positions
+
+    def refine_batch(self, distances: "np.ndarray", positions: "np.ndarray", iterations: int = 3,
+                     starts: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """Version vectorisée de refine() : affine un tableau (N, 2) de positions calculées à
+        partir de distances (N, capteurs), NaN pour un capteur absent. starts (N, 2) donne
+        des points de départ optionnels (NaN sinon), retenus ligne par ligne s'ils
+        expliquent mieux les distances. Renvoie un nouveau tableau (N, 2)."""
+        import numpy as np
+        if self._arrays is None:
+            self._arrays = (np.array(self.sensors), np.array(self.weights))
+        sensors, weights = self._arrays
+        d = np.asarray(distances, dtype=float)
+        available = ~np.isnan(d)
+        w = np.where(available, weights, 0.0)
+        d = np.where(available, d, 0.0)
+
+        def evaluate(p):
+            delta = p[:, None, :] - sensors[None, :, :]
+            n = np.maximum(np.hypot(delta[..., 0], delta[..., 1]), 1e-9)
+            jx, jy = delta[..., 0] / n, delta[..., 1] / n
+            r = n - d
+            wr = w * r
+            wjx, wjy = w * jx, w * jy
+            return np.stack(((wr * r).sum(axis=1), (wjx * jx).sum(axis=1), (wjx * jy).sum(axis=1),
+                             (wjy * jy).sum(axis=1), (wr * jx).sum(axis=1), (wr * jy).sum(axis=1)))
+
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            p = np.array(positions, dtype=float)
+            equations = evaluate(p)
+            if starts is not None:
+                warm = evaluate(starts)
+                better = warm[0] < equations[0]
+                p[better] = starts[better]
+                equations[:, better] = warm[:, better]
+            damping = np.full(len(p), 1e-3)
+            for _ in range(iterations):
+                cost, a, b, c, gx, gy = equations
+                a2, c2 = a * (1 + damping), c * (1 + damping)
+                det = a2 * c2 - b * b
+                candidate = np.column_stack((p[:, 0] - (c2 * gx - b * gy) / det,
+                                             p[:, 1] - (a2 * gy - b * gx) / det))
+                candidate_equations = evaluate(candidate)
+                better = candidate_equations[0] < cost
+                p[better] = candidate[better]
+                equations[:, better] = candidate_equations[:, better]
+                damping = np.where(better, damping * 0.1, damping * 10)
+        return p
+
+@lru_cache(maxsize=8)
+def get_solver(sensors: Tuple[Point, ...], weights: Optional[Tuple[float, ...]] = None) -> TrilaterationSolver:
+    """Renvoie le solveur associé à une géométrie de capteurs, en le créant au besoin"""
+    return TrilaterationSolver(sensors, weights)
@@ -0,0 +1,89 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+ROOT_LOGGER = "pucktracker"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+_listener = None
+_lock = threading.Lock()
+
+def get_logger(name: str) -> logging.Logger:
+    """Renvoie le logger d'un module de l'application, par exemple get_logger("tracking")"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+class RateLimitFilter(logging.Filter):
+    """Limite le nombre de messages identiques émis par seconde.
+
+    Les messages sont regroupés par logger et par gabarit (avant formatage) : un message
+    répété à chaque mesure passe au plus `rate` fois par seconde, avec un nombre
+    d'occurrences ignorées ajouté au message suivant.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 5):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # (logger, gabarit) -> [jetons, dernière mise à jour, ignorés]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} messages similaires ignorés)"
+        return True
+
+def configure_logging(level: Optional[str] = None, rate: float = 1.0, burst: int = 5):
+    """Configure les logs de l'application.
+
+    Les messages passent par une file : l'écriture sur la console est faite par un thread
+    dédié et ne bloque jamais le thread appelant, même si la sortie standard est lente.
+    Le niveau vient de `level` ou de la variable d'environnement PUCKTRACKER_LOG_LEVEL.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        level = level or os.environ.get("PUCKTRACKER_LOG_LEVEL", "INFO")
+
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(rate, burst))
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level.upper())
+        root.addHandler(queue_handler)
+        root.propagate = False
+
+        _listener = QueueListener(log_queue, console, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Vide la file de messages et arrête le thread d'écriture"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
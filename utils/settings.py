@@ -0,0 +1,115 @@
+import json
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Optional
+
+# Configuration de l'application, lue depuis un fichier JSON (voir pucktracker.example.json).
+# Chaque section est optionnelle, les valeurs absentes gardent leur valeur par défaut.
+
+@dataclass
+class TerrainSettings:
+    width: float = 40.0   # Largeur du terrain (m)
+    height: float = 20.0  # Hauteur du terrain (m)
+
+@dataclass
+class AnchorSettings:
+    # Identifiants des capteurs dans les messages du palet, en hexadécimal : 86 ou "8A"
+    HG: int = 86  # Capteur en haut à gauche (d1)
+    HD: int = 85  # Capteur en haut à droite (d2)
+    BM: int = 84  # Capteur en bas au milieu (d3)
+    # Liste explicite de capteurs, qui remplace HG, HD et BM : [{"id": 86, "x": 0.0,
+    # "y": 20.0, "weight": 1.0}, ...] avec des positions en mètres (trois capteurs ou plus)
+    layout: Optional[list] = None
+
+    @property
+    def ids(self):
+        """Identifiants dans l'ordre des distances : d1, d2, d3 ou l'ordre de layout"""
+        if self.layout:
+            return tuple(item["id"] for item in self.layout)
+        return self.HG, self.HD, self.BM
+
+@dataclass
+class CameraSettings:
+    enabled: bool = False  # Envoi à la caméra dès le lancement
+    host: str = "esp32-device.local"
+    port: int = 4210
+    protocol: str = "auto"  # "auto", "binary" ou "ascii"
+    rate_hz: float = 30.0
+    deadband: float = 0.1
+    # Anticipation (s) ajoutée au délai mesuré entre la réception des distances et l'envoi,
+    # pour compenser le retard du réseau et de la caméra (nécessite un filtre de suivi)
+    lookahead: float = 0.0
+
+@dataclass
+class MqttSettings:
+    host: str = "localhost"
+    port: int = 1883
+    manage_broker: bool = True  # Démarrer le broker avec l'application
+    broker: str = "mosquitto"   # "mosquitto" (binaire fourni) ou "embedded" (broker intégré au processus)
+
+@dataclass
+class IngestSettings:
+    transport: str = "mqtt"  # "mqtt" (via le broker) ou "udp" (datagrammes envoyés directement par le palet)
+    udp_port: int = 12346
+
+@dataclass
+class TrackingSettings:
+    # Tag du palet de jeu (suivi par la caméra et en match) ; par défaut le premier tag reçu
+    primary_tag: Optional[str] = None
+    # Filtre de Kalman des positions du tag principal : "none", "cv" (vitesse constante)
+    # ou "ca" (accélération constante)
+    filter: str = "none"
+    # Densité spectrale du bruit d'accélération (cv) ou de jerk (ca) ; par défaut 100 (cv) ou 3000 (ca)
+    process_noise: Optional[float] = None
+    measurement_noise: float = 0.15  # Écart type des positions calculées (m)
+    # Itérations de Levenberg-Marquardt affinant la trilatération linéarisée (0 : désactivé)
+    refine_iterations: int = 0
+    # Contrôle de qualité des positions : les positions dont la qualité (1 / (1 + (résidu /
+    # residual_scale)²)) est inférieure à min_quality, ou qui impliquent une vitesse
+    # supérieure à max_speed (m/s), sont abandonnées
+    min_quality: float = 0.1
+    max_speed: float = 40.0
+    residual_scale: float = 0.3  # Résidu (m) pour lequel la qualité vaut 0.5
+
+@dataclass
+class RecordingSettings:
+    # Enregistrement de chaque match (distances brutes et positions) dans directory,
+    # sinon le match n'est gardé qu'en mémoire, pour la heatmap
+    enabled: bool = True
+    directory: str = "enregistrements"
+
+@dataclass
+class Settings:
+    terrain: TerrainSettings = field(default_factory=TerrainSettings)
+    anchors: AnchorSettings = field(default_factory=AnchorSettings)
+    camera: CameraSettings = field(default_factory=CameraSettings)
+    mqtt: MqttSettings = field(default_factory=MqttSettings)
+    ingest: IngestSettings = field(default_factory=IngestSettings)
+    tracking: TrackingSettings = field(default_factory=TrackingSettings)
+    recording: RecordingSettings = field(default_factory=RecordingSettings)
+    log_level: str = "INFO"
+
+def _update(section, values: dict, name: str):
+    known = {f.name for f in fields(section)}
+    for key, value in values.items():
+        if key not in known:
+            raise ValueError(f"Paramètre inconnu dans la section '{name}' : {key}")
+        setattr(section, key, value)
+
+def load_settings(path: Optional[str] = None) -> Settings:
+    """Charge la configuration depuis un fichier JSON, ou renvoie la configuration par défaut"""
+    settings = Settings()
+    if path is None:
+        return settings
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for key, value in data.items():
+        if not hasattr(settings, key):
+            raise ValueError(f"Section inconnue dans {path} : {key}")
+        section = getattr(settings, key)
+        if is_dataclass(section):
+            if not isinstance(value, dict):
+                raise ValueError(f"La section '{key}' de {path} doit être un objet")
+            _update(section, value, key)
+        else:
+            setattr(settings, key, value)
+    return settings
@@ -0,0 +1,48 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+# Modules lourds dont le chargement au démarrage est signalé dans le rapport
+HEAVY_MODULES = ("numpy", "paho.mqtt.client", "match.heatmap", "matplotlib")
+
+class StartupProfiler:
+    """Mesure la durée des phases de démarrage de l'application (imports, initialisation...)"""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.phases = []  # (nom, début, durée) en secondes depuis t0
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, start - self.t0, end - start))
+
+    def mark(self, name: str):
+        """Enregistre un instant (phase de durée nulle), par exemple la première image affichée"""
+        self.phases.append((name, time.perf_counter() - self.t0, 0.0))
+
+    def report(self) -> dict:
+        return {
+            "phases": [{"name": name, "start_ms": round(start * 1000, 1), "duration_ms": round(duration * 1000, 1)}
+                       for name, start, duration in self.phases],
+            "total_ms": round((time.perf_counter() - self.t0) * 1000, 1),
+            "modules_loaded": len(sys.modules),
+            "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+        }
+
+    def print_report(self, file=None):
+        """Affiche le rapport lisible, suivi d'une ligne JSON exploitable par bench_startup.py"""
+        file = file or sys.stderr
+        report = self.report()
+        print("Rapport de démarrage :", file=file)
+        for phase in report["phases"]:
+            print(f"  {phase['name']:<28} {phase['start_ms']:8.1f} ms  (+{phase['duration_ms']:.1f} ms)", file=file)
+        print(f"  {'total':<28} {report['total_ms']:8.1f} ms", file=file)
+        print(f"  modules chargés : {report['modules_loaded']}, lourds : "
+              f"{', '.join(report['heavy_modules_loaded']) or 'aucun'}", file=file)
+        print("STARTUP_REPORT " + json.dumps(report), file=file)